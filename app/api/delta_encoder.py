@@ -0,0 +1,118 @@
+import logging
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+OVERLAY_GROUPS = ("faces", "objects")
+
+
+class ARDeltaEncoder:
+    """Per-client encoder that sends AR overlay changes instead of full state
+
+    The encoder remembers the overlays it last sent. Each frame it emits the
+    overlays that were added, those that moved or changed confidence past the
+    configured tolerances, and the keys of those that disappeared. A full
+    keyframe is sent every ``keyframe_interval`` frames or on request so a
+    client can resync.
+    """
+
+    def __init__(
+        self,
+        keyframe_interval: int = 30,
+        position_tolerance: float = 2.0,
+        confidence_tolerance: float = 0.05
+    ):
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.position_tolerance = position_tolerance
+        self.confidence_tolerance = confidence_tolerance
+        self._sent_state: Dict[str, Dict[str, Dict]] = {group: {} for group in OVERLAY_GROUPS}
+        self._frames_since_keyframe = 0
+        self._force_keyframe = True
+
+    def request_keyframe(self):
+        """Send a full keyframe with the next frame"""
+        self._force_keyframe = True
+
+    def encode(self, ar_data: Dict) -> Dict:
+        """Encode AR data as a keyframe or a delta against the last sent state"""
+        overlays = ar_data.get("overlays", {})
+        current = {group: self._key_overlays(overlays.get(group, [])) for group in OVERLAY_GROUPS}
+        extra_fields = {key: value for key, value in ar_data.items() if key != "overlays"}
+
+        self._frames_since_keyframe += 1
+        if self._force_keyframe or self._frames_since_keyframe >= self.keyframe_interval:
+            self._sent_state = current
+            self._frames_since_keyframe = 0
+            self._force_keyframe = False
+            return {"keyframe": True, "overlays": current, **extra_fields}
+
+        added, updated, removed = {}, {}, {}
+        for group in OVERLAY_GROUPS:
+            group_added, group_updated, group_removed = self._diff_group(
+                self._sent_state[group], current[group]
+            )
+            added[group] = group_added
+            updated[group] = group_updated
+            removed[group] = group_removed
+
+        return {
+            "keyframe": False,
+            "added": added,
+            "updated": updated,
+            "removed": removed,
+            **extra_fields
+        }
+
+    def _diff_group(
+        self,
+        sent: Dict[str, Dict],
+        current: Dict[str, Dict]
+    ) -> Tuple[Dict[str, Dict], Dict[str, Dict], List[str]]:
+        """Diff one overlay group, updating the sent state in place"""
+        added = {}
+        updated = {}
+        for key, overlay in current.items():
+            previous = sent.get(key)
+            if previous is None:
+                added[key] = overlay
+                sent[key] = overlay
+            elif self._has_changed(previous, overlay):
+                updated[key] = overlay
+                sent[key] = overlay
+
+        removed = [key for key in sent if key not in current]
+        for key in removed:
+            del sent[key]
+
+        return added, updated, removed
+
+    def _has_changed(self, previous: Dict, current: Dict) -> bool:
+        """Check whether an overlay moved or changed past the tolerances"""
+        try:
+            if previous.get("class_name") != current.get("class_name"):
+                return True
+            if previous.get("overlay_type") != current.get("overlay_type"):
+                return True
+
+            previous_bbox = previous.get("bbox") or []
+            current_bbox = current.get("bbox") or []
+            if len(previous_bbox) != len(current_bbox):
+                return True
+            if any(abs(a - b) > self.position_tolerance for a, b in zip(previous_bbox, current_bbox)):
+                return True
+
+            confidence_change = abs(previous.get("confidence", 0.0) - current.get("confidence", 0.0))
+            return confidence_change > self.confidence_tolerance
+
+        except Exception as e:
+            logger.error(f"Error comparing overlays: {e}")
+            return True
+
+    def _key_overlays(self, overlays: List[Dict]) -> Dict[str, Dict]:
+        """Key overlays by track id, falling back to list position"""
+        keyed = {}
+        for index, overlay in enumerate(overlays):
+            track_id = overlay.get("track_id")
+            key = str(track_id) if track_id is not None else f"#{index}"
+            keyed[key] = overlay
+        return keyed
@@ -0,0 +1,88 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class FramePipeline:
+    """Per-client frame pipeline with bounded depth and in-order commits
+
+    Up to ``depth`` frames run their concurrent stage (decode, preprocess,
+    detection) at the same time. Results land in a reorder buffer and the
+    ordered stage (tracking, AR, send) runs strictly in submission order, so
+    stateful consumers see the same sequence as with serial processing.
+    """
+
+    def __init__(
+        self,
+        depth: int,
+        concurrent_stage: Callable[[Any], Awaitable[Any]],
+        ordered_stage: Callable[[Any, Any], Awaitable[None]],
+        name: str = "pipeline"
+    ):
+        self.depth = max(1, depth)
+        self.name = name
+        self._concurrent_stage = concurrent_stage
+        self._ordered_stage = ordered_stage
+        self._slots = asyncio.Semaphore(self.depth)
+        self._commit_lock = asyncio.Lock()
+        self._reorder_buffer: Dict[int, Tuple[Any, bool, Any]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._next_sequence = 0
+        self._next_commit = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of submitted frames not yet committed"""
+        return self._next_sequence - self._next_commit
+
+    async def submit(self, item: Any) -> int:
+        """Admit a frame, waiting while the pipeline is full; returns its sequence"""
+        await self._slots.acquire()
+        sequence = self._next_sequence
+        self._next_sequence += 1
+
+        task = asyncio.create_task(self._run(sequence, item))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return sequence
+
+    async def _run(self, sequence: int, item: Any):
+        """Run the concurrent stage, then commit everything that is ready"""
+        try:
+            result = await self._concurrent_stage(item)
+            self._reorder_buffer[sequence] = (item, True, result)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._reorder_buffer[sequence] = (item, False, e)
+
+        await self._commit_ready()
+
+    async def _commit_ready(self):
+        """Run the ordered stage for consecutive completed sequences"""
+        async with self._commit_lock:
+            while self._next_commit in self._reorder_buffer:
+                item, ok, result = self._reorder_buffer.pop(self._next_commit)
+                self._next_commit += 1
+                try:
+                    if ok:
+                        await self._ordered_stage(item, result)
+                    else:
+                        logger.error(f"Frame dropped in {self.name} concurrent stage: {result}")
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error in {self.name} ordered stage: {e}")
+                finally:
+                    self._slots.release()
+
+    async def close(self):
+        """Cancel in-flight frames and wait for them to finish"""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._reorder_buffer.clear()
@@ -0,0 +1,92 @@
+from typing import Dict, Optional, Tuple, Union
+import base64
+import json
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from app.models.frame import FrameRequest, RawFrameMetadata
+
+# Request body schema for /api/detect, which reads the raw Request itself
+FRAME_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": FrameRequest.model_json_schema()},
+            "application/octet-stream": {"schema": {"type": "string", "format": "binary"}},
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["image", "width", "height"],
+                    "properties": {
+                        "image": {"type": "string", "format": "binary"},
+                        "width": {"type": "integer"},
+                        "height": {"type": "integer"},
+                        "format": {"type": "string", "default": "jpeg"},
+                        "metadata": {"type": "string", "description": "JSON object"}
+                    }
+                }
+            }
+        }
+    },
+    "parameters": [
+        {"name": "X-Frame-Width", "in": "header", "schema": {"type": "integer"}},
+        {"name": "X-Frame-Height", "in": "header", "schema": {"type": "integer"}},
+        {"name": "X-Frame-Format", "in": "header", "schema": {"type": "string", "default": "jpeg"}},
+        {"name": "X-Frame-Metadata", "in": "header", "schema": {"type": "string"}}
+    ]
+}
+
+
+def parse_frame_metadata(raw_metadata: Optional[str]) -> Dict:
+    """Parse JSON metadata sent as a header or form field"""
+    if not raw_metadata:
+        return {}
+    return json.loads(raw_metadata)
+
+
+async def read_frame_upload(request: Request) -> Tuple[bytes, Union[FrameRequest, RawFrameMetadata]]:
+    """Read image bytes and frame description from a JSON, raw or multipart body"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    if content_type == "application/octet-stream":
+        frame_info = RawFrameMetadata(
+            width=request.headers.get("x-frame-width"),
+            height=request.headers.get("x-frame-height"),
+            format=request.headers.get("x-frame-format", "jpeg"),
+            metadata=parse_frame_metadata(request.headers.get("x-frame-metadata"))
+        )
+        return await request.body(), frame_info
+
+    if content_type == "multipart/form-data":
+        form = await request.form()
+        upload = form.get("image")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Missing image file")
+        frame_info = RawFrameMetadata(
+            width=form.get("width"),
+            height=form.get("height"),
+            format=form.get("format", "jpeg"),
+            metadata=parse_frame_metadata(form.get("metadata"))
+        )
+        return await upload.read(), frame_info
+
+    # Default JSON body with base64 encoded image; schema errors are a 422 as
+    # they were when the endpoint declared a FrameRequest body
+    try:
+        body = await request.json()
+    except ValueError as e:
+        raise RequestValidationError([{
+            "type": "json_invalid",
+            "loc": ("body",),
+            "msg": "JSON decode error",
+            "input": {},
+            "ctx": {"error": str(e)}
+        }])
+    try:
+        frame_request = FrameRequest.model_validate(body)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)],
+            body=body
+        )
+    return base64.b64decode(frame_request.image), frame_request
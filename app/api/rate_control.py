@@ -0,0 +1,129 @@
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+RATE_POLICY_NONE = "none"
+RATE_POLICY_HYSTERESIS = "hysteresis"
+
+RATE_DOWN = "down"
+RATE_UP = "up"
+
+
+@dataclass(frozen=True)
+class RateTarget:
+    """Capture settings the server asks a camera client to use"""
+    fps: int
+    width: int
+    height: int
+    jpeg_quality: int
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+# Ordered from full quality to the cheapest setting we still accept
+DEFAULT_RATE_LADDER = (
+    RateTarget(fps=30, width=1280, height=720, jpeg_quality=85),
+    RateTarget(fps=20, width=1280, height=720, jpeg_quality=80),
+    RateTarget(fps=15, width=960, height=540, jpeg_quality=75),
+    RateTarget(fps=10, width=640, height=360, jpeg_quality=70),
+    RateTarget(fps=5, width=640, height=360, jpeg_quality=60),
+)
+
+
+class RateControlPolicy(ABC):
+    """Decides a client's capture target from its processing load"""
+
+    name: str = ""
+
+    @property
+    @abstractmethod
+    def current(self) -> RateTarget:
+        """Target the client should currently be using"""
+
+    @abstractmethod
+    def observe(self, latency: float, occupancy: float) -> Optional[str]:
+        """Record one frame's latency (seconds) and pipeline occupancy (0-1+)
+
+        Returns RATE_DOWN or RATE_UP when the target changed, otherwise None.
+        """
+
+
+class HysteresisRatePolicy(RateControlPolicy):
+    """Step along a quality ladder using watermarks and consecutive-sample hysteresis
+
+    A client steps down after ``down_samples`` consecutive overloaded frames
+    (latency or occupancy above the high watermark) and back up only after
+    ``up_samples`` consecutive frames below both low watermarks, so targets
+    do not flap around a single threshold.
+    """
+
+    name = RATE_POLICY_HYSTERESIS
+
+    def __init__(
+        self,
+        ladder: Sequence[RateTarget] = DEFAULT_RATE_LADDER,
+        latency_high: float = 0.25,
+        latency_low: float = 0.1,
+        occupancy_high: float = 1.0,
+        occupancy_low: float = 0.5,
+        down_samples: int = 3,
+        up_samples: int = 30
+    ):
+        if not ladder:
+            raise ValueError("Rate ladder must not be empty")
+        self.ladder = tuple(ladder)
+        self.latency_high = latency_high
+        self.latency_low = latency_low
+        self.occupancy_high = occupancy_high
+        self.occupancy_low = occupancy_low
+        self.down_samples = max(1, down_samples)
+        self.up_samples = max(1, up_samples)
+        self._level = 0
+        self._overloaded = 0
+        self._underloaded = 0
+
+    @property
+    def current(self) -> RateTarget:
+        return self.ladder[self._level]
+
+    def observe(self, latency: float, occupancy: float) -> Optional[str]:
+        if latency >= self.latency_high or occupancy >= self.occupancy_high:
+            self._overloaded += 1
+            self._underloaded = 0
+        elif latency <= self.latency_low and occupancy <= self.occupancy_low:
+            self._underloaded += 1
+            self._overloaded = 0
+        else:
+            self._overloaded = self._underloaded = 0
+            return None
+
+        if self._overloaded >= self.down_samples and self._level < len(self.ladder) - 1:
+            self._level += 1
+            self._overloaded = 0
+            return RATE_DOWN
+        if self._underloaded >= self.up_samples and self._level > 0:
+            self._level -= 1
+            self._underloaded = 0
+            return RATE_UP
+        return None
+
+
+RATE_CONTROL_POLICIES = {
+    RATE_POLICY_HYSTERESIS: HysteresisRatePolicy,
+}
+
+
+def create_rate_policy(name: Optional[str], **kwargs) -> Optional[RateControlPolicy]:
+    """Create a registered rate control policy, or None to disable rate control"""
+    name = (name or RATE_POLICY_NONE).lower()
+    if name == RATE_POLICY_NONE:
+        return None
+    policy_class = RATE_CONTROL_POLICIES.get(name)
+    if policy_class is None:
+        logger.warning(f"Unknown rate control policy {name}, rate control disabled")
+        return None
+    return policy_class(**kwargs)
@@ -1,17 +1,51 @@
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, Optional
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple, Union
 import base64
+import json
 import cv2
 import numpy as np
 import logging
 import asyncio
+import time
 from datetime import datetime
-from app.core.websocket import WebSocketManager
+from app.core.websocket import EncodedMessage, WebSocketManager
+from app.api.frame_pipeline import FramePipeline
+from app.api.delta_encoder import ARDeltaEncoder
+from app.api.rate_control import RATE_DOWN, create_rate_policy
+from app.core.metrics import (
+    WEBSOCKET_FRAMES_PROCESSED,
+    WEBSOCKET_FRAMES_DROPPED,
+    RATE_CONTROL_DECISIONS,
+    RATE_CONTROL_TARGET_FPS
+)
+from app.core.serialization import negotiate_encoding
+from app.core.outbound import OVERFLOW_POLICIES
+from app.core.field_mask import (
+    RESULT_FIELDS,
+    FIELD_AR_DATA,
+    FIELD_FACES,
+    FIELD_OBJECTS,
+    STAGE_FACES,
+    STAGE_OBJECTS,
+    FieldMaskError,
+    parse_field_mask,
+    required_stages,
+    run_field_stages
+)
+from app.core.frame_protocol import (
+    FRAME_PROTOCOL_BINARY,
+    FrameProtocolError,
+    decode_binary_frame,
+    negotiate_frame_protocol
+)
 from app.services.video_processor import VideoProcessor
 from app.services.object_detection_service import ObjectDetectionService
 from app.services.face_detection_service import FaceDetectionService
-from app.services.ar_service import ARService
+from app.services.ar_service import ARService, DEPTH_FORMATS, DEPTH_FORMAT_PNG
 from app.services.tracking_service import TrackingService
+from app.services.frame_dedup import FrameDeduplicator
+from app.services.encode_profiles import EncodeProfile, EncodeProfileSelector
+from app.core.link_quality import LinkEstimator
 from app.core.config import get_settings
 from app.services.behavior_analysis_service import BehaviorAnalysisService
 from app.services.geofencing_service import GeofencingService
@@ -19,6 +53,17 @@ from app.services.geofencing_service import GeofencingService
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Bare keepalive reply, coalesced in the outbound buffer like any message type
+PONG_MESSAGE = EncodedMessage("pong", binary=False, coalesce_key="pong")
+
+# Per-client backpressure modes
+BACKPRESSURE_BLOCK = "block"    # receive loop waits for each frame to finish
+BACKPRESSURE_LATEST = "latest"  # keep only the newest unprocessed frame
+BACKPRESSURE_MODES = (BACKPRESSURE_BLOCK, BACKPRESSURE_LATEST)
+
+# Result fields sent when a client declares no field mask
+DEFAULT_FIELDS = frozenset({FIELD_AR_DATA})
+
 class SurveillanceWebSocketHandler:
     def __init__(
         self,
@@ -26,19 +71,28 @@ class SurveillanceWebSocketHandler:
         video_processor: VideoProcessor,
         ar_service: ARService,
         behavior_service: BehaviorAnalysisService,
-        geofencing_service: GeofencingService
+        geofencing_service: GeofencingService,
+        object_detector: ObjectDetectionService,
+        face_detector: FaceDetectionService,
+        tracker: TrackingService,
+        frame_dedup: Optional[FrameDeduplicator] = None
     ):
         """Initialize WebSocket handler with required services"""
         self.websocket_manager = websocket_manager
         self.video_processor = video_processor
         self.ar_service = ar_service
+        self.object_detector = object_detector
+        self.face_detector = face_detector
+        self.tracker = tracker
+        self.frame_dedup = frame_dedup
         self.behavior_service = behavior_service
         self.geofencing_service = geofencing_service
         self._active_connections = {}
-        self._connection_timeouts = {}
         self._max_reconnect_attempts = 3
         self._reconnect_delay = 5
-        self._processing_tasks = {}
+        self._pipelines = {}
+        self._frame_slots = {}
+        self._frame_workers = {}
         
         logger.info("WebSocket handler initialized with all services")
 
@@ -63,10 +117,17 @@ class SurveillanceWebSocketHandler:
             while True:
                 try:
                     message = await asyncio.wait_for(
-                        websocket.receive_json(),
-                        timeout=self._connection_timeouts.get(client_id, 30)
+                        self._receive_message(websocket),
+                        timeout=self.websocket_manager.receive_timeout
                     )
-                    await self._handle_client_message(client_id, message)
+                    # Any inbound traffic counts as an application heartbeat
+                    self.websocket_manager.touch_heartbeat(client_id)
+                    if message is None:
+                        await self.websocket_manager.send_message(client_id, PONG_MESSAGE)
+                    elif isinstance(message, bytes):
+                        await self._process_binary_frame(client_id, message)
+                    else:
+                        await self._handle_client_message(client_id, message)
                 except asyncio.TimeoutError:
                     await self._handle_timeout(client_id)
                     break
@@ -84,14 +145,155 @@ class SurveillanceWebSocketHandler:
 
     async def _initialize_connection(self, websocket: WebSocket, client_id: str):
         """Initialize new client connection"""
-        await websocket.accept()
+        frame_protocol = negotiate_frame_protocol(
+            websocket.query_params.get("frame_protocol")
+        )
+        backpressure = websocket.query_params.get("backpressure", BACKPRESSURE_BLOCK).lower()
+        if backpressure not in BACKPRESSURE_MODES:
+            logger.warning(f"Unsupported backpressure mode requested by {client_id}: {backpressure}")
+            backpressure = BACKPRESSURE_BLOCK
+
+        try:
+            pipeline_depth = int(websocket.query_params.get("pipeline_depth", settings.WS_PIPELINE_DEPTH))
+        except ValueError:
+            pipeline_depth = settings.WS_PIPELINE_DEPTH
+        pipeline_depth = max(1, min(pipeline_depth, settings.WS_MAX_PIPELINE_DEPTH))
+
+        capabilities = self._parse_list(websocket.query_params.get("capabilities"))
+        depth_size = self._parse_size(websocket.query_params.get("depth_size"))
+        depth_format = websocket.query_params.get("depth_format", DEPTH_FORMAT_PNG).lower()
+        if depth_format not in DEPTH_FORMATS:
+            depth_format = DEPTH_FORMAT_PNG
+
+        delta_encoder = None
+        if websocket.query_params.get("delta", "").lower() in ("1", "true", "yes"):
+            delta_encoder = ARDeltaEncoder(
+                keyframe_interval=settings.WS_DELTA_KEYFRAME_INTERVAL,
+                position_tolerance=settings.WS_DELTA_POSITION_TOLERANCE,
+                confidence_tolerance=settings.WS_DELTA_CONFIDENCE_TOLERANCE
+            )
+
+        # Opt-in: clients that never asked for rate_control messages get none
+        rate_policy = create_rate_policy(
+            websocket.query_params.get("rate_control", settings.RATE_CONTROL_POLICY),
+            latency_high=settings.RATE_CONTROL_LATENCY_HIGH,
+            latency_low=settings.RATE_CONTROL_LATENCY_LOW,
+            down_samples=settings.RATE_CONTROL_DOWN_SAMPLES,
+            up_samples=settings.RATE_CONTROL_UP_SAMPLES
+        )
+
+        # Progressive clients get objects, then faces, then AR/behavior as each is ready
+        progressive = websocket.query_params.get("progressive", "").lower() in ("1", "true", "yes")
+        default_fields = RESULT_FIELDS if progressive else DEFAULT_FIELDS
+        try:
+            fields = parse_field_mask(websocket.query_params.get("fields")) or default_fields
+        except FieldMaskError as e:
+            logger.warning(f"Invalid field mask requested by {client_id}: {e}")
+            fields = default_fields
+
+        encoding = negotiate_encoding(websocket.query_params.get("encoding"))
+        overflow_policy = websocket.query_params.get("overflow", settings.WS_OUTBOUND_POLICY).lower()
+        if overflow_policy not in OVERFLOW_POLICIES:
+            logger.warning(f"Unsupported overflow policy requested by {client_id}: {overflow_policy}")
+            overflow_policy = settings.WS_OUTBOUND_POLICY
+
+        await self.websocket_manager.connect(
+            websocket, client_id, encoding=encoding, overflow_policy=overflow_policy
+        )
         self._active_connections[client_id] = {
             "websocket": websocket,
             "connected_at": datetime.now(),
             "last_activity": datetime.now(),
-            "reconnect_attempts": 0
+            "reconnect_attempts": 0,
+            "frame_protocol": frame_protocol,
+            "encoding": encoding,
+            "backpressure": backpressure,
+            "pipeline_depth": pipeline_depth,
+            "delta_encoder": delta_encoder,
+            "capabilities": capabilities,
+            "depth_size": depth_size,
+            "depth_format": depth_format,
+            "rate_policy": rate_policy,
+            "fields": fields,
+            "progressive": progressive,
+            "next_sequence": 0,
+            "link": LinkEstimator(),
+            "encode_profile": EncodeProfileSelector(),
+            "stats": {
+                "frames_received": 0,
+                "frames_processed": 0,
+                "frames_dropped": 0
+            }
         }
-        logger.info(f"Client {client_id} connected successfully")
+
+        self._pipelines[client_id] = FramePipeline(
+            depth=pipeline_depth,
+            concurrent_stage=lambda item: self._detect_frame(client_id, *item),
+            ordered_stage=lambda item, detections: self._track_and_send(client_id, *item, *detections),
+            name=f"client {client_id}"
+        )
+
+        if rate_policy:
+            RATE_CONTROL_TARGET_FPS.labels(client_id=client_id).set(rate_policy.current.fps)
+
+        if backpressure == BACKPRESSURE_LATEST:
+            self._frame_slots[client_id] = {"frame": None, "event": asyncio.Event()}
+            self._frame_workers[client_id] = asyncio.create_task(
+                self._latest_frame_worker(client_id)
+            )
+
+        await self.websocket_manager.send_message(
+            client_id,
+            {
+                "type": "connection_ack",
+                "frame_protocol": frame_protocol,
+                "encoding": encoding,
+                "overflow": overflow_policy,
+                "backpressure": backpressure,
+                "pipeline_depth": pipeline_depth,
+                "delta": delta_encoder is not None,
+                "capabilities": sorted(capabilities),
+                "fields": sorted(fields),
+                "progressive": progressive,
+                "rate_control": rate_policy.current.to_dict() if rate_policy else None,
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+        logger.info(f"Client {client_id} connected successfully ({frame_protocol} frames)")
+
+    def _parse_list(self, value: Optional[str]) -> Set[str]:
+        """Parse a comma-separated query parameter"""
+        if not value:
+            return set()
+        return {item.strip().lower() for item in value.split(",") if item.strip()}
+
+    def _parse_size(self, value: Optional[str]) -> Optional[Tuple[int, int]]:
+        """Parse a WIDTHxHEIGHT query parameter"""
+        if not value:
+            return None
+        try:
+            width, height = (int(part) for part in value.lower().split("x", 1))
+            if width > 0 and height > 0:
+                return width, height
+        except ValueError:
+            pass
+        logger.warning(f"Invalid size parameter: {value}")
+        return None
+
+    async def _receive_message(self, websocket: WebSocket) -> Union[Dict, bytes, None]:
+        """Receive the next text (JSON) or binary message from the client
+
+        Returns None for a bare "ping" keepalive, which skips JSON parsing.
+        """
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+
+        if message.get("bytes") is not None:
+            return message["bytes"]
+        if message["text"] == "ping":
+            return None
+        return json.loads(message["text"])
 
     async def _handle_reconnection(self, websocket: WebSocket, client_id: str):
         """Handle client reconnection attempt"""
@@ -118,74 +320,419 @@ class SurveillanceWebSocketHandler:
             await self._process_frame(client_id, message)
         elif message["type"] == "metadata":
             await self._process_metadata(client_id, message)
+        elif message["type"] == "resync":
+            delta_encoder = self._active_connections.get(client_id, {}).get("delta_encoder")
+            if delta_encoder:
+                delta_encoder.request_keyframe()
+        elif message["type"] == "network_report":
+            self._process_network_report(client_id, message)
+        elif message["type"] == "stats":
+            await self.websocket_manager.send_message(
+                client_id,
+                {"type": "client_stats", **self.get_client_stats(client_id)}
+            )
         else:
             logger.warning(f"Unknown message type from client {client_id}")
 
     async def _process_frame(self, client_id: str, frame_data: Dict):
-        """Process incoming frame with error handling"""
+        """Process incoming JSON frame with base64 encoded image data"""
         try:
-            # Extract and decode frame
             frame_bytes = base64.b64decode(frame_data["frame_data"])
-            frame = self.video_processor.bytes_to_frame(frame_bytes)
-            
-            # Create processing task
-            task = asyncio.create_task(
-                self._process_frame_data(client_id, frame, frame_data.get("metadata", {}))
-            )
-            self._processing_tasks[client_id] = task
-            
-            # Wait for processing with timeout
-            try:
-                await asyncio.wait_for(task, timeout=5.0)
-            except asyncio.TimeoutError:
-                logger.error(f"Frame processing timeout for client {client_id}")
-                task.cancel()
-                
+            await self._submit_frame(client_id, frame_bytes, frame_data.get("metadata", {}))
         except Exception as e:
             logger.error(f"Error processing frame for client {client_id}: {e}")
 
-    async def _process_frame_data(self, client_id: str, frame: np.ndarray, metadata: Dict):
-        """Process frame data and send results to client"""
+    async def _process_binary_frame(self, client_id: str, message: bytes):
+        """Process incoming binary frame (header + metadata + raw JPEG)"""
+        conn_info = self._active_connections.get(client_id, {})
+        if conn_info.get("frame_protocol") != FRAME_PROTOCOL_BINARY:
+            logger.warning(f"Binary frame from client {client_id} without negotiated binary protocol")
+            return
+
         try:
-            # Preprocess frame
-            processed_frame = await self.video_processor.preprocess_frame(frame)
-            
-            # Run detections
-            objects = await self.object_detector.detect(processed_frame)
-            faces = await self.face_detector.detect_faces(processed_frame)
-            
-            # Update tracking
-            tracked_objects = await self.tracker.update(objects, frame=processed_frame)
-            
-            # Generate AR data
-            ar_data = await self.ar_service.process_frame(
-                frame=processed_frame,
-                faces=faces,
-                tracked_objects=tracked_objects
-            )
-            
-            # Send results
+            frame = decode_binary_frame(message)
+            metadata = {
+                **frame.metadata,
+                "sequence": frame.sequence,
+                "capture_timestamp": frame.timestamp
+            }
+            await self._submit_frame(client_id, frame.payload, metadata)
+        except FrameProtocolError as e:
+            logger.warning(f"Invalid binary frame from client {client_id}: {e}")
             await self.websocket_manager.send_message(
                 client_id,
                 {
-                    "type": "frame_processed",
-                    "ar_data": ar_data,
-                    "metadata": metadata,
+                    "type": "error",
+                    "error": "invalid_frame",
+                    "message": str(e),
                     "timestamp": datetime.now().isoformat()
                 }
             )
+        except Exception as e:
+            logger.error(f"Error processing binary frame for client {client_id}: {e}")
+
+    async def _submit_frame(self, client_id: str, frame_bytes: Union[bytes, memoryview], metadata: Dict):
+        """Hand a received frame to the client's processing path"""
+        received_at = time.monotonic()
+        frame_key = None
+        if self.frame_dedup is not None:
+            frame_key = self.frame_dedup.frame_key(frame_bytes)
+
+        conn_info = self._active_connections.get(client_id)
+        if conn_info:
+            conn_info["stats"]["frames_received"] += 1
+            # Tag untagged frames so progressive clients can match partial results up
+            if conn_info.get("progressive"):
+                if "sequence" not in metadata:
+                    metadata = {**metadata, "sequence": conn_info["next_sequence"]}
+                if isinstance(metadata["sequence"], int):
+                    conn_info["next_sequence"] = metadata["sequence"] + 1
+
+        slot = self._frame_slots.get(client_id)
+        if slot is not None:
+            # Latest-frame-wins: replace any frame the worker has not picked up yet
+            if slot["frame"] is not None:
+                self._record_dropped_frame(client_id)
+            slot["frame"] = (frame_bytes, metadata, received_at, frame_key)
+            slot["event"].set()
+            return
+
+        await self._run_frame(client_id, frame_bytes, metadata, received_at, frame_key)
+
+    async def _latest_frame_worker(self, client_id: str):
+        """Process the newest pending frame for a latest-frame-wins client"""
+        slot = self._frame_slots[client_id]
+        while True:
+            try:
+                await slot["event"].wait()
+                slot["event"].clear()
+                pending, slot["frame"] = slot["frame"], None
+                if pending is None:
+                    continue
+
+                await self._run_frame(client_id, *pending)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in latest-frame worker for client {client_id}: {e}")
+
+    async def _run_frame(
+        self,
+        client_id: str,
+        frame_bytes: Union[bytes, memoryview],
+        metadata: Dict,
+        received_at: float,
+        frame_key: Optional[Tuple] = None
+    ):
+        """Admit a frame into the client's pipeline, waiting while it is full"""
+        pipeline = self._pipelines.get(client_id)
+        if pipeline is None:
+            return
+        try:
+            await pipeline.submit((frame_bytes, metadata, received_at, frame_key))
+        except Exception as e:
+            logger.error(f"Error submitting frame for client {client_id}: {e}")
+
+    def _process_network_report(self, client_id: str, message: Dict):
+        """Update a client's link estimates from its own measurements
+
+        ``rtt_ms`` is a round trip timed by the client (e.g. ping to pong) and
+        ``downlink_kbps`` the rate at which it is actually receiving data.
+        """
+        conn_info = self._active_connections.get(client_id)
+        if not conn_info:
+            return
+        link = conn_info["link"]
+        try:
+            if message.get("rtt_ms") is not None:
+                link.observe_rtt(float(message["rtt_ms"]) / 1000.0)
+            if message.get("downlink_kbps") is not None:
+                link.observe_throughput(float(message["downlink_kbps"]) * 1000.0 / 8.0)
+        except (TypeError, ValueError):
+            logger.warning(f"Invalid network report from client {client_id}")
+            return
+        conn_info["encode_profile"].update(link)
+
+    def get_encode_profile(self, client_id: str) -> Optional[EncodeProfile]:
+        """JPEG profile for frames sent to a client, chosen from its reported link quality"""
+        conn_info = self._active_connections.get(client_id)
+        if not conn_info:
+            return None
+        return conn_info["encode_profile"].profile
+
+    def _record_processed_frame(self, client_id: str):
+        """Count a frame whose results were sent to the client"""
+        conn_info = self._active_connections.get(client_id)
+        if conn_info:
+            conn_info["stats"]["frames_processed"] += 1
+        WEBSOCKET_FRAMES_PROCESSED.labels(client_id=client_id).inc()
+
+    def _record_dropped_frame(self, client_id: str):
+        """Count a stale frame replaced before it was processed"""
+        conn_info = self._active_connections.get(client_id)
+        if conn_info:
+            conn_info["stats"]["frames_dropped"] += 1
+        WEBSOCKET_FRAMES_DROPPED.labels(client_id=client_id).inc()
+
+    def _pipeline_occupancy(self, client_id: str) -> float:
+        """Fraction of the client's pipeline in use, counting a waiting latest frame"""
+        pipeline = self._pipelines.get(client_id)
+        if pipeline is None:
+            return 0.0
+        in_flight = pipeline.in_flight
+        slot = self._frame_slots.get(client_id)
+        if slot is not None and slot["frame"] is not None:
+            in_flight += 1
+        return in_flight / pipeline.depth
+
+    async def _observe_load(self, client_id: str, latency: float):
+        """Feed a frame's latency to the rate policy and tell the client about target changes"""
+        conn_info = self._active_connections.get(client_id)
+        rate_policy = conn_info.get("rate_policy") if conn_info else None
+        if rate_policy is None:
+            return
+
+        direction = rate_policy.observe(latency, self._pipeline_occupancy(client_id))
+        if direction is None:
+            return
+
+        target = rate_policy.current
+        RATE_CONTROL_DECISIONS.labels(policy=rate_policy.name, direction=direction).inc()
+        RATE_CONTROL_TARGET_FPS.labels(client_id=client_id).set(target.fps)
+        logger.info(f"Rate control {direction} for client {client_id}: {target}")
+        await self.websocket_manager.send_message(
+            client_id,
+            {
+                "type": "rate_control",
+                **target.to_dict(),
+                "reason": "overloaded" if direction == RATE_DOWN else "recovered",
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+
+    def get_client_stats(self, client_id: str) -> Dict:
+        """Get frame counters for a connected client"""
+        conn_info = self._active_connections.get(client_id)
+        if not conn_info:
+            return {}
+        rate_policy = conn_info.get("rate_policy")
+        return {
+            "client_id": client_id,
+            "backpressure": conn_info["backpressure"],
+            "rate_control": rate_policy.current.to_dict() if rate_policy else None,
+            "encode_profile": conn_info["encode_profile"].profile.name,
+            **conn_info["stats"],
+            **self.websocket_manager.get_outbound_stats(client_id)
+        }
+
+    def _frame_fields(self, client_id: str, metadata: Dict) -> FrozenSet[str]:
+        """Field mask for a frame: per-frame metadata overrides the connection's"""
+        conn_fields = self._active_connections.get(client_id, {}).get("fields", DEFAULT_FIELDS)
+        try:
+            return parse_field_mask(metadata.get("fields")) or conn_fields
+        except FieldMaskError as e:
+            logger.warning(f"Invalid field mask in frame from client {client_id}: {e}")
+            return conn_fields
+
+    async def _detect_frame(
+        self,
+        client_id: str,
+        frame_bytes: Union[bytes, memoryview],
+        metadata: Dict,
+        received_at: float,
+        frame_key: Optional[Tuple]
+    ):
+        """Concurrent stage: decode, preprocess and detect (runs for several frames at once)"""
+        fields = self._frame_fields(client_id, metadata)
+        progressive = self._active_connections.get(client_id, {}).get("progressive", False)
+        try:
+            processed_frame, objects, pending_faces = await asyncio.wait_for(
+                self._decode_and_detect(client_id, frame_bytes, required_stages(fields), frame_key),
+                timeout=5.0
+            )
+            if progressive:
+                # Faces finish in the ordered stage, after the object boxes went out
+                return processed_frame, objects, pending_faces, fields
+
+            faces = []
+            if pending_faces is not None:
+                faces = await asyncio.wait_for(pending_faces, timeout=5.0)
+            return processed_frame, objects, faces, fields
+        except asyncio.TimeoutError:
+            logger.error(f"Frame processing timeout for client {client_id}")
+            await self._observe_load(client_id, time.monotonic() - received_at)
+            raise
+
+    async def _decode_and_detect(
+        self,
+        client_id: str,
+        frame_bytes: Union[bytes, memoryview],
+        stages: FrozenSet[str],
+        frame_key: Optional[Tuple] = None
+    ):
+        """Decode frame off the event loop and run the needed detectors concurrently
+
+        With a frame key, decoding and detection are shared with every other
+        client relaying the same frame.
+        """
+        # Shared work is cancelled when its last waiter leaves, so it has no single owner
+        owner = client_id if frame_key is None else None
+
+        # Decode straight from the received buffer, then preprocess
+        processed_frame = await self._shared(
+            frame_key, "decode", lambda: self._decode_frame(frame_bytes), cache=False
+        )
+
+        # Run only the detections the client's fields depend on; face detection
+        # is returned still running so progressive clients need not wait for it
+        pending_faces = None
+        if STAGE_FACES in stages:
+            pending_faces = asyncio.create_task(self._shared(
+                frame_key, STAGE_FACES,
+                lambda: self.face_detector.detect_faces(processed_frame, owner=owner)
+            ))
+        try:
+            objects = []
+            if STAGE_OBJECTS in stages:
+                objects = await self._shared(
+                    frame_key, STAGE_OBJECTS,
+                    lambda: self.object_detector.detect(processed_frame, owner=owner)
+                )
+        except BaseException:
+            if pending_faces is not None:
+                pending_faces.cancel()
+            raise
+        return processed_frame, objects, pending_faces
+
+    async def _decode_frame(self, frame_bytes: Union[bytes, memoryview]) -> np.ndarray:
+        """Decode in the executor and preprocess a received frame"""
+        loop = asyncio.get_running_loop()
+        frame = await loop.run_in_executor(None, self.video_processor.bytes_to_frame, frame_bytes)
+        processed_frame, _ = await self.video_processor.preprocess_frame(frame)
+        return processed_frame
+
+    async def _shared(self, frame_key: Optional[Tuple], stage: str, factory, cache: bool = True):
+        """Run a per-frame stage once across clients when the frame has a dedup key"""
+        if self.frame_dedup is None or frame_key is None:
+            return await factory()
+        return await self.frame_dedup.run((frame_key, stage), factory, cache=cache)
+
+    async def _track_and_send(
+        self,
+        client_id: str,
+        frame_bytes: Union[bytes, memoryview],
+        metadata: Dict,
+        received_at: float,
+        frame_key: Optional[Tuple],
+        processed_frame: np.ndarray,
+        objects: List[Dict],
+        faces: Union[List[Dict], asyncio.Task, None],
+        fields: FrozenSet[str]
+    ):
+        """Ordered stage: run the remaining stages the fields need and send results in sequence
+
+        For progressive clients ``faces`` is the still-running face detection
+        task; tracked objects and faces are each pushed as a ``frame_partial``
+        as soon as they are ready.
+        """
+        try:
+            conn_info = self._active_connections.get(client_id, {})
+            progressive = conn_info.get("progressive", False)
+            sequence = metadata.get("sequence")
+            message = {
+                "type": "frame_processed",
+                "metadata": metadata,
+                "timestamp": datetime.now().isoformat()
+            }
+            if progressive:
+                message["sequence"] = sequence
+
+            async def send_partial(field: str, value):
+                if field in (FIELD_OBJECTS, FIELD_FACES):
+                    await self._send_partial(client_id, sequence, field, value)
+
+            # Generate AR data with the depth map packed as the client requested
+            async def ar(detected_faces: List[Dict], tracked_objects: List[Dict]):
+                return await self.ar_service.process_frame(
+                    frame=processed_frame,
+                    faces=detected_faces,
+                    tracked_objects=tracked_objects,
+                    include_depth="depth" in conn_info.get("capabilities", ()),
+                    depth_size=conn_info.get("depth_size"),
+                    depth_format=conn_info.get("depth_format", DEPTH_FORMAT_PNG)
+                )
+
+            results = await run_field_stages(
+                fields,
+                asyncio.wait_for(faces, timeout=5.0) if isinstance(faces, asyncio.Task) else faces,
+                objects,
+                track=lambda detected: self.tracker.update(detected, frame=processed_frame),
+                ar=ar,
+                behavior=self.behavior_service.analyze,
+                geofencing=self.geofencing_service.check_violations,
+                on_ready=send_partial if progressive else None
+            )
+            if progressive:
+                # Already pushed as frame_partial messages
+                results.pop(FIELD_OBJECTS, None)
+                results.pop(FIELD_FACES, None)
+
+            # Send AR data as a delta against the last sent state if negotiated
+            delta_encoder = conn_info.get("delta_encoder")
+            if delta_encoder and FIELD_AR_DATA in results:
+                # A dropped outbound message leaves the client out of sync; resend a keyframe
+                dropped = self.websocket_manager.get_outbound_stats(client_id).get("messages_dropped", 0)
+                if dropped != conn_info.get("outbound_dropped", 0):
+                    conn_info["outbound_dropped"] = dropped
+                    delta_encoder.request_keyframe()
+                results["ar_delta"] = delta_encoder.encode(results.pop(FIELD_AR_DATA))
+            message.update(results)
+
+            await self.websocket_manager.send_message(client_id, message)
+            self._record_processed_frame(client_id)
+            await self._observe_load(client_id, time.monotonic() - received_at)
             
         except Exception as e:
             logger.error(f"Error in frame processing pipeline: {e}")
             raise
+        finally:
+            if isinstance(faces, asyncio.Task) and not faces.done():
+                faces.cancel()
+
+    async def _send_partial(self, client_id: str, sequence: Optional[int], field: str, value):
+        """Push one stage's results for a frame ahead of the full frame_processed message"""
+        await self.websocket_manager.send_message(
+            client_id,
+            {
+                "type": "frame_partial",
+                "stage": field,
+                "sequence": sequence,
+                field: value,
+                "timestamp": datetime.now().isoformat()
+            }
+        )
 
     async def _cleanup_client(self, client_id: str):
         """Cleanup client resources"""
         try:
-            # Cancel any pending processing tasks
-            if client_id in self._processing_tasks:
-                self._processing_tasks[client_id].cancel()
-                del self._processing_tasks[client_id]
+            # Stop the latest-frame worker and release any pending frame
+            if client_id in self._frame_workers:
+                self._frame_workers.pop(client_id).cancel()
+            self._frame_slots.pop(client_id, None)
+
+            # Cancel any in-flight frames and drop their queued inference requests
+            if client_id in self._pipelines:
+                await self._pipelines.pop(client_id).close()
+            self.object_detector.purge(client_id)
+            self.face_detector.purge(client_id)
+
+            # Drop per-client metric series
+            for metric in (WEBSOCKET_FRAMES_PROCESSED, WEBSOCKET_FRAMES_DROPPED, RATE_CONTROL_TARGET_FPS):
+                try:
+                    metric.remove(client_id)
+                except KeyError:
+                    pass
             
             # Disconnect from WebSocket manager
             await self.websocket_manager.disconnect(client_id)
@@ -200,12 +747,17 @@ class SurveillanceWebSocketHandler:
             await self.face_detector.cleanup()
             
             # Cancel all processing tasks
-            for task in self._processing_tasks.values():
+            tasks = list(self._frame_workers.values())
+            for task in tasks:
                 task.cancel()
             
             # Wait for tasks to complete
-            if self._processing_tasks:
-                await asyncio.gather(*self._processing_tasks.values(), return_exceptions=True)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            await asyncio.gather(
+                *(pipeline.close() for pipeline in self._pipelines.values()),
+                return_exceptions=True
+            )
                 
         except Exception as e:
             logger.error(f"Error in handler cleanup: {e}")
\ No newline at end of file
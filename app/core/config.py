@@ -30,17 +30,56 @@ class Settings(BaseSettings):
     WS_PORT: int = 8000
     WS_PING_INTERVAL: int = 30
     WS_CONNECTION_TIMEOUT: int = 60
+    WS_HEARTBEAT_MODE: str = "protocol"  # protocol (server ping/pong liveness) or app (reap clients silent for 30s)
     MAX_CONNECTIONS_PER_CLIENT: int = 3
+    WS_SEND_TIMEOUT: float = 10.0  # seconds before a stalled client socket is dropped
+    WS_OUTBOUND_BUFFER_SIZE: int = 100  # pending outbound messages per client
+    WS_OUTBOUND_POLICY: str = "drop_oldest"  # drop_oldest, coalesce or disconnect
+    WS_PUBSUB_BACKEND: str = "memory"  # memory (single worker) or unix (multi-worker broker)
+    WS_PUBSUB_SOCKET_PATH: str = "/tmp/person_of_interest_ws.sock"
+    WS_PUBSUB_SUBSCRIBER_QUEUE_SIZE: int = 1000  # frames the broker buffers per worker before dropping
+    WS_PIPELINE_DEPTH: int = 3  # frames in flight per client
+    WS_MAX_PIPELINE_DEPTH: int = 8
+    WS_DELTA_KEYFRAME_INTERVAL: int = 30  # frames between full AR keyframes
+    WS_DELTA_POSITION_TOLERANCE: float = 2.0  # pixels
+    WS_DELTA_CONFIDENCE_TOLERANCE: float = 0.05
+    RATE_CONTROL_POLICY: str = "none"  # default for clients that do not pass ?rate_control=hysteresis
+    RATE_CONTROL_LATENCY_HIGH: float = 0.25  # seconds from receipt to result
+    RATE_CONTROL_LATENCY_LOW: float = 0.1
+    RATE_CONTROL_DOWN_SAMPLES: int = 3  # consecutive overloaded frames before stepping down
+    RATE_CONTROL_UP_SAMPLES: int = 30  # consecutive idle frames before stepping up
     
     # ML Model Settings
     YOLO_MODEL_PATH: str = "yolov8n.pt"
     FACE_MODEL_PATH: str = "models/face_detection_model.dat"
     MIN_DETECTION_CONFIDENCE: float = 0.5
+    DETECTION_BACKEND: str = "auto"  # auto, torch (in-process thread), process_pool or onnx
+    OBJECT_DETECTION_WORKERS: int = 2  # inference processes (process_pool) or threads (onnx)
+    ONNX_MODEL_PATH: str = ""  # defaults to the YOLO weights exported to .onnx alongside them
+    DETECTION_INPUT_SIZE: int = 640  # letterboxed input size for the onnx backend
+    DETECTION_PRECISION: str = "fp32"  # onnx backend: fp32, int8_dynamic or int8_static (see scripts/quantize_detector.py)
+    FACE_DETECTION_WORKERS: int = 2  # MediaPipe detector instances, one per thread
+    DETECTION_SHM_SLOT_BYTES: int = 1920 * 1080 * 3  # largest frame passed by shared memory
+    DETECTION_MAX_BATCH_SIZE: int = 8
+    DETECTION_MAX_BATCH_DELAY_MS: float = 10.0  # max wait for the oldest frame in a batch
+    DETECTION_BATCH_PAD_SIZES: List[int] = []  # fixed batch shapes, e.g. [1, 2, 4, 8]; empty disables padding
     
     # Video Processing Settings
     MAX_VIDEO_DIMENSION: int = 1280
     JPEG_QUALITY: int = 85
     MAX_FRAME_QUEUE_SIZE: int = 100
+    DEPTH_MAP_MAX_WIDTH: int = 320  # default depth map width sent to clients
+    DEPTH_MAP_DOWNSCALE: int = 4  # compute depth at 1/N resolution
+    DEPTH_MAP_DTYPE: str = "float32"  # "float32" or "int16" Sobel arithmetic
+    MAX_DETECTION_BATCH_FRAMES: int = 32
+    MAX_TRACKED_CAMERAS: int = 256
+    FRAME_DEDUP_ENABLED: bool = True  # share inference for identical frames across clients
+    FRAME_DEDUP_TTL: float = 1.0  # seconds detection results stay shareable
+    
+    # Recorded Video Ingest Settings
+    VIDEO_INGEST_ROOT: str = "recordings"
+    VIDEO_INGEST_EXTENSIONS: List[str] = [".mp4", ".mkv", ".mov", ".avi"]
+    VIDEO_INGEST_QUEUE_SIZE: int = 8
     
     # Logging
     LOG_LEVEL: str = "INFO"
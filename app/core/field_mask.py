@@ -0,0 +1,112 @@
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional, Union
+import inspect
+
+# Result fields a client can request
+FIELD_FACES = "faces"
+FIELD_OBJECTS = "objects"
+FIELD_AR_DATA = "ar_data"
+FIELD_BEHAVIOR = "behavior_analysis"
+FIELD_GEOFENCING = "geofencing_alerts"
+RESULT_FIELDS = frozenset({
+    FIELD_FACES, FIELD_OBJECTS, FIELD_AR_DATA, FIELD_BEHAVIOR, FIELD_GEOFENCING
+})
+
+# Pipeline stages
+STAGE_FACES = "face_detection"
+STAGE_OBJECTS = "object_detection"  # detection plus tracking
+STAGE_AR = "ar"
+STAGE_BEHAVIOR = "behavior"
+STAGE_GEOFENCING = "geofencing"
+
+# Stages each field depends on
+FIELD_STAGES = {
+    FIELD_FACES: {STAGE_FACES},
+    FIELD_OBJECTS: {STAGE_OBJECTS},
+    FIELD_AR_DATA: {STAGE_FACES, STAGE_OBJECTS, STAGE_AR},
+    FIELD_BEHAVIOR: {STAGE_OBJECTS, STAGE_BEHAVIOR},
+    FIELD_GEOFENCING: {STAGE_OBJECTS, STAGE_GEOFENCING},
+}
+
+
+class FieldMaskError(ValueError):
+    """Raised for a field mask naming unknown result fields"""
+
+
+def parse_field_mask(value: Union[None, str, Iterable[str]]) -> Optional[FrozenSet[str]]:
+    """Parse a comma-separated string or list of fields; None means every field"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(",")
+    fields = frozenset(field.strip().lower() for field in value if field.strip())
+    if not fields:
+        return None
+
+    unknown = fields - RESULT_FIELDS
+    if unknown:
+        raise FieldMaskError(
+            f"Unknown result fields: {', '.join(sorted(unknown))} "
+            f"(expected any of {', '.join(sorted(RESULT_FIELDS))})"
+        )
+    return fields
+
+
+def required_stages(fields: Optional[FrozenSet[str]]) -> FrozenSet[str]:
+    """Pipeline stages needed to produce the requested fields"""
+    stages = set()
+    for field in RESULT_FIELDS if fields is None else fields:
+        stages |= FIELD_STAGES[field]
+    return frozenset(stages)
+
+
+async def run_field_stages(
+    fields: Optional[FrozenSet[str]],
+    faces: Union[List[Dict], Awaitable[List[Dict]], None],
+    objects: Optional[List[Dict]],
+    track: Callable[[List[Dict]], Awaitable[List[Dict]]],
+    ar: Optional[Callable[[List[Dict], List[Dict]], Awaitable[Any]]] = None,
+    behavior: Optional[Callable[[List[Dict]], Awaitable[Any]]] = None,
+    geofencing: Optional[Callable[[List[Dict]], Awaitable[Any]]] = None,
+    on_ready: Optional[Callable[[str, Any], Awaitable[None]]] = None
+) -> Dict[str, Any]:
+    """Run the post-detection stages the fields need and return the requested fields
+
+    Tracking runs before a still-pending ``faces`` awaitable is awaited, so
+    object results never wait for face detection. ``on_ready`` is called with
+    each requested field as soon as it is computed. Stages without a callable
+    are skipped.
+    """
+    stages = required_stages(fields)
+    results = {}
+
+    async def ready(field: str, value: Any):
+        results[field] = value
+        if on_ready is not None and (fields is None or field in fields):
+            await on_ready(field, value)
+
+    tracked_objects = []
+    try:
+        if STAGE_OBJECTS in stages:
+            tracked_objects = await track(objects or [])
+            await ready(FIELD_OBJECTS, tracked_objects)
+        if inspect.isawaitable(faces):
+            faces = await faces
+    finally:
+        # Tracking failed before a pending face detection was awaited
+        if inspect.iscoroutine(faces):
+            faces.close()
+    faces = faces or []
+    if STAGE_FACES in stages:
+        await ready(FIELD_FACES, faces)
+
+    if STAGE_AR in stages and ar is not None:
+        await ready(FIELD_AR_DATA, await ar(faces, tracked_objects))
+    if STAGE_BEHAVIOR in stages and behavior is not None:
+        await ready(FIELD_BEHAVIOR, await behavior(tracked_objects))
+    if STAGE_GEOFENCING in stages and geofencing is not None:
+        await ready(FIELD_GEOFENCING, await geofencing(tracked_objects))
+
+    # Drop fields computed only as inputs to other stages
+    if fields is None:
+        return results
+    return {field: value for field, value in results.items() if field in fields}
@@ -0,0 +1,97 @@
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional
+import json
+import struct
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Frame protocols a client can negotiate at connect time
+FRAME_PROTOCOL_JSON = "json"
+FRAME_PROTOCOL_BINARY = "binary"
+SUPPORTED_FRAME_PROTOCOLS = (FRAME_PROTOCOL_JSON, FRAME_PROTOCOL_BINARY)
+
+FRAME_PROTOCOL_VERSION = 1
+
+# Binary frame header (network byte order, 16 bytes):
+#   version (u8) | flags (u8) | metadata length (u16) | sequence (u32) | capture timestamp (f64)
+# followed by `metadata length` bytes of UTF-8 JSON metadata and the raw JPEG payload.
+FRAME_HEADER = struct.Struct("!BBHId")
+MAX_METADATA_LENGTH = 0xFFFF
+
+
+class FrameProtocolError(ValueError):
+    """Raised when a binary frame message cannot be parsed"""
+
+
+@dataclass
+class BinaryFrame:
+    sequence: int
+    timestamp: float
+    payload: memoryview
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    flags: int = 0
+
+
+def negotiate_frame_protocol(requested: Optional[str]) -> str:
+    """Resolve the frame protocol requested by a client, defaulting to JSON"""
+    if requested and requested.lower() in SUPPORTED_FRAME_PROTOCOLS:
+        return requested.lower()
+    if requested:
+        logger.warning(f"Unsupported frame protocol requested: {requested}")
+    return FRAME_PROTOCOL_JSON
+
+
+def encode_binary_frame(
+    payload: bytes,
+    sequence: int,
+    timestamp: Optional[float] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    flags: int = 0
+) -> bytes:
+    """Pack a JPEG payload into a binary frame message"""
+    metadata_bytes = json.dumps(metadata).encode("utf-8") if metadata else b""
+    if len(metadata_bytes) > MAX_METADATA_LENGTH:
+        raise FrameProtocolError("Frame metadata too large")
+
+    header = FRAME_HEADER.pack(
+        FRAME_PROTOCOL_VERSION,
+        flags,
+        len(metadata_bytes),
+        sequence & 0xFFFFFFFF,
+        timestamp if timestamp is not None else time.time()
+    )
+    return b"".join((header, metadata_bytes, payload))
+
+
+def decode_binary_frame(message: bytes) -> BinaryFrame:
+    """Parse a binary frame message without copying the JPEG payload"""
+    view = memoryview(message)
+    if len(view) < FRAME_HEADER.size:
+        raise FrameProtocolError("Binary frame shorter than header")
+
+    version, flags, metadata_length, sequence, timestamp = FRAME_HEADER.unpack_from(view)
+    if version != FRAME_PROTOCOL_VERSION:
+        raise FrameProtocolError(f"Unsupported binary frame version: {version}")
+
+    payload_offset = FRAME_HEADER.size + metadata_length
+    if len(view) <= payload_offset:
+        raise FrameProtocolError("Binary frame has no image payload")
+
+    metadata = {}
+    if metadata_length:
+        try:
+            metadata = json.loads(bytes(view[FRAME_HEADER.size:payload_offset]))
+        except ValueError as e:
+            raise FrameProtocolError(f"Invalid frame metadata: {e}")
+        if not isinstance(metadata, dict):
+            raise FrameProtocolError("Frame metadata must be a JSON object")
+
+    return BinaryFrame(
+        sequence=sequence,
+        timestamp=timestamp,
+        payload=view[payload_offset:],
+        metadata=metadata,
+        flags=flags
+    )
@@ -0,0 +1,60 @@
+from typing import Dict, List, Optional, Tuple
+import heapq
+import itertools
+
+
+class DeadlineHeap:
+    """Min-heap of per-client expiry deadlines
+
+    Each client has exactly one heap entry. Refreshing a deadline only updates
+    a dict (O(1)); the stale heap entry is re-pushed with the real deadline
+    when it surfaces. Reaping therefore costs O(expired log n) instead of a
+    scan over every connection.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, str]] = []
+        self._entries: Dict[str, Tuple[float, int]] = {}
+        self._generation = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def touch(self, key: str, deadline: float):
+        """Set or push back a client's deadline"""
+        entry = self._entries.get(key)
+        if entry is None:
+            generation = next(self._generation)
+            heapq.heappush(self._heap, (deadline, generation, key))
+        else:
+            generation = entry[1]
+        self._entries[key] = (deadline, generation)
+
+    def remove(self, key: str):
+        """Forget a client; its heap entry is discarded lazily"""
+        self._entries.pop(key, None)
+
+    def next_deadline(self) -> Optional[float]:
+        """Earliest deadline in the heap (may be earlier than the real one)"""
+        return self._heap[0][0] if self._heap else None
+
+    def pop_expired(self, now: float) -> List[str]:
+        """Remove and return clients whose deadline has passed"""
+        expired = []
+        while self._heap and self._heap[0][0] <= now:
+            _, generation, key = heapq.heappop(self._heap)
+            entry = self._entries.get(key)
+            if entry is None or entry[1] != generation:
+                continue  # removed (or removed and reconnected)
+
+            deadline = entry[0]
+            if deadline > now:
+                heapq.heappush(self._heap, (deadline, generation, key))
+                continue
+
+            del self._entries[key]
+            expired.append(key)
+        return expired
@@ -0,0 +1,30 @@
+from typing import Optional
+
+
+class LinkEstimator:
+    """EWMA estimates of a client's downstream throughput and round-trip time
+
+    Both come from the client's own network reports. Timing server-side
+    socket writes would only measure how fast the kernel send buffer fills,
+    not what reaches the client.
+    """
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self.throughput: Optional[float] = None  # bytes per second
+        self.rtt: Optional[float] = None  # seconds
+
+    def observe_throughput(self, bytes_per_second: float):
+        """Record downstream throughput measured by the client"""
+        if bytes_per_second > 0:
+            self.throughput = self._ewma(self.throughput, bytes_per_second)
+
+    def observe_rtt(self, seconds: float):
+        """Record a round-trip time measured by the client"""
+        if seconds >= 0:
+            self.rtt = self._ewma(self.rtt, seconds)
+
+    def _ewma(self, current: Optional[float], sample: float) -> float:
+        if current is None:
+            return sample
+        return current + self.alpha * (sample - current)
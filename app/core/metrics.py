@@ -28,6 +28,76 @@ ERROR_COUNT = Counter(
     ['service', 'type']
 )
 
+WEBSOCKET_FRAMES_PROCESSED = Counter(
+    'websocket_frames_processed_total',
+    'Frames processed per WebSocket client',
+    ['client_id']
+)
+
+WEBSOCKET_FRAMES_DROPPED = Counter(
+    'websocket_frames_dropped_total',
+    'Stale frames dropped per WebSocket client',
+    ['client_id']
+)
+
+WEBSOCKET_OUTBOUND_DEPTH = Gauge(
+    'websocket_outbound_queue_depth',
+    'Messages waiting in a WebSocket client outbound buffer',
+    ['client_id']
+)
+
+WEBSOCKET_OUTBOUND_DROPPED = Counter(
+    'websocket_outbound_dropped_total',
+    'Outbound messages dropped or coalesced on buffer overflow',
+    ['client_id']
+)
+
+RATE_CONTROL_DECISIONS = Counter(
+    'rate_control_decisions_total',
+    'Rate control target changes sent to camera clients',
+    ['policy', 'direction']
+)
+
+RATE_CONTROL_TARGET_FPS = Gauge(
+    'rate_control_target_fps',
+    'Current rate control target fps per WebSocket client',
+    ['client_id']
+)
+
+INFERENCE_REQUESTS_SKIPPED = Counter(
+    'inference_requests_skipped_total',
+    'Queued inference requests skipped because nobody was waiting for them',
+    ['service', 'reason']
+)
+
+FRAME_DEDUP_REQUESTS = Counter(
+    'frame_dedup_requests_total',
+    'Frame processing requests by deduplication outcome',
+    ['outcome']
+)
+
+FACE_DETECTION_POOL_SIZE = Gauge(
+    'face_detection_pool_size',
+    'MediaPipe face detector instances in the pool'
+)
+
+FACE_DETECTION_POOL_BUSY = Gauge(
+    'face_detection_pool_busy',
+    'Face detector instances currently processing a frame'
+)
+
+DETECTION_BATCH_SIZE = Histogram(
+    'detection_batch_size',
+    'Frames per object detection batch',
+    buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+
+DETECTION_BATCH_WAIT = Histogram(
+    'detection_batch_wait_seconds',
+    'Time a frame waited in the queue before its detection batch was flushed',
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
 class MetricsMiddleware:
     async def __call__(self, request, call_next):
         start_time = time.time()
@@ -0,0 +1,79 @@
+from collections import deque
+from typing import Any, Callable, Deque, Hashable, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Overflow policies for a client's outbound buffer
+OVERFLOW_DROP_OLDEST = "drop_oldest"  # evict the oldest pending message
+OVERFLOW_COALESCE = "coalesce"        # replace the oldest pending message with the same key
+OVERFLOW_DISCONNECT = "disconnect"    # give up on the client
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_COALESCE, OVERFLOW_DISCONNECT)
+
+
+class OutboundOverflow(Exception):
+    """Raised when a disconnect-on-overflow buffer is full"""
+
+
+class OutboundBuffer:
+    """Bounded per-client outbound message buffer drained by a single writer task
+
+    ``put`` never blocks, so producers (inference, broadcasts) never wait on
+    a client's network write. When the buffer is full the overflow policy
+    decides what is lost.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 100,
+        policy: str = OVERFLOW_DROP_OLDEST,
+        type_of: Optional[Callable[[Any], Optional[Hashable]]] = None
+    ):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self.dropped = 0
+        self._type_of = type_of or (lambda message: None)
+        self._items: Deque[Any] = deque()
+        self._ready = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, message: Any) -> bool:
+        """Enqueue a message; returns False if an older message was dropped to make room"""
+        dropped = False
+        if len(self._items) >= self.maxsize:
+            if self.policy == OVERFLOW_DISCONNECT:
+                raise OutboundOverflow(f"Outbound buffer full ({self.maxsize} messages)")
+            self._evict(message)
+            self.dropped += 1
+            dropped = True
+
+        self._items.append(message)
+        self._ready.set()
+        return not dropped
+
+    def _evict(self, incoming: Any):
+        """Make room for an incoming message according to the policy"""
+        if self.policy == OVERFLOW_COALESCE:
+            message_type = self._type_of(incoming)
+            if message_type is not None:
+                for index, pending in enumerate(self._items):
+                    if self._type_of(pending) == message_type:
+                        del self._items[index]
+                        return
+        self._items.popleft()
+
+    async def get(self) -> Any:
+        """Wait for and remove the next message"""
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._items.popleft()
+
+    def clear(self):
+        """Discard all pending messages"""
+        self._items.clear()
@@ -0,0 +1,251 @@
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, Optional
+import asyncio
+import fcntl
+import logging
+import os
+import struct
+from app.core.config import get_settings
+from app.core.metrics import ERROR_COUNT
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+PUBSUB_MEMORY = "memory"
+PUBSUB_UNIX = "unix"
+
+MessageHandler = Callable[[bytes], Awaitable[None]]
+
+# Length-prefixed frames on the broker socket
+FRAME_LENGTH = struct.Struct("!I")
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+
+class PubSubBackend(ABC):
+    """Delivers every published payload to the handler of every subscribed worker"""
+
+    @abstractmethod
+    async def start(self, handler: MessageHandler):
+        """Subscribe this worker; ``handler`` receives every published payload"""
+
+    @abstractmethod
+    async def publish(self, payload: bytes):
+        """Publish a payload to all workers, including this one"""
+
+    @abstractmethod
+    async def stop(self):
+        """Unsubscribe and release resources"""
+
+
+class InMemoryPubSub(PubSubBackend):
+    """Single-process backend: publishing delivers straight to the local handler"""
+
+    def __init__(self):
+        self._handler: Optional[MessageHandler] = None
+
+    async def start(self, handler: MessageHandler):
+        self._handler = handler
+
+    async def publish(self, payload: bytes):
+        if self._handler is not None:
+            await self._handler(payload)
+
+    async def stop(self):
+        self._handler = None
+
+
+class _BrokerSubscriber:
+    """Broker side of one worker's connection, with its own bounded send queue"""
+
+    def __init__(self, writer: asyncio.StreamWriter, queue_size: int):
+        self.writer = writer
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.task = asyncio.create_task(self._write_frames())
+
+    def send(self, frame: bytes):
+        """Queue a frame without waiting; a worker that falls behind loses frames, not others"""
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            ERROR_COUNT.labels(service="pubsub", type="subscriber_overflow").inc()
+
+    async def _write_frames(self):
+        try:
+            while True:
+                frame = await self.queue.get()
+                self.writer.write(frame)
+                await self.writer.drain()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error relaying to pub/sub subscriber: {e}")
+            self.writer.close()
+
+    def close(self):
+        self.task.cancel()
+        self.writer.close()
+
+
+class UnixSocketPubSub(PubSubBackend):
+    """Multi-worker backend relaying payloads through a local Unix socket broker
+
+    The first worker to take the lock file hosts the broker; every worker,
+    including the host, connects to it as a subscriber. If the host dies the
+    OS releases the lock and the next worker to reconnect takes over.
+    Payloads published while the broker is unreachable are delivered locally
+    only. The broker writes to each worker from its own task and queue of
+    ``subscriber_queue_size`` frames, so a slow worker cannot hold up the rest.
+    """
+
+    def __init__(self, socket_path: str, reconnect_delay: float = 1.0, subscriber_queue_size: int = 1000):
+        self.socket_path = socket_path
+        self.reconnect_delay = reconnect_delay
+        self.subscriber_queue_size = subscriber_queue_size
+        self._handler: Optional[MessageHandler] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._subscriber_task: Optional[asyncio.Task] = None
+        self._broker: Optional[asyncio.AbstractServer] = None
+        self._broker_clients: Dict[asyncio.StreamWriter, _BrokerSubscriber] = {}
+        self._lock_fd: Optional[int] = None
+        self._write_lock = asyncio.Lock()
+
+    async def start(self, handler: MessageHandler):
+        self._handler = handler
+        self._subscriber_task = asyncio.create_task(self._subscribe_forever())
+
+    async def publish(self, payload: bytes):
+        if len(payload) > MAX_FRAME_SIZE:
+            raise ValueError(f"Published payload too large ({len(payload)} bytes)")
+
+        writer = self._writer
+        if writer is None or writer.is_closing():
+            logger.warning("Pub/sub broker unreachable, delivering locally only")
+            if self._handler is not None:
+                await self._handler(payload)
+            return
+
+        async with self._write_lock:
+            writer.write(FRAME_LENGTH.pack(len(payload)) + payload)
+            await writer.drain()
+
+    async def stop(self):
+        if self._subscriber_task is not None:
+            self._subscriber_task.cancel()
+            try:
+                await self._subscriber_task
+            except asyncio.CancelledError:
+                pass
+        if self._writer is not None:
+            self._writer.close()
+        if self._broker is not None:
+            self._broker.close()
+            for subscriber in list(self._broker_clients.values()):
+                subscriber.close()
+            await self._broker.wait_closed()
+            self._remove_socket_file()
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    async def _subscribe_forever(self):
+        """Keep a subscriber connection to the broker, hosting it if nobody does"""
+        while True:
+            try:
+                await self._ensure_broker()
+                reader, self._writer = await asyncio.open_unix_connection(self.socket_path)
+                logger.info(f"Subscribed to pub/sub broker at {self.socket_path}")
+
+                while True:
+                    payload = await self._read_frame(reader)
+                    if payload is None:
+                        break
+                    try:
+                        await self._handler(payload)
+                    except Exception as e:
+                        ERROR_COUNT.labels(service="pubsub", type="handler").inc()
+                        logger.error(f"Error handling published message: {e}")
+
+                logger.warning("Pub/sub broker connection closed")
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                ERROR_COUNT.labels(service="pubsub", type="subscribe").inc()
+                logger.error(f"Pub/sub subscriber error: {e}")
+            finally:
+                if self._writer is not None:
+                    self._writer.close()
+                    self._writer = None
+
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _ensure_broker(self):
+        """Host the broker if this worker can take the broker lock"""
+        if self._broker is not None:
+            return
+
+        if self._lock_fd is None:
+            fd = os.open(f"{self.socket_path}.lock", os.O_CREAT | os.O_RDWR, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return  # another worker hosts the broker
+            self._lock_fd = fd
+
+        # Holding the lock means any existing socket file is stale
+        self._remove_socket_file()
+        self._broker = await asyncio.start_unix_server(self._serve_subscriber, path=self.socket_path)
+        logger.info(f"Hosting pub/sub broker at {self.socket_path} (pid {os.getpid()})")
+
+    async def _serve_subscriber(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Broker side: relay every frame from a subscriber to all subscribers"""
+        subscriber = self._broker_clients[writer] = _BrokerSubscriber(writer, self.subscriber_queue_size)
+        try:
+            while True:
+                payload = await self._read_frame(reader)
+                if payload is None:
+                    break
+                frame = FRAME_LENGTH.pack(len(payload)) + payload
+                for client in list(self._broker_clients.values()):
+                    client.send(frame)
+        except Exception as e:
+            logger.error(f"Pub/sub broker connection error: {e}")
+        finally:
+            self._broker_clients.pop(writer, None)
+            subscriber.close()
+
+    async def _read_frame(self, reader: asyncio.StreamReader) -> Optional[bytes]:
+        """Read one length-prefixed frame, or None at end of stream"""
+        try:
+            header = await reader.readexactly(FRAME_LENGTH.size)
+        except asyncio.IncompleteReadError:
+            return None
+        (length,) = FRAME_LENGTH.unpack(header)
+        if length > MAX_FRAME_SIZE:
+            raise ValueError(f"Pub/sub frame too large ({length} bytes)")
+        try:
+            return await reader.readexactly(length)
+        except asyncio.IncompleteReadError:
+            return None
+
+    def _remove_socket_file(self):
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+
+def create_pubsub_backend(backend: Optional[str] = None) -> PubSubBackend:
+    """Create the pub/sub backend selected in settings"""
+    backend = (backend or settings.WS_PUBSUB_BACKEND).lower()
+    if backend == PUBSUB_UNIX:
+        return UnixSocketPubSub(
+            settings.WS_PUBSUB_SOCKET_PATH,
+            subscriber_queue_size=settings.WS_PUBSUB_SUBSCRIBER_QUEUE_SIZE
+        )
+    if backend != PUBSUB_MEMORY:
+        logger.warning(f"Unknown pub/sub backend {backend}, using in-memory")
+    return InMemoryPubSub()
@@ -0,0 +1,197 @@
+from typing import Any, Dict, Optional, Tuple, Union
+import base64
+import json
+import logging
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional fast JSON encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional binary encoding
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # pragma: no cover - optional binary encoding
+    cbor2 = None
+
+logger = logging.getLogger(__name__)
+
+ENCODING_JSON = "json"
+ENCODING_MSGPACK = "msgpack"
+ENCODING_CBOR = "cbor"
+
+# MessagePack extension type for NumPy arrays: payload is msgpack([dtype, shape, raw bytes])
+MSGPACK_NDARRAY_EXT_TYPE = 1
+
+# RFC 8746 typed array tags (little-endian) and the multi-dimensional array tag
+CBOR_TYPED_ARRAY_TAGS = {
+    "|u1": 64,
+    "<u2": 69,
+    "<u4": 70,
+    "<u8": 71,
+    "|i1": 72,
+    "<i2": 77,
+    "<i4": 78,
+    "<i8": 79,
+    "<f2": 84,
+    "<f4": 85,
+    "<f8": 86,
+}
+CBOR_MULTI_DIM_ARRAY_TAG = 40
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Encodings supported by the installed libraries"""
+    encodings = [ENCODING_JSON]
+    if msgpack is not None:
+        encodings.append(ENCODING_MSGPACK)
+    if cbor2 is not None:
+        encodings.append(ENCODING_CBOR)
+    return tuple(encodings)
+
+
+def negotiate_encoding(requested: Optional[str]) -> str:
+    """Resolve the message encoding requested by a client, defaulting to JSON"""
+    if requested and requested.lower() in available_encodings():
+        return requested.lower()
+    if requested:
+        logger.warning(f"Unsupported message encoding requested: {requested}")
+    return ENCODING_JSON
+
+
+class MessageEncoder:
+    """Encode outbound WebSocket messages in a negotiated format
+
+    JSON produces text frames; MessagePack and CBOR produce binary frames in
+    which NumPy arrays are packed as typed binary blobs instead of nested
+    lists of numbers.
+    """
+
+    def __init__(self, encoding: str = ENCODING_JSON):
+        if encoding not in available_encodings():
+            raise ValueError(f"Encoding not available: {encoding}")
+        self.encoding = encoding
+
+    @property
+    def is_binary(self) -> bool:
+        """Whether encoded messages are sent as binary WebSocket frames"""
+        return self.encoding != ENCODING_JSON
+
+    def encode(self, message: Dict[str, Any]) -> Union[str, bytes]:
+        """Serialize a message for the wire"""
+        if self.encoding == ENCODING_MSGPACK:
+            return msgpack.packb(message, default=_msgpack_default, use_bin_type=True)
+        if self.encoding == ENCODING_CBOR:
+            return cbor2.dumps(message, default=_cbor_default)
+        if orjson is not None:
+            return orjson.dumps(
+                message,
+                default=_json_default,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            ).decode("utf-8")
+        return json.dumps(message, default=_json_default)
+
+
+def pack_relay(message: Any) -> bytes:
+    """Serialize a message relayed between workers, keeping bytes and NumPy arrays intact
+
+    Each worker re-encodes relayed messages for its clients' negotiated
+    encodings, so the relay format must not downgrade binary values the way
+    JSON does. Falls back to JSON when MessagePack is not installed.
+    """
+    if msgpack is not None:
+        return msgpack.packb(message, default=_msgpack_default, use_bin_type=True)
+    return json.dumps(message, default=_json_default).encode("utf-8")
+
+
+def unpack_relay(payload: bytes) -> Any:
+    """Inverse of ``pack_relay``"""
+    if msgpack is not None:
+        return msgpack.unpackb(payload, ext_hook=_msgpack_ext_hook, raw=False, strict_map_key=False)
+    return json.loads(payload)
+
+
+def encode_binary_fields(value: Any) -> Any:
+    """Replace binary attachments with base64 text for JSON-only consumers"""
+    if isinstance(value, dict):
+        return {key: encode_binary_fields(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode_binary_fields(item) for item in value]
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(value).decode("ascii")
+    return value
+
+
+_encoders: Dict[str, MessageEncoder] = {}
+
+
+def get_encoder(encoding: str = ENCODING_JSON) -> MessageEncoder:
+    """Get the shared encoder for an encoding"""
+    encoder = _encoders.get(encoding)
+    if encoder is None:
+        encoder = _encoders[encoding] = MessageEncoder(encoding)
+    return encoder
+
+
+def _json_default(value: Any) -> Any:
+    """JSON fallback for NumPy values and binary attachments"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(value).decode("ascii")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _msgpack_default(value: Any) -> Any:
+    """MessagePack fallback: NumPy arrays become typed extension blobs"""
+    if isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        payload = msgpack.packb(
+            [array.dtype.str, list(array.shape), array.tobytes()],
+            use_bin_type=True
+        )
+        return msgpack.ExtType(MSGPACK_NDARRAY_EXT_TYPE, payload)
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, memoryview):
+        return value.tobytes()
+    raise TypeError(f"Object of type {type(value).__name__} is not MessagePack serializable")
+
+
+def _msgpack_ext_hook(code: int, data: bytes) -> Any:
+    """Rebuild NumPy arrays packed by ``_msgpack_default``"""
+    if code != MSGPACK_NDARRAY_EXT_TYPE:
+        return msgpack.ExtType(code, data)
+    dtype, shape, raw = msgpack.unpackb(data, raw=False)
+    return np.frombuffer(raw, dtype=np.dtype(dtype)).reshape(shape)
+
+
+def _cbor_default(encoder, value: Any):
+    """CBOR fallback: NumPy arrays become RFC 8746 typed arrays"""
+    if isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        array = array.astype(array.dtype.newbyteorder("<"), copy=False)
+        tag = CBOR_TYPED_ARRAY_TAGS.get(array.dtype.str)
+        if tag is None:
+            encoder.encode(array.tolist())
+            return
+        typed_array = cbor2.CBORTag(tag, array.tobytes())
+        if array.ndim == 1:
+            encoder.encode(typed_array)
+        else:
+            encoder.encode(cbor2.CBORTag(CBOR_MULTI_DIM_ARRAY_TAG, [list(array.shape), typed_array]))
+        return
+    if isinstance(value, np.generic):
+        encoder.encode(value.item())
+        return
+    if isinstance(value, memoryview):
+        encoder.encode(value.tobytes())
+        return
+    raise TypeError(f"Object of type {type(value).__name__} is not CBOR serializable")
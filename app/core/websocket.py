@@ -1,29 +1,86 @@
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, Set, Optional
+from typing import Dict, Hashable, Set, Optional, Union
+from dataclasses import dataclass
 import logging
 import asyncio
-from datetime import datetime, timedelta
-from app.core.metrics import WEBSOCKET_CONNECTIONS, ERROR_COUNT
+import time
+from datetime import timedelta
+from app.core.metrics import (
+    WEBSOCKET_CONNECTIONS,
+    WEBSOCKET_OUTBOUND_DEPTH,
+    WEBSOCKET_OUTBOUND_DROPPED,
+    ERROR_COUNT
+)
+from app.core.outbound import OutboundBuffer, OutboundOverflow
+from app.core.heartbeat import DeadlineHeap
 from app.core.config import get_settings
+from app.core.serialization import ENCODING_JSON, MessageEncoder, get_encoder, pack_relay, unpack_relay
+from app.core.pubsub import PubSubBackend, create_pubsub_backend
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+@dataclass(frozen=True)
+class EncodedMessage:
+    """Message already serialized for a client's negotiated encoding"""
+    payload: Union[str, bytes]
+    binary: bool
+    coalesce_key: Optional[Hashable] = None
+
+
+def _coalesce_key(message: Union[dict, EncodedMessage]) -> Optional[Hashable]:
+    """Key under which a pending outbound message may be replaced by a newer one
+
+    Messages coalesce by type, except partial results, which only stand in
+    for the same stage of the same frame.
+    """
+    if isinstance(message, EncodedMessage):
+        return message.coalesce_key
+    if message.get("type") == "frame_partial":
+        return message["type"], message.get("stage"), message.get("sequence")
+    return message.get("type")
+
+
 class WebSocketManager:
-    def __init__(self):
+    def __init__(self, pubsub: Optional[PubSubBackend] = None):
         self.active_connections: Dict[str, WebSocket] = {}
-        self.client_heartbeats: Dict[str, datetime] = {}
-        self.client_message_queues: Dict[str, asyncio.Queue] = {}
+        self.client_heartbeats = DeadlineHeap()
+        self.client_outbound: Dict[str, OutboundBuffer] = {}
+        self.client_writers: Dict[str, asyncio.Task] = {}
+        self.client_encoders: Dict[str, MessageEncoder] = {}
         self.heartbeat_interval = timedelta(seconds=30)
+        # In protocol mode the server's WebSocket ping/pong closes dead
+        # sockets, and an idle client that answers pings is never reaped
+        self.app_heartbeats = settings.WS_HEARTBEAT_MODE.lower() == "app"
+        self.send_timeout = settings.WS_SEND_TIMEOUT
+        self.pubsub = pubsub or create_pubsub_backend()
         self._cleanup_task = asyncio.create_task(self._periodic_cleanup())
+        self._pubsub_task = asyncio.create_task(self.pubsub.start(self._handle_published))
+
+    async def close(self):
+        """Stop background tasks and leave the pub/sub backend"""
+        self._cleanup_task.cancel()
+        await self.pubsub.stop()
 
-    async def connect(self, websocket: WebSocket, client_id: str):
+    async def connect(
+        self,
+        websocket: WebSocket,
+        client_id: str,
+        encoding: str = ENCODING_JSON,
+        overflow_policy: Optional[str] = None
+    ):
         """Handle new client connection"""
         try:
             await websocket.accept()
             self.active_connections[client_id] = websocket
-            self.client_heartbeats[client_id] = datetime.now()
-            self.client_message_queues[client_id] = asyncio.Queue(maxsize=100)
+            self.touch_heartbeat(client_id)
+            self.client_outbound[client_id] = OutboundBuffer(
+                maxsize=settings.WS_OUTBOUND_BUFFER_SIZE,
+                policy=overflow_policy or settings.WS_OUTBOUND_POLICY,
+                type_of=_coalesce_key
+            )
+            self.client_encoders[client_id] = get_encoder(encoding)
+            self.client_writers[client_id] = asyncio.create_task(self._client_writer(client_id))
             WEBSOCKET_CONNECTIONS.inc()
             logger.info(f"Client {client_id} connected")
         except Exception as e:
@@ -34,84 +91,159 @@ class WebSocketManager:
     async def disconnect(self, client_id: str):
         """Handle client disconnection"""
         try:
-            if client_id in self.active_connections:
-                await self.active_connections[client_id].close()
-                del self.active_connections[client_id]
-                del self.client_heartbeats[client_id]
-                del self.client_message_queues[client_id]
-                WEBSOCKET_CONNECTIONS.dec()
-                logger.info(f"Client {client_id} disconnected")
+            websocket = self.active_connections.pop(client_id, None)
+            if websocket is None:
+                return
+
+            self.client_heartbeats.remove(client_id)
+            self.client_encoders.pop(client_id, None)
+            outbound = self.client_outbound.pop(client_id, None)
+            if outbound is not None:
+                outbound.clear()
+
+            # Stop the writer unless it is the one disconnecting
+            writer = self.client_writers.pop(client_id, None)
+            if writer is not None and writer is not asyncio.current_task():
+                writer.cancel()
+
+            for metric in (WEBSOCKET_OUTBOUND_DEPTH, WEBSOCKET_OUTBOUND_DROPPED):
+                try:
+                    metric.remove(client_id)
+                except KeyError:
+                    pass
+
+            WEBSOCKET_CONNECTIONS.dec()
+            await websocket.close()
+            logger.info(f"Client {client_id} disconnected")
         except Exception as e:
             ERROR_COUNT.labels(service="websocket", type="disconnection").inc()
             logger.error(f"Error disconnecting client {client_id}: {e}")
 
-    async def send_message(self, client_id: str, message: dict):
-        """Send message to client with queuing"""
+    async def send_message(self, client_id: str, message: Union[dict, EncodedMessage]):
+        """Queue message for the client's writer task without waiting on the network"""
         try:
-            if client_id not in self.active_connections:
+            outbound = self.client_outbound.get(client_id)
+            if outbound is None:
                 return
 
-            queue = self.client_message_queues[client_id]
             try:
-                await asyncio.wait_for(
-                    queue.put(message),
-                    timeout=1.0
-                )
-                await self._process_message_queue(client_id)
-            except asyncio.TimeoutError:
-                logger.warning(f"Message queue full for client {client_id}")
+                if not outbound.put(message):
+                    WEBSOCKET_OUTBOUND_DROPPED.labels(client_id=client_id).inc()
+                WEBSOCKET_OUTBOUND_DEPTH.labels(client_id=client_id).set(len(outbound))
+            except OutboundOverflow as e:
+                logger.warning(f"Disconnecting client {client_id}: {e}")
                 ERROR_COUNT.labels(service="websocket", type="queue_full").inc()
+                await self.disconnect(client_id)
 
         except Exception as e:
             ERROR_COUNT.labels(service="websocket", type="send_message").inc()
             logger.error(f"Error sending message to client {client_id}: {e}")
             await self.disconnect(client_id)
 
-    async def _process_message_queue(self, client_id: str):
-        """Process queued messages for client"""
+    def get_outbound_stats(self, client_id: str) -> Dict:
+        """Get outbound queue depth and drop count for a client"""
+        outbound = self.client_outbound.get(client_id)
+        if outbound is None:
+            return {}
+        return {
+            "queue_depth": len(outbound),
+            "queue_size": outbound.maxsize,
+            "overflow_policy": outbound.policy,
+            "messages_dropped": outbound.dropped
+        }
+
+    async def _client_writer(self, client_id: str):
+        """Long-lived task that owns the client's socket and drains its outbound buffer"""
         try:
-            queue = self.client_message_queues[client_id]
+            outbound = self.client_outbound[client_id]
             websocket = self.active_connections[client_id]
+            encoder = self.client_encoders[client_id]
+
+            while True:
+                message = await outbound.get()
+                WEBSOCKET_OUTBOUND_DEPTH.labels(client_id=client_id).set(len(outbound))
+                if not isinstance(message, EncodedMessage):
+                    message = EncodedMessage(encoder.encode(message), encoder.is_binary)
 
-            while not queue.empty():
-                message = await queue.get()
-                await websocket.send_json(message)
-                queue.task_done()
+                if message.binary:
+                    await asyncio.wait_for(websocket.send_bytes(message.payload), timeout=self.send_timeout)
+                else:
+                    await asyncio.wait_for(websocket.send_text(message.payload), timeout=self.send_timeout)
 
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            logger.error(f"Error processing message queue for {client_id}: {e}")
+            ERROR_COUNT.labels(service="websocket", type="writer").inc()
+            logger.error(f"Error writing to client {client_id}: {e}")
             await self.disconnect(client_id)
 
+    @property
+    def receive_timeout(self) -> Optional[float]:
+        """Seconds a client may stay silent, or None when protocol pings decide liveness"""
+        if not self.app_heartbeats:
+            return None
+        return self.heartbeat_interval.total_seconds()
+
+    def touch_heartbeat(self, client_id: str):
+        """Push back a client's expiry deadline (O(1), safe to call per message)"""
+        if not self.app_heartbeats:
+            return
+        self.client_heartbeats.touch(
+            client_id, time.monotonic() + self.heartbeat_interval.total_seconds()
+        )
+
     async def _periodic_cleanup(self):
-        """Cleanup stale connections"""
+        """Cleanup stale connections as their heartbeat deadlines expire"""
         while True:
             try:
-                await asyncio.sleep(60)  # Run every minute
-                current_time = datetime.now()
-                stale_clients = [
-                    client_id for client_id, last_heartbeat 
-                    in self.client_heartbeats.items()
-                    if current_time - last_heartbeat > self.heartbeat_interval
-                ]
-                
-                for client_id in stale_clients:
+                # Wake at the earliest deadline, at least once a second
+                next_deadline = self.client_heartbeats.next_deadline()
+                delay = 1.0
+                if next_deadline is not None:
+                    delay = min(delay, max(0.0, next_deadline - time.monotonic()))
+                await asyncio.sleep(delay)
+
+                for client_id in self.client_heartbeats.pop_expired(time.monotonic()):
                     logger.warning(f"Removing stale connection for client {client_id}")
                     await self.disconnect(client_id)
 
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Error in connection cleanup: {e}")
+                await asyncio.sleep(1)
 
     async def broadcast(self, message: dict, exclude: Optional[Set[str]] = None):
-        """Broadcast message to all connected clients"""
-        exclude = exclude or set()
-        tasks = []
-        
-        for client_id in self.active_connections:
-            if client_id not in exclude:
-                tasks.append(self.send_message(client_id, message))
-                
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
-
-# Global WebSocket manager instance
-ws_manager = WebSocketManager() 
\ No newline at end of file
+        """Publish a message once for delivery to the clients of every worker"""
+        try:
+            # Relayed losslessly so binary clients still get bytes and arrays
+            envelope = {"message": message, "exclude": sorted(exclude or ())}
+            await self.pubsub.publish(pack_relay(envelope))
+        except Exception as e:
+            ERROR_COUNT.labels(service="websocket", type="broadcast").inc()
+            logger.error(f"Error publishing broadcast: {e}")
+
+    async def _handle_published(self, payload: bytes):
+        """Deliver a published broadcast to this worker's clients"""
+        envelope = unpack_relay(payload)
+        await self._local_broadcast(envelope["message"], set(envelope.get("exclude", ())))
+
+    async def _local_broadcast(self, message: dict, exclude: Set[str]):
+        """Send message to this worker's clients, serializing once per encoding"""
+        recipients = [
+            client_id for client_id in list(self.active_connections)
+            if client_id not in exclude
+        ]
+
+        # Encode once per negotiated encoding, then hand the same payload to each
+        # client's writer; slow receivers only fill their own outbound buffer
+        encoded: Dict[str, EncodedMessage] = {}
+        for client_id in recipients:
+            encoder = self.client_encoders.get(client_id)
+            if encoder is None:
+                continue
+            if encoder.encoding not in encoded:
+                encoded[encoder.encoding] = EncodedMessage(
+                    encoder.encode(message), encoder.is_binary, _coalesce_key(message)
+                )
+            await self.send_message(client_id, encoded[encoder.encoding])
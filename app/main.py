@@ -1,11 +1,14 @@
-from fastapi import FastAPI, HTTPException, Response, WebSocket
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, ValidationError
 import numpy as np
 import cv2
 import base64
-from typing import List, Dict, Optional
+from typing import List, Dict, FrozenSet, Optional, Tuple
 from datetime import datetime
+import asyncio
 import logging
 from prometheus_client import generate_latest, CONTENT_TYPE_LATEST, Counter, Histogram
 import warnings
@@ -19,23 +22,43 @@ from app.services.ar_service import ARService
 from app.services.behavior_analysis_service import BehaviorAnalysisService
 from app.services.geofencing_service import GeofencingService
 from app.services.video_processor import VideoProcessor
+from app.services.video_ingest_service import VideoIngestService
+from app.services.frame_dedup import FrameDeduplicator
+from app.services.camera_registry import CameraServiceRegistry
 from app.ml_engine import MLEngine
 
 # Import core components
+from app.core.config import get_settings
 from app.core.websocket import WebSocketManager
 from app.core.auth import WebSocketAuthManager
+from app.core.field_mask import (
+    STAGE_FACES,
+    STAGE_OBJECTS,
+    FieldMaskError,
+    parse_field_mask,
+    required_stages,
+    run_field_stages
+)
 
 # Set up logging
+settings = get_settings()
 logger = logging.getLogger(__name__)
 
 # Import models
-from app.models.detection import Detection, FaceLandmarks, DetectionResponse
-from app.models.frame import FrameRequest
+from app.models.detection import (
+    Detection,
+    FaceLandmarks,
+    DetectionResponse,
+    BatchFrameResult,
+    BatchDetectionResponse
+)
+from app.models.frame import FrameRequest, BatchFrameRequest, VideoIngestRequest
 
 # Import routes
 from app.api.routes import auth
 from app.api.websocket_handler import SurveillanceWebSocketHandler
 from app.api.websocket_routes import router as websocket_router
+from app.api.frame_upload import FRAME_UPLOAD_OPENAPI, read_frame_upload
 
 app = FastAPI(title="Person of Interest API")
 
@@ -52,6 +75,12 @@ behavior_analyzer = BehaviorAnalysisService()
 geofencing = GeofencingService()
 video_processor = VideoProcessor()
 
+# Shared across clients so frames relayed by several viewers are inferred once
+frame_dedup = FrameDeduplicator(ttl=settings.FRAME_DEDUP_TTL) if settings.FRAME_DEDUP_ENABLED else None
+
+# Per-camera tracking state for batch uploads
+camera_services = CameraServiceRegistry(maxsize=settings.MAX_TRACKED_CAMERAS)
+
 # Initialize ML engine with services
 ml_engine = MLEngine(
     face_detector=face_detector,
@@ -60,6 +89,7 @@ ml_engine = MLEngine(
     ar_service=ar_service,
     behavior_analyzer=behavior_analyzer
 )
+video_ingest = VideoIngestService(ml_engine)
 
 # Initialize WebSocket handler
 ws_handler = SurveillanceWebSocketHandler(
@@ -67,7 +97,11 @@ ws_handler = SurveillanceWebSocketHandler(
     video_processor=video_processor,
     ar_service=ar_service,
     behavior_service=behavior_analyzer,
-    geofencing_service=geofencing
+    geofencing_service=geofencing,
+    object_detector=object_detector,
+    face_detector=face_detector,
+    tracker=tracker,
+    frame_dedup=frame_dedup
 )
 
 # Configure CORS
@@ -92,32 +126,63 @@ app.include_router(
 async def health_check():
     return {"status": "healthy"}
 
-async def process_frame(image: np.ndarray) -> DetectionResponse:
+async def analyze_detections(
+    image: np.ndarray,
+    faces: Optional[List[Dict]],
+    objects: Optional[List[Dict]],
+    frame_tracker: TrackingService,
+    frame_behavior_analyzer: BehaviorAnalysisService,
+    include_depth: bool = False,
+    fields: Optional[FrozenSet[str]] = None
+) -> Dict:
+    """Run the tracking, AR, behavior and geofencing stages the requested fields need"""
+    return await run_field_stages(
+        fields, faces, objects,
+        track=lambda detected: frame_tracker.update(detected, frame=image),
+        # AR data carries the depth map only for clients that render occlusion
+        ar=lambda detected_faces, tracked_objects: ar_service.process_frame(
+            image, detected_faces, tracked_objects, include_depth=include_depth
+        ),
+        behavior=frame_behavior_analyzer.analyze,
+        geofencing=geofencing.check_violations
+    )
+
+def detection_stages(fields: Optional[FrozenSet[str]]) -> Tuple[bool, bool]:
+    """Whether the requested fields need (face detection, object detection)"""
+    stages = required_stages(fields)
+    return STAGE_FACES in stages, STAGE_OBJECTS in stages
+
+def parse_fields_param(value: Optional[str]) -> Optional[FrozenSet[str]]:
+    """Parse a ``fields`` query parameter, rejecting unknown fields with a 400"""
+    try:
+        return parse_field_mask(value)
+    except FieldMaskError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "Invalid field mask", "message": str(e)}
+        )
+
+def wants_depth(metadata: Optional[Dict]) -> bool:
+    """Whether frame metadata declares the depth map capability"""
+    return "depth" in ((metadata or {}).get("capabilities") or [])
+
+async def process_frame(
+    image: np.ndarray,
+    include_depth: bool = False,
+    fields: Optional[FrozenSet[str]] = None
+) -> DetectionResponse:
     """Process a frame using the initialized services"""
     try:
-        # Detect faces and objects
-        faces = await face_detector.detect_faces(image)
-        objects = await object_detector.detect(image)
-        
-        # Update tracking with frame
-        tracked_objects = await tracker.update(objects, frame=image)
-        
-        # Get AR data
-        ar_data = await ar_service.process_frame(image, faces, tracked_objects)
-        
-        # Analyze behavior
-        behavior_data = await behavior_analyzer.analyze(tracked_objects)
+        # Detect faces and objects, skipping detectors no requested field needs
+        need_faces, need_objects = detection_stages(fields)
+        faces = await face_detector.detect_faces(image) if need_faces else None
+        objects = await object_detector.detect(image) if need_objects else None
         
-        # Check geofencing
-        geofencing_alerts = await geofencing.check(tracked_objects)
-        
-        return DetectionResponse(
-            faces=faces,
-            objects=tracked_objects,
-            ar_data=ar_data,
-            behavior_analysis=behavior_data,
-            geofencing_alerts=geofencing_alerts
+        results = await analyze_detections(
+            image, faces, objects, tracker, behavior_analyzer,
+            include_depth=include_depth, fields=fields
         )
+        return DetectionResponse(**results)
         
     except Exception as e:
         logger.error(f"Error in process_frame: {str(e)}")
@@ -126,27 +191,100 @@ async def process_frame(image: np.ndarray) -> DetectionResponse:
             detail={"error": "Frame processing error", "message": str(e)}
         )
 
-@app.post("/api/detect")
-async def detect_frame(request: FrameRequest):
+async def process_frame_batch(
+    images: List[np.ndarray],
+    camera_ids: List[str],
+    sequences: List[Optional[int]],
+    include_depth: Optional[List[bool]] = None,
+    fields: Optional[FrozenSet[str]] = None
+) -> List[BatchFrameResult]:
+    """Detect on all frames in one inference call, then track each camera in frame order"""
+    try:
+        need_faces, need_objects = detection_stages(fields)
+        no_results = [None] * len(images)
+
+        async def detect_faces_batch():
+            if not need_faces:
+                return no_results
+            return await asyncio.gather(*(face_detector.detect_faces(image) for image in images))
+
+        async def detect_objects_batch():
+            if not need_objects:
+                return no_results
+            return await object_detector.detect_batch(images)
+
+        objects_batch, faces_batch = await asyncio.gather(
+            detect_objects_batch(),
+            detect_faces_batch()
+        )
+
+        results: List[Optional[BatchFrameResult]] = [None] * len(images)
+
+        async def analyze_frame(i: int, camera):
+            frame_results = await analyze_detections(
+                images[i], faces_batch[i], objects_batch[i], camera.tracker, camera.behavior,
+                include_depth=bool(include_depth and include_depth[i]),
+                fields=fields
+            )
+            results[i] = BatchFrameResult(
+                camera_id=camera_ids[i],
+                sequence=sequences[i],
+                **frame_results
+            )
+
+        # Cameras are independent; each camera's frames run in sequence order
+        # under its lock, so concurrent batches for it do not interleave
+        await camera_services.run_in_order(camera_ids, sequences, analyze_frame)
+        return results
+
+    except Exception as e:
+        logger.error(f"Error in process_frame_batch: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={"error": "Batch processing error", "message": str(e)}
+        )
+
+def _decode_image(image_bytes) -> np.ndarray:
+    """Decode encoded image bytes (any buffer) without an intermediate copy"""
+    nparr = np.frombuffer(image_bytes, np.uint8)
+    img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    if img is None:
+        logger.error("Failed to decode image data")
+        raise HTTPException(status_code=400, detail="Invalid image data")
+    return img
+
+@app.post(
+    "/api/detect",
+    response_model=DetectionResponse,
+    response_model_exclude_unset=True,
+    openapi_extra=FRAME_UPLOAD_OPENAPI
+)
+async def detect_frame(request: Request, fields: Optional[str] = None):
+    """Detect on a frame sent as JSON (base64), application/octet-stream or multipart/form-data
+
+    Raw bodies carry the frame description in X-Frame-Width, X-Frame-Height,
+    X-Frame-Format and X-Frame-Metadata headers; multipart bodies send an
+    ``image`` file with width, height, format and metadata form fields.
+    ``fields`` (e.g. ``objects,geofencing_alerts``) limits the result fields
+    and skips the stages none of them need.
+    """
+    field_mask = parse_fields_param(fields)
     try:
-        logger.debug(f"Received frame. Size: {request.width}x{request.height}")
-        logger.debug(f"Metadata: {request.metadata}")
+        image_bytes, frame_info = await read_frame_upload(request)
+        logger.debug(f"Received frame. Size: {frame_info.width}x{frame_info.height}")
+        logger.debug(f"Metadata: {frame_info.metadata}")
         
-        # Decode base64 image
+        # Decode image
         try:
-            image_bytes = base64.b64decode(request.image)
-            nparr = np.frombuffer(image_bytes, np.uint8)
-            img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            
-            if img is None:
-                logger.error("Failed to decode image data")
-                raise HTTPException(status_code=400, detail="Invalid image data")
+            img = _decode_image(image_bytes)
                 
             # Log successful decode
             logger.debug(f"Successfully decoded image. Shape: {img.shape}")
             
             # Process frame
-            results = await process_frame(img)
+            results = await process_frame(
+                img, include_depth=wants_depth(frame_info.metadata), fields=field_mask
+            )
             return results
             
         except Exception as decode_error:
@@ -156,12 +294,16 @@ async def detect_frame(request: FrameRequest):
                 detail={"error": "Image decoding error", "message": str(decode_error)}
             )
             
-    except ValidationError as ve:
+    except RequestValidationError:
+        raise
+    except (ValidationError, ValueError) as ve:
         logger.error(f"Validation error: {ve}")
         raise HTTPException(
             status_code=400,
             detail={"error": "Validation error", "message": str(ve)}
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing frame: {str(e)}")
         raise HTTPException(
@@ -169,6 +311,70 @@ async def detect_frame(request: FrameRequest):
             detail={"error": "Processing error", "message": str(e)}
         )
 
+@app.post("/api/detect/batch", response_model=BatchDetectionResponse, response_model_exclude_unset=True)
+async def detect_frame_batch(request: BatchFrameRequest, fields: Optional[str] = None):
+    """Detect on N ordered frames, tagged by camera id, as a single detector batch"""
+    field_mask = parse_fields_param(fields)
+    if len(request.frames) > settings.MAX_DETECTION_BATCH_FRAMES:
+        raise HTTPException(
+            status_code=413,
+            detail={
+                "error": "Batch too large",
+                "message": f"At most {settings.MAX_DETECTION_BATCH_FRAMES} frames per batch"
+            }
+        )
+
+    try:
+        images = [_decode_image(base64.b64decode(frame.image)) for frame in request.frames]
+    except HTTPException:
+        raise
+    except Exception as decode_error:
+        logger.error(f"Image decoding error: {decode_error}")
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "Image decoding error", "message": str(decode_error)}
+        )
+
+    results = await process_frame_batch(
+        images,
+        [frame.camera_id for frame in request.frames],
+        [frame.sequence for frame in request.frames],
+        [wants_depth(frame.metadata) for frame in request.frames],
+        fields=field_mask
+    )
+    return BatchDetectionResponse(results=results)
+
+@app.post("/api/ingest/video")
+async def ingest_video(request: VideoIngestRequest):
+    """Run the ML pipeline over a recorded video, streaming one NDJSON line per frame"""
+    try:
+        video_path = video_ingest.resolve_path(request.path)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail={"error": "Video not found", "message": str(e)})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail={"error": "Invalid video path", "message": str(e)})
+
+    # Open before the 200 goes out so an unreadable file is reported as an error
+    try:
+        capture = video_ingest.open_video(video_path)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail={"error": "Unreadable video", "message": str(e)})
+
+    return StreamingResponse(
+        video_ingest.stream_results(
+            video_path,
+            capture,
+            frame_stride=request.frame_stride,
+            max_frames=request.max_frames
+        ),
+        media_type="application/x-ndjson"
+    )
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Leave the WebSocket pub/sub broker so another worker can take it over"""
+    await ws_manager.close()
+
 @app.get("/metrics")
 async def metrics():
     """Prometheus metrics endpoint"""
@@ -183,4 +389,11 @@ if __name__ == "__main__":
     warnings.filterwarnings('ignore', category=FutureWarning)
     os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'  # Suppress TensorFlow logging
     logging.getLogger('tensorflow').setLevel(logging.ERROR)
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Protocol-level ping/pong closes dead sockets without touching the message path
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        ws_ping_interval=settings.WS_PING_INTERVAL,
+        ws_ping_timeout=settings.WS_PING_INTERVAL
+    )
\ No newline at end of file
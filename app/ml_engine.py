@@ -1,6 +1,12 @@
 import logging
 from datetime import datetime
-from typing import List
+from typing import FrozenSet, List, Optional
+from app.core.field_mask import (
+    STAGE_FACES,
+    STAGE_OBJECTS,
+    required_stages,
+    run_field_stages
+)
 from app.services.face_detection_service import FaceDetectionService
 from app.services.object_detection_service import ObjectDetectionService
 from app.services.tracking_service import TrackingService
@@ -26,28 +32,32 @@ class MLEngine:
         
         logger.info("ML Engine initialized with all services")
 
-    async def process_frame(self, frame):
-        """Process a single frame through all ML services"""
+    async def process_frame(
+        self,
+        frame,
+        include_depth: bool = False,
+        fields: Optional[FrozenSet[str]] = None
+    ):
+        """Process a single frame through the ML services the requested fields need"""
         try:
+            stages = required_stages(fields)
+            faces, objects = [], []
+
             # Detect faces and objects
-            faces = await self.face_detector.detect_faces(frame)
-            objects = await self.object_detector.detect(frame)
-            
-            # Update tracking
-            tracked_objects = await self.tracker.update(objects, frame=frame)
-            
-            # Get AR overlays
-            ar_data = await self.ar_service.process_frame(frame, faces, tracked_objects)
-            
-            # Analyze behavior
-            behavior_data = await self.behavior_analyzer.analyze(tracked_objects)
-            
-            return {
-                "faces": faces,
-                "objects": tracked_objects,
-                "ar_data": ar_data,
-                "behavior_analysis": behavior_data
-            }
+            if STAGE_FACES in stages:
+                faces = await self.face_detector.detect_faces(frame)
+            if STAGE_OBJECTS in stages:
+                objects = await self.object_detector.detect(frame)
+
+            # Track, then add AR overlays and behavior analysis
+            return await run_field_stages(
+                fields, faces, objects,
+                track=lambda detected: self.tracker.update(detected, frame=frame),
+                ar=lambda detected_faces, tracked_objects: self.ar_service.process_frame(
+                    frame, detected_faces, tracked_objects, include_depth=include_depth
+                ),
+                behavior=self.behavior_analyzer.analyze
+            )
             
         except Exception as e:
             logger.error(f"Error in ML Engine frame processing: {e}")
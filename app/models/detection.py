@@ -1,9 +1,10 @@
 from sqlalchemy import Column, Integer, String, Float, JSON, ForeignKey
 from .base import Base, TimestampMixin
-from pydantic import BaseModel
+from pydantic import BaseModel, field_serializer
 from typing import List, Dict, Optional
 from datetime import datetime
 from app.core.config import get_settings
+from app.core.serialization import encode_binary_fields
 
 class FaceLandmarks(BaseModel):
     x: float
@@ -18,11 +19,24 @@ class Detection(BaseModel):
     trackId: Optional[str] = None
 
 class DetectionResponse(BaseModel):
-    faces: List[Dict]
-    objects: List[Dict]
-    ar_data: Dict
-    behavior_analysis: Dict
-    geofencing_alerts: List[Dict]
+    # Fields outside the client's field mask are left unset and omitted
+    faces: Optional[List[Dict]] = None
+    objects: Optional[List[Dict]] = None
+    ar_data: Optional[Dict] = None
+    behavior_analysis: Optional[Dict] = None
+    geofencing_alerts: Optional[List[Dict]] = None
+
+    @field_serializer("ar_data", when_used="json")
+    def serialize_ar_data(self, ar_data: Optional[Dict]) -> Optional[Dict]:
+        # Binary attachments such as the packed depth map go out as base64
+        return encode_binary_fields(ar_data)
+
+class BatchFrameResult(DetectionResponse):
+    camera_id: str
+    sequence: Optional[int] = None
+
+class BatchDetectionResponse(BaseModel):
+    results: List[BatchFrameResult]
 
 class DetectionDB(Base, TimestampMixin):
     __tablename__ = "detections"
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from app.core.config import get_settings  # Changed from ..core
 
 class FrameRequest(BaseModel):
@@ -23,4 +23,52 @@ class FrameRequest(BaseModel):
                     }
                 }
             }
-        }
\ No newline at end of file
+        }
+
+class RawFrameMetadata(BaseModel):
+    """Frame description for raw-bytes and multipart uploads (image sent separately)"""
+    width: int
+    height: int
+    format: str = Field(default='jpeg')
+    metadata: Optional[Dict[str, Any]] = Field(default_factory=dict)
+
+
+class BatchFrame(FrameRequest):
+    camera_id: str
+    sequence: Optional[int] = None  # ordering within the camera, defaults to request order
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "camera_id": "lobby-1",
+                "sequence": 1041,
+                "image": "base64_encoded_string",
+                "width": 1280,
+                "height": 720
+            }
+        }
+
+
+class BatchFrameRequest(BaseModel):
+    frames: List[BatchFrame] = Field(..., min_length=1)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "frames": [
+                    {
+                        "camera_id": "lobby-1",
+                        "sequence": 1041,
+                        "image": "base64_encoded_string",
+                        "width": 1280,
+                        "height": 720
+                    }
+                ]
+            }
+        }
+
+
+class VideoIngestRequest(BaseModel):
+    path: str  # relative to VIDEO_INGEST_ROOT
+    frame_stride: int = Field(default=1, ge=1)  # process every Nth frame
+    max_frames: Optional[int] = Field(default=None, ge=1)
@@ -12,11 +12,21 @@ from cachetools import TTLCache
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Depth map wire formats
+DEPTH_FORMAT_PNG = "png"          # 8-bit grayscale PNG
+DEPTH_FORMAT_UINT8 = "uint8"      # raw quantized bytes, row-major
+DEPTH_FORMAT_FLOAT16 = "float16"  # raw little-endian half floats, row-major
+DEPTH_FORMATS = (DEPTH_FORMAT_PNG, DEPTH_FORMAT_UINT8, DEPTH_FORMAT_FLOAT16)
+
 class ARService:
     def __init__(self, object_detector=None, face_detector=None):
         try:
             self.processing_lock = asyncio.Lock()
             self.result_cache = TTLCache(maxsize=100, ttl=0.5)  # 500ms cache
+            self.depth_cache = TTLCache(maxsize=32, ttl=0.5)  # depth maps shared per frame
+            self._depth_in_flight: Dict[str, asyncio.Future] = {}
+            self.depth_downscale = max(1, settings.DEPTH_MAP_DOWNSCALE)
+            self.depth_dtype = settings.DEPTH_MAP_DTYPE
             self.min_confidence = settings.MIN_DETECTION_CONFIDENCE
             self.max_overlay_distance = 50  # pixels
             self.overlay_colors = {
@@ -39,29 +49,43 @@ class ARService:
         self,
         frame: np.ndarray,
         faces: List[Dict],
-        tracked_objects: List[Dict]
+        tracked_objects: List[Dict],
+        include_depth: bool = False,
+        depth_size: Optional[Tuple[int, int]] = None,
+        depth_format: str = DEPTH_FORMAT_PNG
     ) -> Dict:
-        """Process frame and generate AR overlays"""
+        """Process frame and generate AR overlays
+
+        The depth map is only computed when ``include_depth`` is set (the
+        client declared the capability). It is downsampled to ``depth_size``
+        (width, height), or to at most DEPTH_MAP_MAX_WIDTH wide, and packed in
+        ``depth_format``.
+        """
         try:
+            # Without a hash frames cannot be told apart, so nothing is cached
             frame_hash = self._compute_frame_hash(frame)
-            if cached := self.result_cache.get(frame_hash):
+            cache_key = (frame_hash, include_depth, depth_size, depth_format)
+            if frame_hash and (cached := self.result_cache.get(cache_key)):
                 return cached
 
+            # Outside the lock so concurrent consumers of a frame share one computation
+            depth_map = await self.get_depth_map(frame, frame_hash) if include_depth else None
+
             async with self.processing_lock:
                 # Process detections
                 face_overlays = await self._process_faces(faces)
                 object_overlays = await self._process_objects(tracked_objects)
                 
-                # Generate depth map for occlusion handling
-                depth_map = await self._generate_depth_map(frame)
-                
                 # Combine overlays with occlusion handling
                 ar_data = {
                     "overlays": {
                         "faces": face_overlays,
                         "objects": object_overlays
                     },
-                    "depth_map": depth_map.tolist() if depth_map is not None else None,
+                    "depth_map": (
+                        self.encode_depth_map(depth_map, depth_size, depth_format)
+                        if depth_map is not None else None
+                    ),
                     "frame_metadata": {
                         "width": frame.shape[1],
                         "height": frame.shape[0],
@@ -69,7 +93,8 @@ class ARService:
                     }
                 }
                 
-                self.result_cache[frame_hash] = ar_data
+                if frame_hash:
+                    self.result_cache[cache_key] = ar_data
                 return ar_data
 
         except Exception as e:
@@ -127,22 +152,106 @@ class ARService:
             logger.error(f"Error processing objects: {e}")
             return []
 
-    async def _generate_depth_map(self, frame: np.ndarray) -> Optional[np.ndarray]:
-        """Generate simple depth map for occlusion handling"""
+    async def get_depth_map(self, frame: np.ndarray, frame_hash: Optional[str] = None) -> Optional[np.ndarray]:
+        """Get the frame's depth map, computing it at most once per frame for all consumers"""
+        frame_hash = frame_hash or self._compute_frame_hash(frame)
+        if not frame_hash:
+            # Unhashable frames must not share another frame's depth map
+            return await asyncio.to_thread(self._generate_depth_map, frame)
+        if (cached := self.depth_cache.get(frame_hash)) is not None:
+            return cached
+
+        in_flight = self._depth_in_flight.get(frame_hash)
+        if in_flight is not None:
+            return await asyncio.shield(in_flight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._depth_in_flight[frame_hash] = future
+        depth_map = None
+        try:
+            depth_map = await asyncio.to_thread(self._generate_depth_map, frame)
+            if depth_map is not None:
+                self.depth_cache[frame_hash] = depth_map
+            return depth_map
+        finally:
+            # Release waiting consumers even if this computation was cancelled
+            self._depth_in_flight.pop(frame_hash, None)
+            future.set_result(depth_map)
+
+    def _generate_depth_map(self, frame: np.ndarray) -> Optional[np.ndarray]:
+        """Generate simple depth map for occlusion handling at reduced resolution"""
         try:
             gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            # Use Sobel operators for edge detection
-            sobel_x = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-            sobel_y = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-            # Approximate depth from edge magnitude
-            depth_map = np.sqrt(sobel_x**2 + sobel_y**2)
+            if self.depth_downscale > 1:
+                height, width = gray.shape[:2]
+                gray = cv2.resize(
+                    gray,
+                    (max(1, width // self.depth_downscale), max(1, height // self.depth_downscale)),
+                    interpolation=cv2.INTER_AREA
+                )
+
+            # Use Sobel operators for edge detection, approximate depth from edge magnitude
+            if self.depth_dtype == "int16":
+                sobel_x = np.abs(cv2.Sobel(gray, cv2.CV_16S, 1, 0, ksize=3))
+                sobel_y = np.abs(cv2.Sobel(gray, cv2.CV_16S, 0, 1, ksize=3))
+                depth_map = cv2.add(sobel_x, sobel_y)  # L1 magnitude, fits in int16
+            else:
+                sobel_x = cv2.Sobel(gray, cv2.CV_32F, 1, 0, ksize=3)
+                sobel_y = cv2.Sobel(gray, cv2.CV_32F, 0, 1, ksize=3)
+                depth_map = cv2.magnitude(sobel_x, sobel_y)
+
             # Normalize to 0-1 range
-            depth_map = cv2.normalize(depth_map, None, 0, 1, cv2.NORM_MINMAX)
-            return depth_map
+            return cv2.normalize(depth_map, None, 0, 1, cv2.NORM_MINMAX, dtype=cv2.CV_32F)
         except Exception as e:
             logger.error(f"Error generating depth map: {e}")
             return None
 
+    def encode_depth_map(
+        self,
+        depth_map: np.ndarray,
+        size: Optional[Tuple[int, int]] = None,
+        depth_format: str = DEPTH_FORMAT_PNG
+    ) -> Optional[Dict]:
+        """Downsample and quantize a 0-1 depth map into a compact binary attachment"""
+        try:
+            height, width = depth_map.shape[:2]
+            if size is None:
+                scale = min(1.0, settings.DEPTH_MAP_MAX_WIDTH / width)
+                size = (max(1, int(width * scale)), max(1, int(height * scale)))
+            target_width = max(1, min(int(size[0]), width))
+            target_height = max(1, min(int(size[1]), height))
+
+            if (target_width, target_height) != (width, height):
+                depth_map = cv2.resize(
+                    depth_map, (target_width, target_height), interpolation=cv2.INTER_AREA
+                )
+
+            if depth_format == DEPTH_FORMAT_FLOAT16:
+                data = depth_map.astype("<f2").tobytes()
+                dtype = "float16"
+            else:
+                quantized = np.clip(depth_map * 255.0, 0, 255).astype(np.uint8)
+                dtype = "uint8"
+                if depth_format == DEPTH_FORMAT_UINT8:
+                    data = quantized.tobytes()
+                else:
+                    depth_format = DEPTH_FORMAT_PNG
+                    _, buffer = cv2.imencode(".png", quantized)
+                    data = buffer.tobytes()
+
+            return {
+                "format": depth_format,
+                "dtype": dtype,
+                "width": target_width,
+                "height": target_height,
+                "data": data
+            }
+
+        except Exception as e:
+            ERROR_COUNT.labels(service="ar", type="depth_encoding").inc()
+            logger.error(f"Error encoding depth map: {e}")
+            return None
+
     def _estimate_distance(self, bbox: List[float]) -> float:
         """Estimate relative distance based on bbox size"""
         try:
@@ -242,6 +351,7 @@ class ARService:
         """Cleanup AR service resources"""
         try:
             self.result_cache.clear()
+            self.depth_cache.clear()
             logger.info("AR service cleaned up")
         except Exception as e:
             logger.error(f"Error cleaning up AR service: {e}")
\ No newline at end of file
@@ -0,0 +1,70 @@
+from typing import List, Optional, Sequence
+import asyncio
+import bisect
+import logging
+import numpy as np
+from app.core.metrics import DETECTION_BATCH_SIZE, DETECTION_BATCH_WAIT
+from app.services.inference_queue import InferenceQueue, InferenceRequest
+
+logger = logging.getLogger(__name__)
+
+
+class BatchScheduler:
+    """Collects inference requests into batches bounded by size and by latency
+
+    A batch is flushed as soon as it holds ``max_batch_size`` requests or
+    its oldest request has waited ``max_delay`` seconds since it was queued,
+    so a lone frame under light load waits at most ``max_delay`` while peak
+    load fills large batches immediately from the backlog.
+    """
+
+    def __init__(
+        self,
+        queue: InferenceQueue,
+        max_batch_size: int = 8,
+        max_delay: float = 0.01,
+        pad_sizes: Optional[Sequence[int]] = None
+    ):
+        self.queue = queue
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_delay = max(0.0, max_delay)
+        # Fixed batch shapes for backends that compile per shape
+        self.pad_sizes = sorted({size for size in (pad_sizes or ()) if size > 0})
+
+    async def next_batch(self) -> List[InferenceRequest]:
+        """Wait for the next batch to flush"""
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        flush_at = batch[0].enqueued_at + self.max_delay
+
+        while len(batch) < self.max_batch_size:
+            # Take whatever is already queued before waiting on the clock
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            remaining = flush_at - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        now = loop.time()
+        DETECTION_BATCH_SIZE.observe(len(batch))
+        for request in batch:
+            DETECTION_BATCH_WAIT.observe(now - request.enqueued_at)
+        return batch
+
+    def padded_size(self, size: int) -> int:
+        """Smallest configured batch shape that holds ``size`` frames"""
+        index = bisect.bisect_left(self.pad_sizes, size)
+        return self.pad_sizes[index] if index < len(self.pad_sizes) else size
+
+    def pad(self, frames: List[np.ndarray]) -> List[np.ndarray]:
+        """Pad a batch to its fixed shape by repeating the last frame"""
+        missing = self.padded_size(len(frames)) - len(frames)
+        return frames + [frames[-1]] * missing if frames and missing > 0 else frames
@@ -0,0 +1,58 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional
+import asyncio
+from cachetools import LRUCache
+from app.services.tracking_service import TrackingService
+from app.services.behavior_analysis_service import BehaviorAnalysisService
+
+
+@dataclass
+class CameraServices:
+    """Tracking state of one camera; the lock keeps concurrent batches from interleaving"""
+    tracker: TrackingService = field(default_factory=TrackingService)
+    behavior: BehaviorAnalysisService = field(default_factory=BehaviorAnalysisService)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class CameraServiceRegistry:
+    """Per-camera tracker and behavior analyzer for batch uploads, least recently used evicted"""
+
+    def __init__(self, maxsize: int, factory: Callable[[], CameraServices] = CameraServices):
+        self._services = LRUCache(maxsize=maxsize)
+        self._factory = factory
+
+    def get(self, camera_id: str) -> CameraServices:
+        """Get (or create) the services for a camera"""
+        services = self._services.get(camera_id)
+        if services is None:
+            services = self._services[camera_id] = self._factory()
+        return services
+
+    async def run_in_order(
+        self,
+        camera_ids: List[str],
+        sequences: List[Optional[int]],
+        analyze: Callable[[int, CameraServices], Awaitable[None]]
+    ):
+        """Call ``analyze`` for every frame index, cameras concurrently
+
+        Each camera's frames run in sequence order (then request order) while
+        holding the camera's lock, so two batches for the same camera update
+        its tracker one after the other.
+        """
+        camera_frames = defaultdict(list)
+        for i, camera_id in enumerate(camera_ids):
+            camera_frames[camera_id].append(i)
+
+        async def analyze_camera(camera_id: str, indices: List[int]):
+            indices.sort(key=lambda i: (sequences[i] is None, sequences[i] or 0, i))
+            services = self.get(camera_id)
+            async with services.lock:
+                for i in indices:
+                    await analyze(i, services)
+
+        await asyncio.gather(*(
+            analyze_camera(camera_id, indices)
+            for camera_id, indices in camera_frames.items()
+        ))
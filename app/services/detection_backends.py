@@ -0,0 +1,280 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+import multiprocessing
+import os
+import numpy as np
+from app.core.config import get_settings
+from app.core.metrics import ERROR_COUNT
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+BACKEND_AUTO = "auto"
+BACKEND_TORCH = "torch"
+BACKEND_PROCESS_POOL = "process_pool"
+BACKEND_ONNX = "onnx"
+
+# Each detection row: x1, y1, x2, y2, confidence, class id
+DETECTION_COLUMNS = 6
+EMPTY_DETECTIONS = np.zeros((0, DETECTION_COLUMNS), dtype=np.float32)
+
+
+def detections_to_dicts(
+    detections: np.ndarray,
+    names: Dict[int, str],
+    confidence_threshold: float
+) -> List[Dict]:
+    """Convert an Nx6 detection array to the service's detection dicts"""
+    detections = detections[detections[:, 4] > confidence_threshold]
+    return [
+        {
+            "bbox": [float(x1), float(y1), float(x2), float(y2)],
+            "confidence": float(confidence),
+            "class_name": str(names.get(int(class_id), int(class_id))),
+            "class_id": int(class_id)
+        }
+        for x1, y1, x2, y2, confidence, class_id in detections.tolist()
+    ]
+
+
+def _results_to_arrays(results) -> List[np.ndarray]:
+    """Pack ultralytics results as compact Nx6 float32 arrays"""
+    return [
+        result.boxes.data.cpu().numpy().astype(np.float32, copy=False)
+        if len(result.boxes) else EMPTY_DETECTIONS
+        for result in results
+    ]
+
+
+class DetectionBackend(ABC):
+    """Runs object detection inference off the event loop"""
+
+    names: Dict[int, str] = {}
+    concurrency: int = 1  # batches that may run at once
+
+    @abstractmethod
+    async def start(self):
+        """Load the model"""
+
+    @abstractmethod
+    async def infer(self, frames: List[np.ndarray]) -> List[np.ndarray]:
+        """Detect on a batch of frames, returning one Nx6 float32 array per frame"""
+
+    @abstractmethod
+    async def close(self):
+        """Release workers and memory"""
+
+
+class TorchThreadBackend(DetectionBackend):
+    """In-process model run on a dedicated thread (used for CUDA)"""
+
+    def __init__(self, model_path: str, device: str):
+        self.model_path = model_path
+        self.device = device
+        self.model = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="yolo")
+
+    async def start(self):
+        from ultralytics import YOLO
+        loop = asyncio.get_running_loop()
+        self.model = await loop.run_in_executor(
+            self._executor, lambda: YOLO(self.model_path).to(self.device)
+        )
+        self.names = dict(self.model.names)
+
+    async def infer(self, frames: List[np.ndarray]) -> List[np.ndarray]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._infer, frames)
+
+    def _infer(self, frames: List[np.ndarray]) -> List[np.ndarray]:
+        return _results_to_arrays(self.model(frames, verbose=False))
+
+    async def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.device == "cuda":
+            import torch
+            torch.cuda.empty_cache()
+
+
+# Worker process state: the model is loaded once per process by the initializer
+_worker_model = None
+_worker_segments: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def _init_worker(model_path: str, threads: int):
+    global _worker_model
+    import torch
+    from ultralytics import YOLO
+    torch.set_num_threads(threads)  # avoid oversubscribing cores across workers
+    _worker_model = YOLO(model_path)
+
+
+def _worker_names() -> Dict[int, str]:
+    return dict(_worker_model.names)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    segment = _worker_segments.get(name)
+    if segment is None:
+        segment = _worker_segments[name] = shared_memory.SharedMemory(name=name)
+    return segment
+
+
+def _worker_infer(frames: List[Tuple]) -> List[np.ndarray]:
+    """Run the worker's model on frames given as (slot, shape, dtype) or arrays"""
+    views = [
+        np.ndarray(frame[1], dtype=frame[2], buffer=_attach(frame[0]).buf)
+        if isinstance(frame, tuple) else frame
+        for frame in frames
+    ]
+    return _results_to_arrays(_worker_model(views, verbose=False))
+
+
+class SharedFrameSlots:
+    """Fixed pool of shared memory segments used to hand frames to workers
+
+    Slots are taken without waiting, so batches never hold some slots while
+    blocking on others; used from the event loop thread only.
+    """
+
+    def __init__(self, count: int, slot_bytes: int):
+        self.slot_bytes = slot_bytes
+        self._segments = [shared_memory.SharedMemory(create=True, size=slot_bytes) for _ in range(count)]
+        self._free: List[shared_memory.SharedMemory] = list(self._segments)
+
+    def __len__(self) -> int:
+        """Number of free slots"""
+        return len(self._free)
+
+    def fits(self, frame: np.ndarray) -> bool:
+        return frame.nbytes <= self.slot_bytes
+
+    def acquire_up_to(self, count: int) -> List[shared_memory.SharedMemory]:
+        """Take up to ``count`` free slots at once"""
+        count = min(count, len(self._free))
+        acquired, self._free = self._free[:count], self._free[count:]
+        return acquired
+
+    def release(self, segments: List[shared_memory.SharedMemory]):
+        self._free.extend(segments)
+
+    @staticmethod
+    def write(segment: shared_memory.SharedMemory, frame: np.ndarray) -> Tuple:
+        """Copy a frame into a segment and describe it for the worker"""
+        view = np.ndarray(frame.shape, dtype=frame.dtype, buffer=segment.buf)
+        np.copyto(view, frame)
+        return segment.name, frame.shape, frame.dtype.str
+
+    def close(self):
+        for segment in self._segments:
+            segment.close()
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class ProcessPoolBackend(DetectionBackend):
+    """CPU inference in worker processes that each load the model once
+
+    Frames travel through shared memory slots instead of being pickled and
+    results come back as small Nx6 arrays, so the event loop only copies
+    pixels and never runs the model.
+    """
+
+    def __init__(self, model_path: str, workers: int, slot_bytes: int):
+        self.model_path = model_path
+        self.workers = max(1, workers)
+        self.concurrency = self.workers
+        self.slot_bytes = slot_bytes
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[SharedFrameSlots] = None
+
+    async def start(self):
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_path, threads)
+        )
+        # Bounds shared memory use; frames beyond the free slots are pickled
+        self._slots = SharedFrameSlots(self.workers * 8, self.slot_bytes)
+        loop = asyncio.get_running_loop()
+        self.names = await loop.run_in_executor(self._executor, _worker_names)
+        logger.info(f"Object detection process pool started with {self.workers} workers")
+
+    async def infer(self, frames: List[np.ndarray]) -> List[np.ndarray]:
+        loop = asyncio.get_running_loop()
+        # One slot per distinct frame object, so padding repeats share a slot
+        unique = {id(frame): frame for frame in frames if self._slots.fits(frame)}
+        # Frames without a free slot (or too large for one) are pickled instead
+        # of waiting, so concurrent batches cannot deadlock on each other's slots
+        acquired = self._slots.acquire_up_to(len(unique))
+        try:
+            written = {
+                frame_id: SharedFrameSlots.write(segment, np.ascontiguousarray(frame))
+                for (frame_id, frame), segment in zip(unique.items(), acquired)
+            }
+            descriptors = [written.get(id(frame), frame) for frame in frames]
+            future = self._executor.submit(_worker_infer, descriptors)
+        except BaseException:
+            self._slots.release(acquired)
+            raise
+
+        # The worker reads the slots until its job ends, even if this caller is cancelled
+        future.add_done_callback(lambda _: self._release_slots(loop, acquired))
+        return await asyncio.wrap_future(future)
+
+    def _release_slots(self, loop: asyncio.AbstractEventLoop, segments: List[shared_memory.SharedMemory]):
+        """Return slots from the executor's callback thread"""
+        if not segments:
+            return
+        try:
+            loop.call_soon_threadsafe(self._slots.release, segments)
+        except RuntimeError:
+            pass  # loop already closed
+
+    async def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._slots is not None:
+            self._slots.close()
+
+
+def create_detection_backend(
+    backend: Optional[str] = None,
+    device: str = "cpu",
+    model_path: Optional[str] = None
+) -> DetectionBackend:
+    """Create the inference backend selected in settings"""
+    backend = (backend or settings.DETECTION_BACKEND).lower()
+    model_path = model_path or settings.YOLO_MODEL_PATH
+    if backend == BACKEND_AUTO:
+        # GPU inference stays in-process; CPU inference scales across processes
+        use_pool = device == "cpu" and settings.OBJECT_DETECTION_WORKERS > 0
+        backend = BACKEND_PROCESS_POOL if use_pool else BACKEND_TORCH
+
+    if backend == BACKEND_ONNX:
+        from app.services.onnx_backend import OnnxRuntimeBackend
+        return OnnxRuntimeBackend(
+            model_path,
+            workers=settings.OBJECT_DETECTION_WORKERS,
+            onnx_path=settings.ONNX_MODEL_PATH or None,
+            imgsz=settings.DETECTION_INPUT_SIZE,
+            precision=settings.DETECTION_PRECISION
+        )
+    if backend == BACKEND_PROCESS_POOL:
+        return ProcessPoolBackend(
+            model_path,
+            workers=settings.OBJECT_DETECTION_WORKERS,
+            slot_bytes=settings.DETECTION_SHM_SLOT_BYTES
+        )
+    if backend != BACKEND_TORCH:
+        ERROR_COUNT.labels(service="object_detection", type="backend").inc()
+        logger.warning(f"Unknown detection backend {backend}, using torch")
+    return TorchThreadBackend(model_path, device)
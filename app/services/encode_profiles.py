@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+import math
+import cv2
+from app.core.config import get_settings
+from app.core.link_quality import LinkEstimator
+
+settings = get_settings()
+
+CHROMA_444 = "444"
+CHROMA_422 = "422"
+CHROMA_420 = "420"
+
+
+@dataclass(frozen=True)
+class EncodeProfile:
+    """JPEG settings for frames sent to a client"""
+    name: str
+    quality: int
+    scale: float = 1.0
+    chroma_subsampling: Optional[str] = None  # None keeps the encoder default (4:2:0)
+    progressive: bool = False
+    min_throughput: float = 0.0  # bytes per second the link must sustain
+    max_rtt: float = math.inf  # seconds
+
+    def encode_params(self) -> Tuple[int, ...]:
+        """cv2.imencode parameters for this profile"""
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        if self.progressive:
+            params += [cv2.IMWRITE_JPEG_PROGRESSIVE, 1, cv2.IMWRITE_JPEG_OPTIMIZE, 1]
+        # Sampling factor control needs OpenCV >= 4.5.5
+        sampling = getattr(cv2, f"IMWRITE_JPEG_SAMPLING_FACTOR_{self.chroma_subsampling}", None)
+        if sampling is not None and hasattr(cv2, "IMWRITE_JPEG_SAMPLING_FACTOR"):
+            params += [cv2.IMWRITE_JPEG_SAMPLING_FACTOR, sampling]
+        return tuple(int(param) for param in params)
+
+
+# Ordered from best quality to smallest frames
+ENCODE_PROFILES = (
+    EncodeProfile("high", quality=90, chroma_subsampling=CHROMA_444,
+                  min_throughput=4_000_000, max_rtt=0.05),
+    EncodeProfile("standard", quality=settings.JPEG_QUALITY, chroma_subsampling=CHROMA_420,
+                  min_throughput=1_500_000, max_rtt=0.1),
+    EncodeProfile("reduced", quality=75, scale=0.75, chroma_subsampling=CHROMA_420,
+                  progressive=True, min_throughput=500_000, max_rtt=0.2),
+    EncodeProfile("cellular", quality=60, scale=0.5, chroma_subsampling=CHROMA_420,
+                  progressive=True, min_throughput=150_000, max_rtt=0.4),
+    EncodeProfile("minimal", quality=45, scale=0.35, chroma_subsampling=CHROMA_420,
+                  progressive=True),
+)
+DEFAULT_PROFILE_INDEX = 1
+
+
+class EncodeProfileSelector:
+    """Per-client profile choice from link estimates
+
+    Drops to the best profile the link supports as soon as it degrades, but
+    moves up only one step after ``up_samples`` consecutive updates in which
+    a better profile fits, so a single good report does not flip quality.
+    """
+
+    def __init__(self, profiles: Tuple[EncodeProfile, ...] = ENCODE_PROFILES, up_samples: int = 10):
+        self.profiles = profiles
+        self.up_samples = max(1, up_samples)
+        self._index = min(DEFAULT_PROFILE_INDEX, len(profiles) - 1)
+        self._better = 0
+
+    @property
+    def profile(self) -> EncodeProfile:
+        return self.profiles[self._index]
+
+    def update(self, link: LinkEstimator) -> EncodeProfile:
+        """Re-evaluate the profile against the latest link estimates"""
+        if link.throughput is None and link.rtt is None:
+            return self.profile
+
+        supported = next(
+            (index for index, profile in enumerate(self.profiles) if self._fits(profile, link)),
+            len(self.profiles) - 1
+        )
+        if supported > self._index:
+            self._index = supported
+            self._better = 0
+        elif supported < self._index:
+            self._better += 1
+            if self._better >= self.up_samples:
+                self._index -= 1
+                self._better = 0
+        else:
+            self._better = 0
+        return self.profile
+
+    def _fits(self, profile: EncodeProfile, link: LinkEstimator) -> bool:
+        if link.throughput is not None and link.throughput < profile.min_throughput:
+            return False
+        if link.rtt is not None and link.rtt > profile.max_rtt:
+            return False
+        return True
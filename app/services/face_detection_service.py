@@ -2,9 +2,17 @@ import mediapipe as mp
 import numpy as np
 import logging
 import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 from app.core.config import get_settings
-from app.core.metrics import DETECTION_COUNT, ERROR_COUNT
+from app.core.metrics import (
+    DETECTION_COUNT,
+    ERROR_COUNT,
+    FACE_DETECTION_POOL_SIZE,
+    FACE_DETECTION_POOL_BUSY
+)
+from app.services.inference_queue import InferenceQueue
 from cachetools import TTLCache
 import hashlib
 import cv2
@@ -15,24 +23,35 @@ logger = logging.getLogger(__name__)
 class FaceDetectionService:
     def __init__(self):
         try:
-            # Initialize MediaPipe face detection
+            # Pool of MediaPipe face detectors, one owned by each worker thread
             self.mp_face_detection = mp.solutions.face_detection
-            self.face_detection = self.mp_face_detection.FaceDetection(
-                model_selection=1,  # 0=short range, 1=full range
-                min_detection_confidence=settings.MIN_DETECTION_CONFIDENCE
+            self.pool_size = max(1, settings.FACE_DETECTION_WORKERS)
+            self._local = threading.local()
+            self._detectors = []
+            self._detectors_lock = threading.Lock()
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.pool_size,
+                thread_name_prefix="face-detection",
+                initializer=self._init_worker
             )
-            self.processing_lock = asyncio.Lock()
+            self._busy = 0
+            FACE_DETECTION_POOL_SIZE.set(self.pool_size)
+            FACE_DETECTION_POOL_BUSY.set(0)
+
             self.result_cache = TTLCache(maxsize=100, ttl=1.0)
-            self._frame_queue = asyncio.Queue(maxsize=settings.MAX_FRAME_QUEUE_SIZE)
-            self._processing_task = asyncio.create_task(self._process_queue())
+            self._frame_queue = InferenceQueue("face_detection", maxsize=settings.MAX_FRAME_QUEUE_SIZE)
+            # One consumer per detector keeps every thread fed
+            self._processing_tasks = [
+                asyncio.create_task(self._process_queue()) for _ in range(self.pool_size)
+            ]
             
-            logger.info("Face detection service initialized")
+            logger.info(f"Face detection service initialized with {self.pool_size} detectors")
         except Exception as e:
             ERROR_COUNT.labels(service="face_detection", type="init").inc()
             logger.error(f"Failed to initialize face detection: {e}")
             raise
 
-    async def detect_faces(self, frame: np.ndarray) -> List[Dict]:
+    async def detect_faces(self, frame: np.ndarray, owner: Optional[str] = None) -> List[Dict]:
         """Detect faces in frame with queuing and caching"""
         try:
             # Check cache first
@@ -41,12 +60,11 @@ class FaceDetectionService:
                 return cached
 
             # Add to processing queue
-            future = asyncio.Future()
-            await self._frame_queue.put((frame, frame_hash, future))
+            request = await self._frame_queue.submit(frame, frame_hash, timeout=5.0, owner=owner)
             
-            # Wait for result with timeout
+            # Wait for result with timeout; giving up cancels the request
             try:
-                result = await asyncio.wait_for(future, timeout=5.0)
+                result = await asyncio.wait_for(request.future, timeout=5.0)
                 return result
             except asyncio.TimeoutError:
                 ERROR_COUNT.labels(service="face_detection", type="timeout").inc()
@@ -58,32 +76,48 @@ class FaceDetectionService:
             logger.error(f"Error in face detection: {e}")
             return []
 
+    def _init_worker(self):
+        """Create the calling worker thread's own detector"""
+        detector = self.mp_face_detection.FaceDetection(
+            model_selection=1,  # 0=short range, 1=full range
+            min_detection_confidence=settings.MIN_DETECTION_CONFIDENCE
+        )
+        self._local.detector = detector
+        with self._detectors_lock:
+            self._detectors.append(detector)
+
     async def _process_queue(self):
-        """Process queued frames"""
+        """Process queued frames on the detector pool"""
+        loop = asyncio.get_running_loop()
         while True:
             try:
-                frame, frame_hash, future = await self._frame_queue.get()
+                request = await self._frame_queue.get()
                 
-                async with self.processing_lock:
-                    result = await self._process_frame(frame)
+                self._busy += 1
+                FACE_DETECTION_POOL_BUSY.set(self._busy)
+                try:
+                    result = await loop.run_in_executor(self._executor, self._process_frame, request.frame)
+                finally:
+                    self._busy -= 1
+                    FACE_DETECTION_POOL_BUSY.set(self._busy)
                 
-                self.result_cache[frame_hash] = result
-                if not future.done():
-                    future.set_result(result)
-                
-                self._frame_queue.task_done()
+                self.result_cache[request.frame_hash] = result
+                if not request.future.done():
+                    request.future.set_result(result)
 
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 ERROR_COUNT.labels(service="face_detection", type="queue_processing").inc()
                 logger.error(f"Error processing face detection queue: {e}")
                 await asyncio.sleep(1)
 
-    async def _process_frame(self, frame: np.ndarray) -> List[Dict]:
-        """Process single frame with MediaPipe"""
+    def _process_frame(self, frame: np.ndarray) -> List[Dict]:
+        """Process single frame with this worker thread's MediaPipe detector"""
         try:
             # Convert to RGB for MediaPipe
             rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.face_detection.process(rgb_frame)
+            results = self._local.detector.process(rgb_frame)
             
             faces = []
             if results.detections:
@@ -119,6 +153,10 @@ class FaceDetectionService:
             logger.error(f"Error processing frame: {e}")
             return []
 
+    def purge(self, owner: str) -> int:
+        """Cancel queued detections for a disconnected client"""
+        return self._frame_queue.purge(owner)
+
     def _compute_frame_hash(self, frame: np.ndarray) -> str:
         """Compute quick frame hash for caching"""
         try:
@@ -131,13 +169,16 @@ class FaceDetectionService:
     async def cleanup(self):
         """Cleanup service resources"""
         try:
-            self._processing_task.cancel()
-            try:
-                await self._processing_task
-            except asyncio.CancelledError:
-                pass
+            for task in self._processing_tasks:
+                task.cancel()
+            await asyncio.gather(*self._processing_tasks, return_exceptions=True)
             
-            self.face_detection.close()
+            # Waits for running detections, so keep it off the event loop
+            await asyncio.to_thread(self._executor.shutdown, wait=True, cancel_futures=True)
+            with self._detectors_lock:
+                for detector in self._detectors:
+                    detector.close()
+                self._detectors.clear()
             logger.info("Face detection service cleaned up")
         except Exception as e:
             logger.error(f"Error cleaning up face detection: {e}") 
\ No newline at end of file
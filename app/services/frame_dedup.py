@@ -0,0 +1,85 @@
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, Union
+import asyncio
+import hashlib
+import logging
+from cachetools import TTLCache
+from app.core.metrics import FRAME_DEDUP_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Flight:
+    task: asyncio.Task
+    waiters: int = 0
+
+
+class FrameDeduplicator:
+    """Shared single-flight layer so identical frames are processed once
+
+    Frames are keyed by a hash of their encoded bytes, never by client
+    supplied identifiers, so one client cannot plant results for another
+    client's frames. The first caller for a key starts the
+    work; concurrent callers await the same task, and later callers within
+    ``ttl`` seconds get the cached result. The shared task is cancelled only
+    once every caller waiting on it has gone.
+    """
+
+    def __init__(self, ttl: float = 1.0, maxsize: int = 256):
+        self._results: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._in_flight: Dict[Hashable, _Flight] = {}
+
+    @staticmethod
+    def frame_key(frame_bytes: Union[bytes, memoryview]) -> Tuple:
+        """Identify a frame by its content"""
+        return ("content", hashlib.blake2b(frame_bytes, digest_size=16).digest())
+
+    async def run(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[Any]],
+        cache: bool = True
+    ) -> Any:
+        """Return the result for ``key``, running ``factory`` only if nobody else is
+
+        With ``cache=False`` the result is only shared with concurrent callers,
+        for large values such as decoded frames.
+        """
+        try:
+            result = self._results[key]
+            FRAME_DEDUP_REQUESTS.labels(outcome="cached").inc()
+            return result
+        except KeyError:
+            pass
+
+        flight = self._in_flight.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.create_task(self._execute(key, factory, cache)))
+            self._in_flight[key] = flight
+            FRAME_DEDUP_REQUESTS.labels(outcome="executed").inc()
+        else:
+            FRAME_DEDUP_REQUESTS.labels(outcome="shared").inc()
+
+        flight.waiters += 1
+        try:
+            # Shield so one caller's cancellation does not cancel the others' result
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+                if self._in_flight.get(key) is flight:
+                    del self._in_flight[key]
+
+    async def _execute(self, key: Hashable, factory: Callable[[], Awaitable[Any]], cache: bool) -> Any:
+        flight_task = asyncio.current_task()
+        try:
+            result = await factory()
+            if cache:
+                self._results[key] = result
+            return result
+        finally:
+            flight = self._in_flight.get(key)
+            if flight is not None and flight.task is flight_task:
+                del self._in_flight[key]
@@ -0,0 +1,108 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set
+import asyncio
+import logging
+import numpy as np
+from app.core.metrics import INFERENCE_REQUESTS_SKIPPED
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(eq=False)
+class InferenceRequest:
+    """A frame waiting for inference and the future its caller is awaiting"""
+    frame: np.ndarray
+    frame_hash: str
+    future: asyncio.Future
+    deadline: float  # event loop time after which nobody waits for the result
+    owner: Optional[str] = None
+    enqueued_at: float = 0.0  # event loop time the request was queued
+
+    def is_stale(self, now: float) -> bool:
+        """Whether the caller has given up (timed out, cancelled or purged)"""
+        return self.future.done() or now >= self.deadline
+
+
+class InferenceQueue:
+    """Bounded inference request queue whose consumers skip abandoned requests
+
+    Callers that time out or are cancelled cancel their future, and
+    ``purge`` cancels every pending request of a disconnected client, so the
+    worker never spends inference on a frame nobody is waiting for.
+    """
+
+    def __init__(self, service: str, maxsize: int = 0):
+        self.service = service
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._pending: Dict[str, Set[InferenceRequest]] = defaultdict(set)
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    async def submit(
+        self,
+        frame: np.ndarray,
+        frame_hash: str,
+        timeout: float,
+        owner: Optional[str] = None
+    ) -> InferenceRequest:
+        """Queue a frame, waiting for room; the request expires after ``timeout`` seconds"""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        request = InferenceRequest(
+            frame=frame,
+            frame_hash=frame_hash,
+            future=loop.create_future(),
+            deadline=now + timeout,
+            owner=owner,
+            enqueued_at=now
+        )
+        if owner is not None:
+            self._pending[owner].add(request)
+            request.future.add_done_callback(lambda _: self._forget(request))
+        await self._queue.put(request)
+        return request
+
+    async def get(self) -> InferenceRequest:
+        """Wait for the next request someone is still waiting on"""
+        loop = asyncio.get_running_loop()
+        while True:
+            request = await self._queue.get()
+            self._queue.task_done()
+            if not request.is_stale(loop.time()):
+                return request
+            self.discard(request)
+
+    def get_nowait(self) -> InferenceRequest:
+        """Next live request if one is queued, else raise asyncio.QueueEmpty"""
+        now = asyncio.get_running_loop().time()
+        while True:
+            request = self._queue.get_nowait()
+            self._queue.task_done()
+            if not request.is_stale(now):
+                return request
+            self.discard(request)
+
+    def discard(self, request: InferenceRequest):
+        """Drop a stale request without running it"""
+        reason = "cancelled" if request.future.done() else "expired"
+        INFERENCE_REQUESTS_SKIPPED.labels(service=self.service, reason=reason).inc()
+        if not request.future.done():
+            request.future.cancel()
+
+    def purge(self, owner: str) -> int:
+        """Cancel every pending request of an owner; workers skip them when dequeued"""
+        requests = self._pending.pop(owner, set())
+        for request in requests:
+            request.future.cancel()
+        if requests:
+            logger.info(f"Purged {len(requests)} pending {self.service} requests for {owner}")
+        return len(requests)
+
+    def _forget(self, request: InferenceRequest):
+        owned = self._pending.get(request.owner)
+        if owned is not None:
+            owned.discard(request)
+            if not owned:
+                del self._pending[request.owner]
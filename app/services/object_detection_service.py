@@ -1,27 +1,45 @@
 from typing import List, Dict, Optional
 import numpy as np
+import cv2
 import logging
 import asyncio
-from ultralytics import YOLO
-import torch
 from app.core.config import get_settings
 from app.core.metrics import DETECTION_COUNT, ERROR_COUNT
+from app.services.inference_queue import InferenceQueue, InferenceRequest
+from app.services.detection_backends import BACKEND_ONNX, create_detection_backend, detections_to_dicts
+from app.services.batch_scheduler import BatchScheduler
 from cachetools import TTLCache
 import hashlib
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+def _inference_device() -> str:
+    """CUDA when available; the CPU-only ONNX backend never imports torch"""
+    if settings.DETECTION_BACKEND.lower() == BACKEND_ONNX:
+        return "cpu"
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
 class ObjectDetectionService:
     def __init__(self):
         try:
-            # Initialize YOLO model with CUDA if available
-            self.device = "cuda" if torch.cuda.is_available() else "cpu"
-            self.model = YOLO(settings.YOLO_MODEL_PATH).to(self.device)
+            # Initialize YOLO inference backend with CUDA if available
+            self.device = _inference_device()
+            self.backend = create_detection_backend(device=self.device)
+            self._backend_ready = asyncio.create_task(self.backend.start())
             self.confidence_threshold = settings.MIN_DETECTION_CONFIDENCE
-            self.processing_lock = asyncio.Lock()
+            # One slot per batch the backend can run at once
+            self._inference_slots = asyncio.Semaphore(self.backend.concurrency)
+            self._batch_tasks = set()
             self.result_cache = TTLCache(maxsize=100, ttl=1.0)  # 1 second cache
-            self._batch_queue = asyncio.Queue(maxsize=settings.MAX_FRAME_QUEUE_SIZE)
+            self._batch_queue = InferenceQueue("object_detection", maxsize=settings.MAX_FRAME_QUEUE_SIZE)
+            self._scheduler = BatchScheduler(
+                self._batch_queue,
+                max_batch_size=settings.DETECTION_MAX_BATCH_SIZE,
+                max_delay=settings.DETECTION_MAX_BATCH_DELAY_MS / 1000.0,
+                pad_sizes=settings.DETECTION_BATCH_PAD_SIZES
+            )
             self._processing_task = asyncio.create_task(self._process_batch())
             
             logger.info(f"Object detection initialized on {self.device}")
@@ -30,7 +48,7 @@ class ObjectDetectionService:
             logger.error(f"Failed to initialize object detection: {e}")
             raise
 
-    async def detect(self, frame: np.ndarray) -> List[Dict]:
+    async def detect(self, frame: np.ndarray, owner: Optional[str] = None) -> List[Dict]:
         """Detect objects in frame with batching and caching"""
         try:
             # Check cache first
@@ -39,12 +57,11 @@ class ObjectDetectionService:
                 return cached
 
             # Add to batch queue
-            future = asyncio.Future()
-            await self._batch_queue.put((frame, frame_hash, future))
+            request = await self._batch_queue.submit(frame, frame_hash, timeout=5.0, owner=owner)
             
-            # Wait for result with timeout
+            # Wait for result with timeout; giving up cancels the request
             try:
-                result = await asyncio.wait_for(future, timeout=5.0)
+                result = await asyncio.wait_for(request.future, timeout=5.0)
                 return result
             except asyncio.TimeoutError:
                 ERROR_COUNT.labels(service="object_detection", type="timeout").inc()
@@ -56,65 +73,96 @@ class ObjectDetectionService:
             logger.error(f"Error in object detection: {e}")
             return []
 
+    async def detect_batch(self, frames: List[np.ndarray]) -> List[List[Dict]]:
+        """Detect objects in a caller-assembled batch with a single inference call"""
+        try:
+            frame_hashes = [self._compute_frame_hash(frame) for frame in frames]
+            results: List[Optional[List[Dict]]] = [
+                self.result_cache.get(frame_hash) for frame_hash in frame_hashes
+            ]
+            pending = [i for i, result in enumerate(results) if result is None]
+
+            if pending:
+                async with self._inference_slots:
+                    batch_results = await self._detect_batch([frames[i] for i in pending])
+
+                for i, result in zip(pending, batch_results):
+                    self.result_cache[frame_hashes[i]] = result
+                    results[i] = result
+
+            return results
+
+        except Exception as e:
+            ERROR_COUNT.labels(service="object_detection", type="batch_detection").inc()
+            logger.error(f"Error in batch object detection: {e}")
+            return [[] for _ in frames]
+
     async def _process_batch(self):
         """Process batched frames"""
         while True:
+            # Take a backend slot before collecting, so a batch flushes only when
+            # it can run and frames that queue up meanwhile go into the next one
+            await self._inference_slots.acquire()
+            dispatched = failed = False
             try:
-                batch = []
-                futures = []
-                frame_hashes = []
-
-                # Collect batch
-                while len(batch) < 4:  # Max batch size
-                    try:
-                        frame, frame_hash, future = await asyncio.wait_for(
-                            self._batch_queue.get(),
-                            timeout=0.1
-                        )
-                        batch.append(frame)
-                        frame_hashes.append(frame_hash)
-                        futures.append(future)
-                    except asyncio.TimeoutError:
-                        break
-
-                if not batch:
-                    await asyncio.sleep(0.01)
-                    continue
-
-                # Process batch
-                async with self.processing_lock:
-                    results = await self._detect_batch(batch)
-
-                # Set results
-                for i, (result, future, frame_hash) in enumerate(zip(results, futures, frame_hashes)):
-                    self.result_cache[frame_hash] = result
-                    if not future.done():
-                        future.set_result(result)
+                # Flushes at the size limit or when the oldest frame hits the delay limit
+                batch = await self._scheduler.next_batch()
+
+                # Callers may have given up while the batch was collected
+                now = asyncio.get_running_loop().time()
+                live = []
+                for request in batch:
+                    if request.is_stale(now):
+                        self._batch_queue.discard(request)
+                    else:
+                        live.append(request)
+                if live:
+                    task = asyncio.create_task(self._run_batch(live))
+                    self._batch_tasks.add(task)
+                    task.add_done_callback(self._batch_tasks.discard)
+                    dispatched = True
 
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 ERROR_COUNT.labels(service="object_detection", type="batch_processing").inc()
                 logger.error(f"Error processing detection batch: {e}")
+                failed = True
+            finally:
+                # A dispatched batch releases its slot when it finishes
+                if not dispatched:
+                    self._inference_slots.release()
+            if failed:
                 await asyncio.sleep(1)
 
-    async def _detect_batch(self, frames: List[np.ndarray]) -> List[List[Dict]]:
-        """Run model inference on batch"""
+    async def _run_batch(self, batch: List[InferenceRequest]):
+        """Run one collected batch and resolve its futures (holds an inference slot)"""
         try:
-            results = self.model(frames, verbose=False)
+            frames = self._scheduler.pad([request.frame for request in batch])
+            results = await self._detect_batch(frames, count=len(batch))
+            for result, request in zip(results, batch):
+                self.result_cache[request.frame_hash] = result
+                if not request.future.done():
+                    request.future.set_result(result)
+        finally:
+            self._inference_slots.release()
+
+    async def _detect_batch(self, frames: List[np.ndarray], count: Optional[int] = None) -> List[List[Dict]]:
+        """Run model inference on batch in the backend, off the event loop
+
+        Only the first ``count`` frames' results are returned and counted; the
+        rest pad the batch to a fixed shape.
+        """
+        count = len(frames) if count is None else count
+        try:
+            await self._backend_ready
+            arrays = await self.backend.infer(frames)
             processed_results = []
 
-            for result in results:
-                detections = []
-                boxes = result.boxes
-                for box in boxes:
-                    if box.conf.item() > self.confidence_threshold:
-                        detection = {
-                            "bbox": [float(x) for x in box.xyxy[0].tolist()],
-                            "confidence": float(box.conf.item()),
-                            "class_name": str(result.names[int(box.cls.item())]),
-                            "class_id": int(box.cls.item())
-                        }
-                        detections.append(detection)
-                        DETECTION_COUNT.labels(type=detection["class_name"]).inc()
+            for array in arrays[:count]:
+                detections = detections_to_dicts(array, self.backend.names, self.confidence_threshold)
+                for detection in detections:
+                    DETECTION_COUNT.labels(type=detection["class_name"]).inc()
                 processed_results.append(detections)
 
             return processed_results
@@ -122,7 +170,11 @@ class ObjectDetectionService:
         except Exception as e:
             ERROR_COUNT.labels(service="object_detection", type="inference").inc()
             logger.error(f"Error in model inference: {e}")
-            return [[] for _ in frames]
+            return [[] for _ in range(count)]
+
+    def purge(self, owner: str) -> int:
+        """Cancel queued detections for a disconnected client"""
+        return self._batch_queue.purge(owner)
 
     def _compute_frame_hash(self, frame: np.ndarray) -> str:
         """Compute quick frame hash for caching"""
@@ -138,14 +190,12 @@ class ObjectDetectionService:
         """Cleanup service resources"""
         try:
             self._processing_task.cancel()
-            try:
-                await self._processing_task
-            except asyncio.CancelledError:
-                pass
+            for task in self._batch_tasks:
+                task.cancel()
+            await asyncio.gather(self._processing_task, *self._batch_tasks, return_exceptions=True)
             
-            # Clear CUDA cache if using GPU
-            if self.device == "cuda":
-                torch.cuda.empty_cache()
+            # Stop inference workers (clears the CUDA cache for GPU inference)
+            await self.backend.close()
                 
             logger.info("Object detection service cleaned up")
         except Exception as e:
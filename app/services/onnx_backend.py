@@ -0,0 +1,228 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import ast
+import asyncio
+import logging
+import os
+import cv2
+import numpy as np
+from app.core.metrics import ERROR_COUNT
+from app.services.detection_backends import DETECTION_COLUMNS, EMPTY_DETECTIONS, DetectionBackend
+
+logger = logging.getLogger(__name__)
+
+LETTERBOX_COLOR = 114
+# Match ultralytics predict defaults so both backends return the same detections
+NMS_CONFIDENCE = 0.25
+NMS_IOU = 0.7
+MAX_DETECTIONS = 300
+# Class offset for class-aware NMS in a single pass; larger than any image coordinate
+CLASS_OFFSET = 7680.0
+
+
+def onnx_model_path(model_path: str) -> Path:
+    """Location of the exported ONNX model next to the weights"""
+    return Path(model_path).with_suffix(".onnx")
+
+
+def export_onnx(model_path: str, imgsz: int = 640) -> Path:
+    """Export YOLO weights to ONNX once; reuses the cached export while it is newer than the weights"""
+    onnx_path = onnx_model_path(model_path)
+    weights = Path(model_path)
+    if onnx_path.exists() and (not weights.exists() or onnx_path.stat().st_mtime >= weights.stat().st_mtime):
+        return onnx_path
+
+    from ultralytics import YOLO
+    logger.info(f"Exporting {model_path} to {onnx_path}")
+    exported = YOLO(model_path).export(format="onnx", imgsz=imgsz, dynamic=True)
+    exported = Path(exported)
+    if exported != onnx_path:
+        exported.replace(onnx_path)
+    return onnx_path
+
+
+def letterbox(frames: List[np.ndarray], size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Resize frames into a padded NCHW float batch, returning scale ratios and (x, y) pads"""
+    shapes = np.array([frame.shape[:2] for frame in frames], dtype=np.float32)  # (h, w)
+    ratios = np.minimum(size / shapes[:, 0], size / shapes[:, 1])
+    resized = np.round(shapes * ratios[:, None]).astype(np.int32)
+    pads = np.round((size - resized[:, ::-1]) / 2.0 - 0.1).astype(np.int32)  # (x, y)
+
+    batch = np.full((len(frames), size, size, 3), LETTERBOX_COLOR, dtype=np.uint8)
+    for i, frame in enumerate(frames):
+        height, width = resized[i]
+        left, top = pads[i]
+        if (height, width) != frame.shape[:2]:
+            frame = cv2.resize(frame, (int(width), int(height)), interpolation=cv2.INTER_LINEAR)
+        batch[i, top:top + height, left:left + width] = frame
+
+    # BGR HWC uint8 -> RGB CHW float in [0, 1] for the whole batch at once
+    tensor = np.ascontiguousarray(batch[..., ::-1].transpose(0, 3, 1, 2), dtype=np.float32)
+    tensor *= 1.0 / 255.0
+    return tensor, ratios, pads.astype(np.float32)
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Greedy non-maximum suppression over xyxy boxes, returning kept indices by score"""
+    x1, y1, x2, y2 = boxes.T
+    areas = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    order = np.argsort(-scores, kind="stable")
+    keep = []
+    while order.size:
+        best, rest = order[0], order[1:]
+        keep.append(best)
+        width = np.clip(np.minimum(x2[best], x2[rest]) - np.maximum(x1[best], x1[rest]), 0, None)
+        height = np.clip(np.minimum(y2[best], y2[rest]) - np.maximum(y1[best], y1[rest]), 0, None)
+        intersection = width * height
+        iou = intersection / (areas[best] + areas[rest] - intersection + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+def postprocess(
+    output: np.ndarray,
+    ratios: np.ndarray,
+    pads: np.ndarray,
+    shapes: List[Tuple[int, int]],
+    confidence: float = NMS_CONFIDENCE,
+    iou_threshold: float = NMS_IOU,
+    max_detections: int = MAX_DETECTIONS
+) -> List[np.ndarray]:
+    """Decode raw YOLOv8 output (B, 4 + classes, anchors) to Nx6 arrays in frame coordinates"""
+    results = []
+    for i, prediction in enumerate(output.transpose(0, 2, 1)):
+        class_scores = prediction[:, 4:]
+        class_ids = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(class_scores)), class_ids]
+        mask = scores > confidence
+        if not mask.any():
+            results.append(EMPTY_DETECTIONS)
+            continue
+
+        cx, cy, w, h = prediction[mask, :4].T
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+        scores, class_ids = scores[mask], class_ids[mask]
+
+        keep = nms(boxes + class_ids[:, None] * CLASS_OFFSET, scores, iou_threshold)[:max_detections]
+        boxes = (boxes[keep] - np.tile(pads[i], 2)) / ratios[i]
+        height, width = shapes[i]
+        boxes = np.clip(boxes, 0, [width, height, width, height])
+
+        detections = np.empty((len(keep), DETECTION_COLUMNS), dtype=np.float32)
+        detections[:, :4] = boxes
+        detections[:, 4] = scores[keep]
+        detections[:, 5] = class_ids[keep]
+        results.append(detections)
+    return results
+
+
+class OnnxDetector:
+    """Synchronous ONNX Runtime session with the YOLO pre- and post-processing"""
+
+    def __init__(self, onnx_path: str, imgsz: int = 640, threads: Optional[int] = None):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.onnx_path = onnx_path
+        self.session = ort.InferenceSession(
+            onnx_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # Static exports fix the batch and image size
+        self.batch_size = model_input.shape[0] if isinstance(model_input.shape[0], int) else None
+        self.imgsz = model_input.shape[2] if isinstance(model_input.shape[2], int) else imgsz
+        self.names = self._read_names(self.session.get_modelmeta().custom_metadata_map)
+
+    @staticmethod
+    def _read_names(metadata: Dict[str, str]) -> Dict[int, str]:
+        """Class names stored by the ultralytics exporter"""
+        try:
+            return {int(k): str(v) for k, v in ast.literal_eval(metadata.get("names", "{}")).items()}
+        except (ValueError, SyntaxError):
+            logger.warning("ONNX model has no class names; reporting class ids")
+            return {}
+
+    def detect(self, frames: List[np.ndarray]) -> List[np.ndarray]:
+        """Detect on a batch of BGR frames, returning one Nx6 array per frame"""
+        tensor, ratios, pads = letterbox(frames, self.imgsz)
+        step = self.batch_size or len(frames)
+        outputs = []
+        for start in range(0, len(frames), step):
+            chunk = tensor[start:start + step]
+            size = len(chunk)
+            if size < step:
+                # Static exports need full batches; repeat the last frame and drop its output
+                chunk = np.concatenate([chunk, np.repeat(chunk[-1:], step - size, axis=0)])
+            outputs.append(self.session.run(None, {self.input_name: chunk})[0][:size])
+        shapes = [frame.shape[:2] for frame in frames]
+        return postprocess(np.concatenate(outputs), ratios, pads, shapes)
+
+
+class OnnxRuntimeBackend(DetectionBackend):
+    """CPU inference with ONNX Runtime on the exported model
+
+    One session is shared by ``workers`` threads; ONNX Runtime releases the
+    GIL while running, so batches overlap without worker processes or torch
+    in the serving process.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        workers: int = 1,
+        onnx_path: Optional[str] = None,
+        imgsz: int = 640,
+        precision: str = "fp32"
+    ):
+        self.model_path = model_path
+        self.onnx_path = onnx_path
+        self.precision = precision
+        self.imgsz = imgsz
+        self.workers = max(1, workers)
+        self.concurrency = self.workers
+        self.detector: Optional[OnnxDetector] = None
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="onnx")
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._load)
+        logger.info(f"ONNX Runtime detection started with {self.workers} workers ({self.onnx_path})")
+
+    def _load(self):
+        if not self.onnx_path:
+            self.onnx_path = str(export_onnx(self.model_path, self.imgsz))
+        if self.precision != "fp32":
+            self.onnx_path = self._quantized_path(self.onnx_path)
+        # Split cores between concurrent batches instead of oversubscribing them
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        self.detector = OnnxDetector(self.onnx_path, self.imgsz, threads)
+        self.names = self.detector.names
+
+    def _quantized_path(self, onnx_path: str) -> str:
+        """Quantized variant of the model, falling back to FP32 if it cannot be used"""
+        from app.services.quantization import PRECISION_INT8_DYNAMIC, quantize_model, quantized_model_path
+        path = quantized_model_path(onnx_path, self.precision)
+        if path.exists():
+            return str(path)
+        try:
+            if self.precision == PRECISION_INT8_DYNAMIC:
+                # Dynamic quantization needs no calibration data, so build it on first use
+                return str(quantize_model(onnx_path, self.precision))
+            raise FileNotFoundError(f"{path} not found; build it with scripts/quantize_detector.py")
+        except Exception as e:
+            ERROR_COUNT.labels(service="object_detection", type="quantization").inc()
+            logger.error(f"Cannot use {self.precision} detector, using fp32: {e}")
+            return onnx_path
+
+    async def infer(self, frames: List[np.ndarray]) -> List[np.ndarray]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.detector.detect, frames)
+
+    async def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.detector = None
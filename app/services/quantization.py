@@ -0,0 +1,168 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import logging
+import cv2
+import numpy as np
+from app.services.onnx_backend import letterbox
+
+logger = logging.getLogger(__name__)
+
+PRECISION_FP32 = "fp32"
+PRECISION_INT8_DYNAMIC = "int8_dynamic"
+PRECISION_INT8_STATIC = "int8_static"
+PRECISIONS = (PRECISION_FP32, PRECISION_INT8_DYNAMIC, PRECISION_INT8_STATIC)
+
+FRAME_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+def quantized_model_path(onnx_path: str, precision: str) -> Path:
+    """Location of a quantized variant next to the FP32 model"""
+    path = Path(onnx_path)
+    if precision == PRECISION_FP32:
+        return path
+    return path.with_name(f"{path.stem}.{precision}.onnx")
+
+
+def list_frames(folder: str) -> List[Path]:
+    """Image files in a folder of sample frames, in name order"""
+    return sorted(p for p in Path(folder).iterdir() if p.suffix.lower() in FRAME_EXTENSIONS)
+
+
+class FrameCalibrationReader:
+    """Feeds letterboxed sample frames to ONNX Runtime static calibration one at a time"""
+
+    def __init__(self, frame_paths: Sequence[Path], input_name: str, imgsz: int = 640):
+        self.frame_paths = list(frame_paths)
+        self.input_name = input_name
+        self.imgsz = imgsz
+        self._index = 0
+
+    def get_next(self) -> Optional[Dict[str, np.ndarray]]:
+        while self._index < len(self.frame_paths):
+            path = self.frame_paths[self._index]
+            self._index += 1
+            frame = cv2.imread(str(path), cv2.IMREAD_COLOR)
+            if frame is None:
+                logger.warning(f"Skipping unreadable calibration frame {path}")
+                continue
+            tensor, _, _ = letterbox([frame], self.imgsz)
+            return {self.input_name: tensor}
+        return None
+
+    def rewind(self):
+        self._index = 0
+
+
+def quantize_model(
+    onnx_path: str,
+    precision: str,
+    calibration_frames: Sequence[Path] = (),
+    imgsz: int = 640
+) -> Path:
+    """Write the INT8 variant of an FP32 ONNX model and return its path
+
+    Dynamic quantization needs no data; static quantization calibrates
+    activation ranges on ``calibration_frames``.
+    """
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_dynamic, quantize_static
+    output_path = quantized_model_path(onnx_path, precision)
+
+    if precision == PRECISION_INT8_DYNAMIC:
+        quantize_dynamic(str(onnx_path), str(output_path), weight_type=QuantType.QUInt8)
+    elif precision == PRECISION_INT8_STATIC:
+        if not calibration_frames:
+            raise ValueError("Static quantization needs calibration frames")
+        import onnxruntime as ort
+        input_name = ort.InferenceSession(
+            str(onnx_path), providers=["CPUExecutionProvider"]
+        ).get_inputs()[0].name
+        quantize_static(
+            str(onnx_path),
+            str(output_path),
+            FrameCalibrationReader(calibration_frames, input_name, imgsz),
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=True
+        )
+    else:
+        raise ValueError(f"Unknown quantization precision: {precision}")
+
+    logger.info(f"Wrote {precision} model to {output_path}")
+    return output_path
+
+
+def box_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU between two sets of xyxy boxes"""
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.clip(bottom_right - top_left, 0, None).prod(axis=2)
+    area_a = (boxes_a[:, 2:] - boxes_a[:, :2]).prod(axis=1)
+    area_b = (boxes_b[:, 2:] - boxes_b[:, :2]).prod(axis=1)
+    return intersection / (area_a[:, None] + area_b[None, :] - intersection + 1e-9)
+
+
+def _average_precision(recall: np.ndarray, precision: np.ndarray) -> float:
+    """Area under the monotone precision envelope (all-point interpolation)"""
+    recall = np.concatenate([[0.0], recall, [1.0]])
+    precision = np.concatenate([[1.0], precision, [0.0]])
+    precision = np.maximum.accumulate(precision[::-1])[::-1]
+    return float(np.sum((recall[1:] - recall[:-1]) * precision[1:]))
+
+
+def agreement_metrics(
+    references: List[np.ndarray],
+    candidates: List[np.ndarray],
+    confidence_threshold: float,
+    iou_threshold: float = 0.5
+) -> Dict[str, float]:
+    """Score candidate Nx6 detections against reference detections used as ground truth
+
+    References above ``confidence_threshold`` are the ground truth. mAP is
+    computed over every candidate detection; recall and precision over the
+    candidates the service would report at the same threshold.
+    """
+    references = [ref[ref[:, 4] > confidence_threshold] for ref in references]
+    classes = np.unique(np.concatenate([ref[:, 5] for ref in references])) if references else []
+
+    average_precisions = []
+    true_positives = 0
+    for class_id in classes:
+        scores, matches = [], []
+        total = 0
+        for reference, candidate in zip(references, candidates):
+            truth = reference[reference[:, 5] == class_id, :4]
+            predicted = candidate[candidate[:, 5] == class_id]
+            predicted = predicted[np.argsort(-predicted[:, 4], kind="stable")]
+            total += len(truth)
+
+            matched = np.zeros(len(predicted), dtype=bool)
+            if len(truth) and len(predicted):
+                ious = box_iou(predicted[:, :4], truth)
+                taken = np.zeros(len(truth), dtype=bool)
+                # Greedy by score: each truth box matches at most one prediction
+                for i, row in enumerate(ious):
+                    row = np.where(taken, 0.0, row)
+                    best = int(row.argmax())
+                    if row[best] >= iou_threshold:
+                        matched[i] = taken[best] = True
+            scores.append(predicted[:, 4])
+            matches.append(matched)
+
+        scores, matches = np.concatenate(scores), np.concatenate(matches)
+        order = np.argsort(-scores, kind="stable")
+        hits = np.cumsum(matches[order])
+        recall = hits / total
+        precision = hits / np.arange(1, len(hits) + 1)
+        average_precisions.append(_average_precision(recall, precision))
+
+        true_positives += int(matches[scores > confidence_threshold].sum())
+
+    ground_truth = sum(len(ref) for ref in references)
+    # Reported detections of classes absent from the references are all false positives
+    reported = sum(int((candidate[:, 4] > confidence_threshold).sum()) for candidate in candidates)
+    return {
+        "map": float(np.mean(average_precisions)) if average_precisions else 1.0,
+        "recall": true_positives / ground_truth if ground_truth else 1.0,
+        "precision": true_positives / reported if reported else 1.0,
+    }
@@ -0,0 +1,188 @@
+import cv2
+import logging
+import asyncio
+import threading
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional
+from app.core.config import get_settings
+from app.core.metrics import ERROR_COUNT
+from app.core.serialization import ENCODING_JSON, get_encoder
+from app.ml_engine import MLEngine
+from app.services.tracking_service import TrackingService
+from app.services.behavior_analysis_service import BehaviorAnalysisService
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_END_OF_STREAM = object()
+
+
+class VideoIngestService:
+    """Run the ML pipeline over recorded video files and stream NDJSON results"""
+
+    def __init__(self, ml_engine: MLEngine):
+        try:
+            self.ml_engine = ml_engine
+            self.ingest_root = Path(settings.VIDEO_INGEST_ROOT).resolve()
+            self.allowed_extensions = {ext.lower() for ext in settings.VIDEO_INGEST_EXTENSIONS}
+            self.queue_size = settings.VIDEO_INGEST_QUEUE_SIZE
+            logger.info(f"Video ingest initialized with root {self.ingest_root}")
+        except Exception as e:
+            ERROR_COUNT.labels(service="video_ingest", type="init").inc()
+            logger.error(f"Failed to initialize video ingest: {e}")
+            raise
+
+    def resolve_path(self, path: str) -> Path:
+        """Resolve a requested video path, restricted to the ingest root"""
+        video_path = (self.ingest_root / path).resolve()
+        if not video_path.is_relative_to(self.ingest_root):
+            raise ValueError("Video path outside ingest root")
+        if video_path.suffix.lower() not in self.allowed_extensions:
+            raise ValueError(f"Unsupported video format: {video_path.suffix}")
+        if not video_path.is_file():
+            raise FileNotFoundError(f"Video not found: {path}")
+        return video_path
+
+    def open_video(self, video_path: Path) -> cv2.VideoCapture:
+        """Open a resolved video before streaming starts, so failures get an error status"""
+        capture = cv2.VideoCapture(str(video_path))
+        if not capture.isOpened():
+            capture.release()
+            ERROR_COUNT.labels(service="video_ingest", type="open").inc()
+            raise ValueError(f"Unable to open video: {video_path.name}")
+        return capture
+
+    def _create_engine(self) -> MLEngine:
+        """Fresh tracking state per file so recorded footage never mixes with live tracks"""
+        return MLEngine(
+            face_detector=self.ml_engine.face_detector,
+            object_detector=self.ml_engine.object_detector,
+            tracker=TrackingService(),
+            ar_service=self.ml_engine.ar_service,
+            behavior_analyzer=BehaviorAnalysisService()
+        )
+
+    async def stream_results(
+        self,
+        video_path: Path,
+        capture: cv2.VideoCapture,
+        frame_stride: int = 1,
+        max_frames: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Decode frames of an opened video on a background thread and yield one NDJSON line per frame
+
+        The decoder thread hands frames to the event loop with
+        ``call_soon_threadsafe`` and a semaphore bounds how far it runs ahead,
+        so no executor thread is held while waiting for frames.
+        """
+        loop = asyncio.get_running_loop()
+        frame_queue: asyncio.Queue = asyncio.Queue()
+        free_slots = threading.Semaphore(self.queue_size)
+        stop_event = threading.Event()
+        decoder = threading.Thread(
+            target=self._decode_frames,
+            args=(capture, loop, frame_queue, free_slots, stop_event, max(1, frame_stride), max_frames),
+            name=f"video-ingest-{video_path.name}",
+            daemon=True
+        )
+        engine = self._create_engine()
+        frames_processed = 0
+        try:
+            yield self._encode_line({
+                "type": "video_info",
+                "file": video_path.name,
+                "fps": capture.get(cv2.CAP_PROP_FPS),
+                "frame_count": int(capture.get(cv2.CAP_PROP_FRAME_COUNT)),
+                "width": int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                "height": int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            })
+
+            decoder.start()
+            while True:
+                # Decode runs ahead on the thread while this frame is in inference
+                item = await frame_queue.get()
+                if item is _END_OF_STREAM:
+                    break
+                free_slots.release()
+
+                frame_index, position_ms, frame = item
+                # Encoding is part of the frame: one unserializable value costs a line, not the stream
+                try:
+                    results = await engine.process_frame(frame)
+                    line = self._encode_line({
+                        "type": "frame",
+                        "frame_index": frame_index,
+                        "timestamp_ms": position_ms,
+                        "results": results
+                    })
+                except Exception as e:
+                    ERROR_COUNT.labels(service="video_ingest", type="frame").inc()
+                    logger.error(f"Error processing frame {frame_index} of {video_path.name}: {e}")
+                    line = self._encode_line({"type": "error", "frame_index": frame_index, "message": str(e)})
+
+                frames_processed += 1
+                yield line
+
+            yield self._encode_line({"type": "summary", "frames_processed": frames_processed})
+
+        finally:
+            stop_event.set()
+            if decoder.is_alive():
+                # The decoder polls the stop event and releases the capture itself
+                await asyncio.to_thread(decoder.join, 5.0)
+            elif decoder.ident is None:
+                capture.release()
+            await engine.tracker.cleanup()
+            logger.info(f"Video ingest of {video_path.name} finished after {frames_processed} frames")
+
+    def _decode_frames(
+        self,
+        capture: cv2.VideoCapture,
+        loop: asyncio.AbstractEventLoop,
+        frame_queue: asyncio.Queue,
+        free_slots: threading.Semaphore,
+        stop_event: threading.Event,
+        frame_stride: int,
+        max_frames: Optional[int]
+    ):
+        """Decoder thread: read frames into the event loop's queue until done or stopped"""
+        frame_index = 0
+        emitted = 0
+        try:
+            while not stop_event.is_set():
+                if max_frames is not None and emitted >= max_frames:
+                    break
+                # grab() skips the decode cost for strided-out frames
+                if not capture.grab():
+                    break
+                if frame_index % frame_stride:
+                    frame_index += 1
+                    continue
+
+                ok, frame = capture.retrieve()
+                if not ok:
+                    break
+                item = (frame_index, capture.get(cv2.CAP_PROP_POS_MSEC), frame)
+                frame_index += 1
+
+                # Wait for room without blocking past a stop request
+                while not stop_event.is_set():
+                    if free_slots.acquire(timeout=0.5):
+                        loop.call_soon_threadsafe(frame_queue.put_nowait, item)
+                        emitted += 1
+                        break
+
+        except Exception as e:
+            ERROR_COUNT.labels(service="video_ingest", type="decode").inc()
+            logger.error(f"Error decoding video: {e}")
+        finally:
+            capture.release()
+            try:
+                loop.call_soon_threadsafe(frame_queue.put_nowait, _END_OF_STREAM)
+            except RuntimeError:
+                # The event loop closed before the stream finished
+                pass
+
+    def _encode_line(self, payload: Dict) -> bytes:
+        """Serialize one NDJSON line"""
+        return get_encoder(ENCODING_JSON).encode(payload).encode("utf-8") + b"\n"
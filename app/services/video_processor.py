@@ -2,10 +2,12 @@ import cv2
 import numpy as np
 import logging
 import asyncio
+import threading
 from typing import Tuple, Dict, Optional
 from app.core.config import get_settings
 from app.core.metrics import ERROR_COUNT
 from app.models.frame import FrameRequest
+from app.services.encode_profiles import EncodeProfile
 from cachetools import LRUCache
 from queue import Queue
 import hashlib
@@ -18,6 +20,9 @@ class VideoProcessor:
         try:
             self.max_dimension = settings.MAX_VIDEO_DIMENSION
             self.jpeg_quality = settings.JPEG_QUALITY
+            self.default_profile = EncodeProfile("default", quality=self.jpeg_quality)
+            self._encode_params: Dict[EncodeProfile, Tuple[int, ...]] = {}
+            self._resize_buffers = threading.local()  # compress_frame may run in executor threads
             self.processing_lock = asyncio.Lock()
             self._frame_cache = LRUCache(maxsize=30)  # Use LRU cache
             self._frame_pool = Queue(maxsize=100)  # Memory pool
@@ -86,16 +91,46 @@ class VideoProcessor:
             except Exception as e:
                 logger.error(f"Error in periodic cleanup: {e}")
 
-    def compress_frame(self, frame: np.ndarray) -> bytes:
-        """Compress frame for WebSocket transmission with error handling"""
+    def compress_frame(self, frame: np.ndarray, profile: Optional[EncodeProfile] = None) -> bytes:
+        """Compress frame for WebSocket transmission using a client's encode profile"""
         try:
-            encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), self.jpeg_quality]
-            _, buffer = cv2.imencode('.jpg', frame, encode_param)
+            profile = profile or self.default_profile
+            if profile.scale < 1.0:
+                frame = self._downscale(frame, profile.scale)
+
+            ok, buffer = cv2.imencode('.jpg', frame, self._get_encode_params(profile))
+            if not ok:
+                raise ValueError("JPEG encoding failed")
             return buffer.tobytes()
         except Exception as e:
+            ERROR_COUNT.labels(service="video_processor", type="compress").inc()
             logger.error(f"Error compressing frame: {e}")
             raise
 
+    def _get_encode_params(self, profile: EncodeProfile) -> Tuple[int, ...]:
+        """Encoder parameters, built once per profile"""
+        params = self._encode_params.get(profile)
+        if params is None:
+            params = self._encode_params[profile] = profile.encode_params()
+        return params
+
+    def _downscale(self, frame: np.ndarray, scale: float) -> np.ndarray:
+        """Resize into a per-thread buffer reused across calls of the same size"""
+        height, width = frame.shape[:2]
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        shape = (size[1], size[0]) + frame.shape[2:]
+
+        buffers = getattr(self._resize_buffers, "buffers", None)
+        if buffers is None:
+            buffers = self._resize_buffers.buffers = LRUCache(maxsize=8)
+        key = (shape, frame.dtype.str)
+        dst = buffers.get(key)
+        if dst is None:
+            dst = buffers[key] = np.empty(shape, dtype=frame.dtype)
+
+        cv2.resize(frame, size, dst=dst, interpolation=cv2.INTER_AREA)
+        return dst
+
     def bytes_to_frame(self, frame_bytes: bytes) -> np.ndarray:
         """Convert bytes to frame with error handling"""
         try:
@@ -0,0 +1,126 @@
+"""Build INT8 variants of the object detector and compare them with FP32
+
+Usage: python scripts/quantize_detector.py FRAMES_DIR [--precision all] [--report report.json]
+
+Frames in FRAMES_DIR are split alternately into a calibration set and an
+evaluation set. Accuracy is measured against the FP32 model's own
+detections on the evaluation set (pseudo ground truth), so the numbers are
+agreement with FP32, not accuracy against human labels.
+"""
+from pathlib import Path
+import argparse
+import json
+import logging
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import get_settings
+from app.services.onnx_backend import OnnxDetector, export_onnx
+from app.services.quantization import (
+    PRECISION_FP32,
+    PRECISION_INT8_DYNAMIC,
+    PRECISION_INT8_STATIC,
+    agreement_metrics,
+    list_frames,
+    quantize_model,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("frames", help="folder of sample frames (jpg/png)")
+    parser.add_argument("--weights", default=settings.YOLO_MODEL_PATH)
+    parser.add_argument("--onnx", default=settings.ONNX_MODEL_PATH or None, help="FP32 ONNX model (exported if omitted)")
+    parser.add_argument("--precision", choices=[PRECISION_INT8_DYNAMIC, PRECISION_INT8_STATIC, "all"], default="all")
+    parser.add_argument("--imgsz", type=int, default=settings.DETECTION_INPUT_SIZE)
+    parser.add_argument("--calibration-frames", type=int, default=200)
+    parser.add_argument("--eval-frames", type=int, default=200)
+    parser.add_argument("--confidence", type=float, default=settings.MIN_DETECTION_CONFIDENCE)
+    parser.add_argument("--iou", type=float, default=0.5, help="IoU for matching detections")
+    parser.add_argument("--batch", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=None, help="intra-op threads (default: all cores)")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--report", help="write the comparison as JSON")
+    return parser.parse_args()
+
+def load_frames(paths):
+    frames = []
+    for path in paths:
+        frame = cv2.imread(str(path), cv2.IMREAD_COLOR)
+        if frame is None:
+            logger.warning(f"Skipping unreadable frame {path}")
+            continue
+        frames.append(frame)
+    return frames
+
+def run_detector(detector, frames, batch, warmup):
+    """Detect on every frame, returning the detections and frames per second"""
+    for _ in range(warmup):
+        detector.detect(frames[:batch])
+
+    detections = []
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch):
+        detections.extend(detector.detect(frames[i:i + batch]))
+    elapsed = time.perf_counter() - start
+    return detections, len(frames) / elapsed
+
+def main():
+    args = parse_args()
+    paths = list_frames(args.frames)
+    if len(paths) < 2:
+        logger.error(f"Need at least two frames in {args.frames}")
+        return 1
+
+    # Alternate split so both sets cover the whole recording
+    calibration = paths[::2][:args.calibration_frames]
+    evaluation = load_frames(paths[1::2][:args.eval_frames])
+
+    onnx_path = Path(args.onnx) if args.onnx else export_onnx(args.weights, args.imgsz)
+    precisions = [PRECISION_INT8_DYNAMIC, PRECISION_INT8_STATIC] if args.precision == "all" else [args.precision]
+    models = {PRECISION_FP32: onnx_path}
+    for precision in precisions:
+        logger.info(f"Quantizing {onnx_path} ({precision})")
+        models[precision] = quantize_model(str(onnx_path), precision, calibration, args.imgsz)
+
+    results = {}
+    reference = None
+    for precision, path in models.items():
+        detector = OnnxDetector(str(path), args.imgsz, args.threads)
+        detections, fps = run_detector(detector, evaluation, args.batch, args.warmup)
+        if reference is None:
+            reference = detections
+        metrics = agreement_metrics(reference, detections, args.confidence, args.iou)
+        results[precision] = {
+            "model": str(path),
+            "size_mb": path.stat().st_size / 1e6,
+            "fps": fps,
+            **metrics,
+        }
+
+    baseline = results[PRECISION_FP32]
+    print(f"\n{len(evaluation)} evaluation frames, batch {args.batch}, "
+          f"IoU {args.iou}, confidence {args.confidence}; deltas against FP32")
+    print(f"{'precision':<14}{'size MB':>9}{'fps':>9}{'speedup':>9}{'recall':>9}{'d recall':>10}{'mAP':>8}{'d mAP':>9}")
+    for precision, result in results.items():
+        result["speedup"] = result["fps"] / baseline["fps"]
+        result["recall_delta"] = result["recall"] - baseline["recall"]
+        result["map_delta"] = result["map"] - baseline["map"]
+        print(f"{precision:<14}{result['size_mb']:>9.1f}{result['fps']:>9.1f}{result['speedup']:>8.2f}x"
+              f"{result['recall']:>9.3f}{result['recall_delta']:>+10.3f}{result['map']:>8.3f}{result['map_delta']:>+9.3f}")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"frames": len(evaluation), "iou": args.iou, "results": results}, f, indent=2)
+        logger.info(f"Report written to {args.report}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
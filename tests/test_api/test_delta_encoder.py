@@ -0,0 +1,60 @@
+import pytest
+from app.api.delta_encoder import ARDeltaEncoder
+
+def make_ar_data(objects, faces=None):
+    return {
+        "overlays": {"faces": faces or [], "objects": objects},
+        "depth_map": None,
+        "frame_metadata": {"width": 640, "height": 480}
+    }
+
+def make_object(track_id, bbox, confidence=0.9):
+    return {"track_id": track_id, "bbox": bbox, "confidence": confidence, "class_name": "person"}
+
+def test_first_frame_is_keyframe():
+    encoder = ARDeltaEncoder()
+
+    encoded = encoder.encode(make_ar_data([make_object("a", [0, 0, 10, 10])]))
+
+    assert encoded["keyframe"] is True
+    assert "a" in encoded["overlays"]["objects"]
+    assert encoded["frame_metadata"] == {"width": 640, "height": 480}
+
+def test_delta_reports_added_updated_removed():
+    encoder = ARDeltaEncoder(position_tolerance=2.0)
+    encoder.encode(make_ar_data([
+        make_object("a", [0, 0, 10, 10]),
+        make_object("b", [20, 20, 30, 30]),
+        make_object("c", [40, 40, 50, 50])
+    ]))
+
+    encoded = encoder.encode(make_ar_data([
+        make_object("a", [1, 1, 11, 11]),   # within tolerance
+        make_object("b", [25, 20, 35, 30]), # moved
+        make_object("d", [60, 60, 70, 70])  # new
+    ]))
+
+    assert encoded["keyframe"] is False
+    assert list(encoded["added"]["objects"]) == ["d"]
+    assert list(encoded["updated"]["objects"]) == ["b"]
+    assert encoded["removed"]["objects"] == ["c"]
+
+def test_tolerance_is_against_last_sent_state():
+    encoder = ARDeltaEncoder(position_tolerance=2.0)
+    encoder.encode(make_ar_data([make_object("a", [0, 0, 10, 10])]))
+
+    first = encoder.encode(make_ar_data([make_object("a", [1.5, 0, 11.5, 10])]))
+    second = encoder.encode(make_ar_data([make_object("a", [3, 0, 13, 10])]))
+
+    assert first["updated"]["objects"] == {}
+    assert "a" in second["updated"]["objects"]
+
+def test_periodic_and_requested_keyframes():
+    encoder = ARDeltaEncoder(keyframe_interval=3)
+    data = make_ar_data([make_object("a", [0, 0, 10, 10])])
+
+    flags = [encoder.encode(data)["keyframe"] for _ in range(4)]
+    encoder.request_keyframe()
+
+    assert flags == [True, False, False, True]
+    assert encoder.encode(data)["keyframe"] is True
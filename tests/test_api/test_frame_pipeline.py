@@ -0,0 +1,66 @@
+import pytest
+import asyncio
+from app.api.frame_pipeline import FramePipeline
+
+@pytest.mark.asyncio
+async def test_results_committed_in_submission_order():
+    committed = []
+
+    async def concurrent_stage(item):
+        # Later frames finish first
+        await asyncio.sleep(0.01 * (5 - item))
+        return item * 10
+
+    async def ordered_stage(item, result):
+        committed.append((item, result))
+
+    pipeline = FramePipeline(depth=5, concurrent_stage=concurrent_stage, ordered_stage=ordered_stage)
+    for item in range(5):
+        await pipeline.submit(item)
+    while pipeline.in_flight:
+        await asyncio.sleep(0.01)
+
+    assert committed == [(i, i * 10) for i in range(5)]
+
+@pytest.mark.asyncio
+async def test_depth_bounds_concurrent_stage():
+    running = 0
+    peak = 0
+
+    async def concurrent_stage(item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return item
+
+    async def ordered_stage(item, result):
+        pass
+
+    pipeline = FramePipeline(depth=2, concurrent_stage=concurrent_stage, ordered_stage=ordered_stage)
+    for item in range(6):
+        await pipeline.submit(item)
+    await pipeline.close()
+
+    assert peak == 2
+
+@pytest.mark.asyncio
+async def test_failed_frame_does_not_stall_later_frames():
+    committed = []
+
+    async def concurrent_stage(item):
+        if item == 1:
+            raise ValueError("decode failed")
+        return item
+
+    async def ordered_stage(item, result):
+        committed.append(item)
+
+    pipeline = FramePipeline(depth=3, concurrent_stage=concurrent_stage, ordered_stage=ordered_stage)
+    for item in range(3):
+        await pipeline.submit(item)
+    while pipeline.in_flight:
+        await asyncio.sleep(0.01)
+
+    assert committed == [0, 2]
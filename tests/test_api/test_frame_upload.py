@@ -0,0 +1,64 @@
+import base64
+import json
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from app.api.frame_upload import FRAME_UPLOAD_OPENAPI, read_frame_upload
+
+app = FastAPI()
+
+@app.post("/upload", openapi_extra=FRAME_UPLOAD_OPENAPI)
+async def upload(request: Request):
+    image_bytes, frame_info = await read_frame_upload(request)
+    return {"size": len(image_bytes), "width": frame_info.width, "metadata": frame_info.metadata}
+
+client = TestClient(app)
+
+def test_json_body_decodes_base64_image():
+    response = client.post("/upload", json={
+        "image": base64.b64encode(b"jpeg").decode(),
+        "width": 640,
+        "height": 480
+    })
+
+    assert response.status_code == 200
+    assert response.json() == {"size": 4, "width": 640, "metadata": {}}
+
+def test_raw_body_reads_frame_headers():
+    response = client.post(
+        "/upload",
+        content=b"raw-jpeg",
+        headers={
+            "content-type": "application/octet-stream",
+            "x-frame-width": "320",
+            "x-frame-height": "240",
+            "x-frame-metadata": json.dumps({"capabilities": ["depth"]})
+        }
+    )
+
+    assert response.json() == {"size": 8, "width": 320, "metadata": {"capabilities": ["depth"]}}
+
+def test_multipart_body_reads_image_file():
+    response = client.post(
+        "/upload",
+        files={"image": ("frame.jpg", b"jpeg-file", "image/jpeg")},
+        data={"width": "1280", "height": "720"}
+    )
+
+    assert response.json() == {"size": 9, "width": 1280, "metadata": {}}
+
+@pytest.mark.parametrize("body", [[1, 2, 3], {"width": 640}, "not json"])
+def test_invalid_json_bodies_are_unprocessable(body):
+    if isinstance(body, str):
+        response = client.post("/upload", content=body, headers={"content-type": "application/json"})
+    else:
+        response = client.post("/upload", json=body)
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"][0] == "body"
+
+def test_openapi_documents_all_body_types():
+    content = client.get("/openapi.json").json()["paths"]["/upload"]["post"]["requestBody"]["content"]
+
+    assert set(content) == {"application/json", "application/octet-stream", "multipart/form-data"}
+    assert "image" in content["application/json"]["schema"]["properties"]
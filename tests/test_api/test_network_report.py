@@ -0,0 +1,28 @@
+import pytest
+from app.api.websocket_handler import SurveillanceWebSocketHandler
+from app.core.link_quality import LinkEstimator
+from app.services.encode_profiles import EncodeProfileSelector
+
+def _handler():
+    handler = SurveillanceWebSocketHandler(None, None, None, None, None, None, None, None)
+    handler._active_connections["phone"] = {
+        "link": LinkEstimator(),
+        "encode_profile": EncodeProfileSelector()
+    }
+    return handler
+
+@pytest.mark.asyncio
+async def test_network_report_picks_profile_from_client_measurements():
+    handler = _handler()
+
+    await handler._handle_client_message("phone", {"type": "network_report", "rtt_ms": 300, "downlink_kbps": 1600})
+
+    assert handler.get_encode_profile("phone").name == "cellular"
+
+@pytest.mark.asyncio
+async def test_malformed_network_report_is_ignored():
+    handler = _handler()
+
+    await handler._handle_client_message("phone", {"type": "network_report", "rtt_ms": "fast"})
+
+    assert handler.get_encode_profile("phone").name == "standard"
@@ -0,0 +1,74 @@
+import pytest
+import time
+from app.api.websocket_handler import SurveillanceWebSocketHandler
+
+class _FakeManager:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, client_id, message):
+        self.sent.append(message)
+
+    def get_outbound_stats(self, client_id):
+        return {}
+
+class _FakeTracker:
+    async def update(self, objects, frame=None):
+        return [{**obj, "track_id": 1} for obj in objects]
+
+class _FakeAnalysis:
+    async def analyze(self, tracked_objects):
+        return {}
+
+    async def check_violations(self, tracked_objects):
+        return []
+
+def _handler(progressive):
+    manager = _FakeManager()
+    handler = SurveillanceWebSocketHandler(
+        manager, None, None, _FakeAnalysis(), _FakeAnalysis(), None, None, _FakeTracker()
+    )
+    handler._active_connections["cam"] = {
+        "progressive": progressive,
+        "next_sequence": 0,
+        "stats": {"frames_received": 0, "frames_processed": 0}
+    }
+    submitted = []
+
+    async def run_frame(client_id, frame_bytes, metadata, received_at, frame_key=None):
+        submitted.append(metadata)
+
+    handler._run_frame = run_frame
+    return handler, manager, submitted
+
+async def _track_and_send(handler, metadata):
+    await handler._track_and_send(
+        "cam", b"", metadata, time.monotonic(), None, None,
+        [{"class": "person"}], [{"face": 1}], frozenset({"objects", "faces"})
+    )
+
+@pytest.mark.asyncio
+async def test_legacy_clients_get_unchanged_payloads():
+    handler, manager, submitted = _handler(progressive=False)
+
+    await handler._submit_frame("cam", b"", {"camera_id": "lobby"})
+    await _track_and_send(handler, submitted[0])
+
+    assert submitted == [{"camera_id": "lobby"}]
+    assert [message["type"] for message in manager.sent] == ["frame_processed"]
+    assert "sequence" not in manager.sent[0]
+
+@pytest.mark.asyncio
+async def test_progressive_clients_get_sequenced_partials():
+    handler, manager, submitted = _handler(progressive=True)
+
+    await handler._submit_frame("cam", b"", {})
+    await handler._submit_frame("cam", b"", {})
+    await _track_and_send(handler, submitted[1])
+
+    assert [metadata["sequence"] for metadata in submitted] == [0, 1]
+    assert [(message["type"], message.get("stage"), message["sequence"]) for message in manager.sent] == [
+        ("frame_partial", "objects", 1),
+        ("frame_partial", "faces", 1),
+        ("frame_processed", None, 1)
+    ]
@@ -0,0 +1,54 @@
+import pytest
+from app.api.rate_control import (
+    RATE_DOWN,
+    RATE_UP,
+    HysteresisRatePolicy,
+    RateTarget,
+    create_rate_policy
+)
+
+LADDER = (
+    RateTarget(fps=30, width=1280, height=720, jpeg_quality=85),
+    RateTarget(fps=10, width=640, height=360, jpeg_quality=70),
+)
+
+def test_steps_down_after_consecutive_overloaded_samples():
+    policy = HysteresisRatePolicy(LADDER, down_samples=3, up_samples=5)
+
+    assert policy.observe(0.5, 0.3) is None
+    assert policy.observe(0.5, 0.3) is None
+    assert policy.observe(0.5, 0.3) == RATE_DOWN
+    assert policy.current.fps == 10
+
+def test_full_pipeline_counts_as_overload():
+    policy = HysteresisRatePolicy(LADDER, down_samples=1)
+
+    assert policy.observe(0.01, 1.0) == RATE_DOWN
+
+def test_single_fast_frame_does_not_reset_to_full_rate():
+    policy = HysteresisRatePolicy(LADDER, down_samples=1, up_samples=3)
+    policy.observe(0.5, 0.0)
+
+    assert policy.observe(0.05, 0.0) is None
+    assert policy.observe(0.05, 0.0) is None
+    assert policy.current.fps == 10
+    assert policy.observe(0.05, 0.0) == RATE_UP
+    assert policy.current.fps == 30
+
+def test_samples_between_watermarks_reset_hysteresis():
+    policy = HysteresisRatePolicy(LADDER, down_samples=2)
+
+    policy.observe(0.5, 0.0)
+    policy.observe(0.15, 0.0)
+
+    assert policy.observe(0.5, 0.0) is None
+
+def test_create_rate_policy():
+    assert isinstance(create_rate_policy("hysteresis"), HysteresisRatePolicy)
+    assert create_rate_policy("none") is None
+    assert create_rate_policy("unknown") is None
+
+def test_rate_control_is_opt_in_by_default():
+    from app.core.config import get_settings
+
+    assert create_rate_policy(get_settings().RATE_CONTROL_POLICY) is None
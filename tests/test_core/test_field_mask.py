@@ -0,0 +1,82 @@
+import pytest
+import asyncio
+from app.core.field_mask import (
+    STAGE_AR,
+    STAGE_BEHAVIOR,
+    STAGE_FACES,
+    STAGE_GEOFENCING,
+    STAGE_OBJECTS,
+    FieldMaskError,
+    parse_field_mask,
+    required_stages,
+    run_field_stages
+)
+
+def test_parse_field_mask_from_query_string():
+    assert parse_field_mask("objects, Geofencing_Alerts") == {"objects", "geofencing_alerts"}
+
+def test_empty_field_mask_means_all_fields():
+    assert parse_field_mask(None) is None
+    assert parse_field_mask("") is None
+
+def test_unknown_field_is_rejected():
+    with pytest.raises(FieldMaskError):
+        parse_field_mask(["objects", "depth"])
+
+def test_geofencing_only_skips_faces_and_ar():
+    assert required_stages(frozenset({"geofencing_alerts"})) == {STAGE_OBJECTS, STAGE_GEOFENCING}
+
+def test_ar_data_needs_both_detectors():
+    assert required_stages(frozenset({"ar_data"})) == {STAGE_FACES, STAGE_OBJECTS, STAGE_AR}
+
+def test_no_mask_runs_every_stage():
+    assert required_stages(None) == {
+        STAGE_FACES, STAGE_OBJECTS, STAGE_AR, STAGE_BEHAVIOR, STAGE_GEOFENCING
+    }
+
+async def _track(objects):
+    return [{**obj, "track_id": 1} for obj in objects]
+
+async def _count(tracked_objects):
+    return len(tracked_objects)
+
+@pytest.mark.asyncio
+async def test_run_field_stages_returns_only_requested_fields():
+    results = await run_field_stages(
+        frozenset({"geofencing_alerts"}), [{"face": 1}], [{"class": "person"}],
+        track=_track, behavior=_count, geofencing=_count
+    )
+
+    assert results == {"geofencing_alerts": 1}
+
+@pytest.mark.asyncio
+async def test_run_field_stages_tracks_before_awaiting_faces():
+    events = []
+    faces_done = asyncio.Event()
+
+    async def detect_faces():
+        await faces_done.wait()
+        return [{"face": 1}]
+
+    async def on_ready(field, value):
+        events.append(field)
+        faces_done.set()
+
+    results = await run_field_stages(
+        frozenset({"objects", "faces"}), detect_faces(), [{"class": "person"}],
+        track=_track, on_ready=on_ready
+    )
+
+    assert events == ["objects", "faces"]
+    assert results == {"objects": [{"class": "person", "track_id": 1}], "faces": [{"face": 1}]}
+
+@pytest.mark.asyncio
+async def test_run_field_stages_passes_tracked_objects_to_ar():
+    async def ar(faces, tracked_objects):
+        return {"faces": len(faces), "tracks": [obj["track_id"] for obj in tracked_objects]}
+
+    results = await run_field_stages(
+        frozenset({"ar_data"}), None, [{"class": "person"}], track=_track, ar=ar
+    )
+
+    assert results == {"ar_data": {"faces": 0, "tracks": [1]}}
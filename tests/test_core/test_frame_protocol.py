@@ -0,0 +1,44 @@
+import pytest
+from app.core.frame_protocol import (
+    FRAME_HEADER,
+    FRAME_PROTOCOL_BINARY,
+    FRAME_PROTOCOL_JSON,
+    FrameProtocolError,
+    decode_binary_frame,
+    encode_binary_frame,
+    negotiate_frame_protocol
+)
+
+def test_binary_frame_roundtrip():
+    payload = b"\xff\xd8jpeg-bytes\xff\xd9"
+    message = encode_binary_frame(payload, sequence=42, timestamp=1700000000.5, metadata={"camera": "cam-1"})
+
+    frame = decode_binary_frame(message)
+
+    assert frame.sequence == 42
+    assert frame.timestamp == 1700000000.5
+    assert frame.metadata == {"camera": "cam-1"}
+    assert bytes(frame.payload) == payload
+
+def test_binary_frame_without_metadata():
+    message = encode_binary_frame(b"jpeg", sequence=1)
+
+    frame = decode_binary_frame(message)
+
+    assert frame.metadata == {}
+    assert len(message) == FRAME_HEADER.size + 4
+
+def test_truncated_binary_frame_rejected():
+    with pytest.raises(FrameProtocolError):
+        decode_binary_frame(b"\x01\x00")
+
+def test_negotiate_frame_protocol():
+    assert negotiate_frame_protocol("BINARY") == FRAME_PROTOCOL_BINARY
+    assert negotiate_frame_protocol(None) == FRAME_PROTOCOL_JSON
+    assert negotiate_frame_protocol("protobuf") == FRAME_PROTOCOL_JSON
+
+def test_non_object_metadata_rejected():
+    message = encode_binary_frame(b"jpeg", sequence=1, metadata=["not", "a", "dict"])
+
+    with pytest.raises(FrameProtocolError):
+        decode_binary_frame(message)
@@ -0,0 +1,37 @@
+import pytest
+from app.core.heartbeat import DeadlineHeap
+
+def test_pop_expired_returns_only_due_clients():
+    heap = DeadlineHeap()
+    heap.touch("a", 10.0)
+    heap.touch("b", 20.0)
+
+    assert heap.pop_expired(15.0) == ["a"]
+    assert "a" not in heap
+    assert "b" in heap
+
+def test_touch_pushes_back_deadline():
+    heap = DeadlineHeap()
+    heap.touch("a", 10.0)
+    heap.touch("a", 30.0)
+
+    assert heap.pop_expired(15.0) == []
+    assert heap.pop_expired(30.0) == ["a"]
+
+def test_removed_client_never_expires():
+    heap = DeadlineHeap()
+    heap.touch("a", 10.0)
+    heap.remove("a")
+
+    assert heap.pop_expired(100.0) == []
+    assert len(heap) == 0
+
+def test_reconnected_client_uses_new_deadline():
+    heap = DeadlineHeap()
+    heap.touch("a", 10.0)
+    heap.remove("a")
+    heap.touch("a", 50.0)
+
+    assert heap.pop_expired(20.0) == []
+    assert heap.pop_expired(50.0) == ["a"]
+    assert heap.pop_expired(100.0) == []
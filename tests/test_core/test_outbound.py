@@ -0,0 +1,53 @@
+import pytest
+import asyncio
+from app.core.outbound import (
+    OVERFLOW_COALESCE,
+    OVERFLOW_DISCONNECT,
+    OVERFLOW_DROP_OLDEST,
+    OutboundBuffer,
+    OutboundOverflow
+)
+
+def message_type(message):
+    return message.get("type")
+
+@pytest.mark.asyncio
+async def test_drop_oldest_keeps_newest_messages():
+    buffer = OutboundBuffer(maxsize=2, policy=OVERFLOW_DROP_OLDEST)
+
+    assert buffer.put({"n": 1})
+    assert buffer.put({"n": 2})
+    assert not buffer.put({"n": 3})
+
+    assert buffer.dropped == 1
+    assert [await buffer.get(), await buffer.get()] == [{"n": 2}, {"n": 3}]
+
+@pytest.mark.asyncio
+async def test_coalesce_replaces_pending_message_of_same_type():
+    buffer = OutboundBuffer(maxsize=2, policy=OVERFLOW_COALESCE, type_of=message_type)
+    buffer.put({"type": "frame_processed", "n": 1})
+    buffer.put({"type": "geofence_alert", "n": 2})
+
+    buffer.put({"type": "frame_processed", "n": 3})
+
+    assert [await buffer.get(), await buffer.get()] == [
+        {"type": "geofence_alert", "n": 2},
+        {"type": "frame_processed", "n": 3}
+    ]
+
+def test_disconnect_policy_raises_on_overflow():
+    buffer = OutboundBuffer(maxsize=1, policy=OVERFLOW_DISCONNECT)
+    buffer.put({"n": 1})
+
+    with pytest.raises(OutboundOverflow):
+        buffer.put({"n": 2})
+
+@pytest.mark.asyncio
+async def test_get_waits_for_message():
+    buffer = OutboundBuffer()
+    getter = asyncio.create_task(buffer.get())
+    await asyncio.sleep(0)
+
+    buffer.put({"n": 1})
+
+    assert await asyncio.wait_for(getter, timeout=1.0) == {"n": 1}
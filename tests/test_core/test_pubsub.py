@@ -0,0 +1,87 @@
+import pytest
+import asyncio
+from app.core.pubsub import InMemoryPubSub, UnixSocketPubSub
+
+async def _collect(received, payload):
+    received.append(payload)
+
+@pytest.mark.asyncio
+async def test_in_memory_delivers_to_handler():
+    received = []
+    pubsub = InMemoryPubSub()
+    await pubsub.start(lambda payload: _collect(received, payload))
+
+    await pubsub.publish(b"alert")
+
+    assert received == [b"alert"]
+
+@pytest.mark.asyncio
+async def test_unix_socket_delivers_published_message_to_every_worker(tmp_path):
+    socket_path = str(tmp_path / "ws.sock")
+    received = {"a": [], "b": []}
+    workers = {
+        name: UnixSocketPubSub(socket_path, reconnect_delay=0.05)
+        for name in received
+    }
+    for name, worker in workers.items():
+        await worker.start(lambda payload, name=name: _collect(received[name], payload))
+
+    try:
+        for _ in range(100):
+            if all(worker._writer is not None for worker in workers.values()):
+                break
+            await asyncio.sleep(0.02)
+
+        await workers["b"].publish(b"alert")
+
+        for _ in range(100):
+            if all(received.values()):
+                break
+            await asyncio.sleep(0.02)
+
+        assert received == {"a": [b"alert"], "b": [b"alert"]}
+    finally:
+        for worker in workers.values():
+            await worker.stop()
+
+@pytest.mark.asyncio
+async def test_stalled_subscriber_does_not_block_other_workers(tmp_path):
+    socket_path = str(tmp_path / "ws.sock")
+    received = []
+    worker = UnixSocketPubSub(socket_path, reconnect_delay=0.05, subscriber_queue_size=4)
+    await worker.start(lambda payload: _collect(received, payload))
+    stalled = None
+
+    try:
+        for _ in range(100):
+            if worker._writer is not None:
+                break
+            await asyncio.sleep(0.02)
+        # A subscriber that never reads fills its socket buffer
+        stalled = await asyncio.open_unix_connection(socket_path)
+
+        payload = b"x" * (512 * 1024)
+        for _ in range(32):
+            await worker.publish(payload)
+
+        for _ in range(250):
+            if len(received) == 32:
+                break
+            await asyncio.sleep(0.02)
+
+        assert len(received) == 32
+    finally:
+        if stalled is not None:
+            stalled[1].close()
+        await worker.stop()
+
+def test_relay_envelope_keeps_binary_values():
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("msgpack")
+    from app.core.serialization import pack_relay, unpack_relay
+
+    array = np.arange(6, dtype=np.float32).reshape(2, 3)
+    envelope = unpack_relay(pack_relay({"message": {"mask": array, "thumb": b"\x00\x01"}, "exclude": []}))
+
+    assert envelope["message"]["thumb"] == b"\x00\x01"
+    np.testing.assert_array_equal(envelope["message"]["mask"], array)
@@ -0,0 +1,42 @@
+import pytest
+import json
+import numpy as np
+from app.core.serialization import (
+    ENCODING_CBOR,
+    ENCODING_JSON,
+    ENCODING_MSGPACK,
+    MSGPACK_NDARRAY_EXT_TYPE,
+    get_encoder,
+    negotiate_encoding
+)
+
+def test_json_encoding_handles_numpy_values():
+    encoder = get_encoder(ENCODING_JSON)
+
+    payload = encoder.encode({"depth": np.zeros((2, 2), dtype=np.float32), "score": np.float32(0.5)})
+
+    assert not encoder.is_binary
+    assert json.loads(payload) == {"depth": [[0.0, 0.0], [0.0, 0.0]], "score": 0.5}
+
+def test_msgpack_packs_arrays_as_typed_blobs():
+    msgpack = pytest.importorskip("msgpack")
+    array = np.arange(6, dtype=np.float32).reshape(2, 3)
+
+    payload = get_encoder(ENCODING_MSGPACK).encode({"depth": array})
+    ext = msgpack.unpackb(payload, raw=False)["depth"]
+    dtype, shape, data = msgpack.unpackb(ext.data, raw=False)
+
+    assert ext.code == MSGPACK_NDARRAY_EXT_TYPE
+    np.testing.assert_array_equal(np.frombuffer(data, dtype=dtype).reshape(shape), array)
+
+def test_cbor_packs_arrays_as_typed_arrays():
+    cbor2 = pytest.importorskip("cbor2")
+
+    decoded = cbor2.loads(get_encoder(ENCODING_CBOR).encode({"mask": np.arange(3, dtype=np.uint8)}))
+
+    assert decoded["mask"].tag == 64
+    assert decoded["mask"].value == b"\x00\x01\x02"
+
+def test_negotiate_encoding_falls_back_to_json():
+    assert negotiate_encoding(None) == ENCODING_JSON
+    assert negotiate_encoding("protobuf") == ENCODING_JSON
@@ -1,3 +1,121 @@
 import pytest
-from fastapi import WebSocket
-from app.core.websocket import WebSocketManager 
\ No newline at end of file
+import asyncio
+from datetime import timedelta
+from app.core.outbound import OVERFLOW_COALESCE, OutboundBuffer
+from app.core.serialization import ENCODING_JSON, ENCODING_MSGPACK, MessageEncoder
+from app.core.websocket import EncodedMessage, WebSocketManager, _coalesce_key, settings
+
+class _IdleWebSocket:
+    """Client that stays connected without sending application messages"""
+    async def accept(self):
+        pass
+
+    async def send_text(self, data):
+        pass
+
+    async def send_bytes(self, data):
+        pass
+
+    async def close(self, code=1000):
+        pass
+
+class _RecordingWebSocket(_IdleWebSocket):
+    """Client that keeps every payload it is sent"""
+    def __init__(self):
+        self.received = []
+        self.delivered = asyncio.Event()
+
+    async def send_text(self, data):
+        self.received.append(data)
+        self.delivered.set()
+
+    async def send_bytes(self, data):
+        await self.send_text(data)
+
+class _StalledWebSocket(_IdleWebSocket):
+    """Client whose socket never drains"""
+    async def send_text(self, data):
+        await asyncio.Event().wait()
+
+async def _idle_client_after(manager, seconds):
+    manager.heartbeat_interval = timedelta(seconds=0.05)
+    await manager.connect(_IdleWebSocket(), "idle")
+    await asyncio.sleep(seconds)
+    return "idle" in manager.active_connections
+
+@pytest.mark.asyncio
+async def test_idle_live_client_survives_heartbeat_interval_in_protocol_mode(monkeypatch):
+    monkeypatch.setattr(settings, "WS_HEARTBEAT_MODE", "protocol")
+    manager = WebSocketManager()
+    try:
+        assert manager.receive_timeout is None
+        assert await _idle_client_after(manager, 0.3)
+    finally:
+        await manager.close()
+
+@pytest.mark.asyncio
+async def test_silent_client_is_reaped_in_app_mode(monkeypatch):
+    monkeypatch.setattr(settings, "WS_HEARTBEAT_MODE", "app")
+    manager = WebSocketManager()
+    try:
+        assert not await _idle_client_after(manager, 0.3)
+    finally:
+        await manager.close()
+
+@pytest.mark.asyncio
+async def test_partials_only_coalesce_with_the_same_stage_of_the_same_frame():
+    buffer = OutboundBuffer(maxsize=2, policy=OVERFLOW_COALESCE, type_of=_coalesce_key)
+    buffer.put({"type": "status"})
+    buffer.put({"type": "frame_partial", "stage": "objects", "sequence": 1})
+
+    buffer.put({"type": "frame_partial", "stage": "faces", "sequence": 1})
+
+    # The faces partial must not replace the objects partial of the same frame
+    assert [await buffer.get(), await buffer.get()] == [
+        {"type": "frame_partial", "stage": "objects", "sequence": 1},
+        {"type": "frame_partial", "stage": "faces", "sequence": 1}
+    ]
+
+def test_coalesce_key_of_encoded_broadcast_matches_message():
+    partial = {"type": "frame_partial", "stage": "faces", "sequence": 3}
+
+    assert _coalesce_key(partial) == ("frame_partial", "faces", 3)
+    assert _coalesce_key({"type": "frame_processed", "sequence": 3}) == "frame_processed"
+    assert _coalesce_key(EncodedMessage("{}", False, _coalesce_key(partial))) == _coalesce_key(partial)
+
+@pytest.mark.asyncio
+async def test_broadcast_encodes_once_per_encoding_and_skips_past_stalled_clients(monkeypatch):
+    encoded = []
+    encode = MessageEncoder.encode
+
+    def counting_encode(self, message):
+        encoded.append(self.encoding)
+        return encode(self, message)
+
+    monkeypatch.setattr(MessageEncoder, "encode", counting_encode)
+    manager = WebSocketManager()
+    await asyncio.sleep(0)  # let the pub/sub subscriber start
+    clients = {
+        "json-1": (ENCODING_JSON, _RecordingWebSocket()),
+        "json-2": (ENCODING_JSON, _RecordingWebSocket()),
+        "stalled": (ENCODING_JSON, _StalledWebSocket()),
+        "msgpack-1": (ENCODING_MSGPACK, _RecordingWebSocket()),
+        "msgpack-2": (ENCODING_MSGPACK, _RecordingWebSocket()),
+    }
+    try:
+        for client_id, (encoding, websocket) in clients.items():
+            await manager.connect(websocket, client_id, encoding=encoding)
+
+        await manager.broadcast({"type": "geofence_alert", "zone": "lobby"})
+        live = [websocket for client_id, (_, websocket) in clients.items() if client_id != "stalled"]
+        await asyncio.wait_for(asyncio.gather(*(websocket.delivered.wait() for websocket in live)), timeout=1)
+
+        assert sorted(encoded) == [ENCODING_JSON, ENCODING_MSGPACK]
+        json_payloads = [clients[client_id][1].received[0] for client_id in ("json-1", "json-2")]
+        msgpack_payloads = [clients[client_id][1].received[0] for client_id in ("msgpack-1", "msgpack-2")]
+        assert json_payloads[0] is json_payloads[1]
+        assert msgpack_payloads[0] is msgpack_payloads[1]
+    finally:
+        for client_id in clients:
+            await manager.disconnect(client_id)
+        await manager.close()
@@ -3,4 +3,42 @@ import numpy as np
 import cv2
 from app.services.ar_service import ARService  # Changed from ...app
 from app.services.face_detection_service import FaceDetectionService
-from app.services.object_detection_service import ObjectDetectionService 
\ No newline at end of file
+from app.services.object_detection_service import ObjectDetectionService 
+
+@pytest.mark.asyncio
+async def test_depth_map_is_computed_outside_the_processing_lock(monkeypatch):
+    import asyncio
+    ar_service = ARService()
+    started = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    generate = ar_service._generate_depth_map
+
+    def tracked_generate(frame):
+        loop.call_soon_threadsafe(started.set)
+        return generate(frame)
+
+    monkeypatch.setattr(ar_service, "_generate_depth_map", tracked_generate)
+    frame = np.random.randint(0, 255, (48, 64, 3), dtype=np.uint8)
+
+    async with ar_service.processing_lock:
+        task = asyncio.create_task(ar_service.process_frame(frame, [], [], include_depth=True))
+        await asyncio.wait_for(started.wait(), timeout=1.0)
+
+    assert (await task)["depth_map"] is not None
+
+
+@pytest.mark.asyncio
+async def test_unhashable_frames_are_not_cached(monkeypatch):
+    ar_service = ARService()
+    monkeypatch.setattr(ar_service, "_compute_frame_hash", lambda frame: "")
+    dark = np.zeros((48, 64, 3), dtype=np.uint8)
+    edges = np.zeros((48, 64, 3), dtype=np.uint8)
+    edges[:, 32:] = 255
+
+    first = await ar_service.get_depth_map(dark)
+    second = await ar_service.get_depth_map(edges)
+
+    assert not np.array_equal(first, second)
+    assert len(ar_service.depth_cache) == 0
+    await ar_service.process_frame(edges, [], [])
+    assert len(ar_service.result_cache) == 0
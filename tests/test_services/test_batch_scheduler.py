@@ -0,0 +1,58 @@
+import pytest
+import asyncio
+import numpy as np
+from app.services.batch_scheduler import BatchScheduler
+from app.services.inference_queue import InferenceQueue
+
+def _frame(value=0):
+    return np.full((2, 2, 3), value, dtype=np.uint8)
+
+@pytest.mark.asyncio
+async def test_flushes_immediately_when_batch_is_full():
+    queue = InferenceQueue("test")
+    scheduler = BatchScheduler(queue, max_batch_size=3, max_delay=10.0)
+    for i in range(5):
+        await queue.submit(_frame(i), str(i), timeout=10.0)
+
+    batch = await asyncio.wait_for(scheduler.next_batch(), timeout=1.0)
+
+    assert [request.frame_hash for request in batch] == ["0", "1", "2"]
+    assert queue.qsize() == 2
+
+@pytest.mark.asyncio
+async def test_flushes_partial_batch_after_oldest_request_waits_max_delay():
+    queue = InferenceQueue("test")
+    scheduler = BatchScheduler(queue, max_batch_size=8, max_delay=0.05)
+    await queue.submit(_frame(), "a", timeout=10.0)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    batch = await scheduler.next_batch()
+
+    assert [request.frame_hash for request in batch] == ["a"]
+    assert loop.time() - started < 0.5
+
+@pytest.mark.asyncio
+async def test_collects_requests_arriving_before_the_deadline():
+    queue = InferenceQueue("test")
+    scheduler = BatchScheduler(queue, max_batch_size=8, max_delay=0.2)
+    await queue.submit(_frame(), "a", timeout=10.0)
+
+    async def late_submit():
+        await asyncio.sleep(0.02)
+        await queue.submit(_frame(), "b", timeout=10.0)
+
+    _, batch = await asyncio.gather(late_submit(), scheduler.next_batch())
+
+    assert [request.frame_hash for request in batch] == ["a", "b"]
+
+def test_pads_to_smallest_configured_shape():
+    scheduler = BatchScheduler(InferenceQueue("test"), pad_sizes=[1, 2, 4, 8])
+    frames = [_frame(1), _frame(2), _frame(3)]
+
+    padded = scheduler.pad(frames)
+
+    assert len(padded) == 4
+    assert padded[-1] is frames[-1]
+    assert scheduler.padded_size(9) == 9
+    assert BatchScheduler(InferenceQueue("test")).pad(frames) is frames
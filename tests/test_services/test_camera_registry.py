@@ -0,0 +1,58 @@
+import pytest
+import asyncio
+from app.models.frame import BatchFrameRequest
+from app.services.camera_registry import CameraServiceRegistry, CameraServices
+
+def _registry(maxsize=8):
+    return CameraServiceRegistry(maxsize, factory=lambda: CameraServices(tracker=None, behavior=None))
+
+@pytest.mark.asyncio
+async def test_frames_run_in_sequence_order_per_camera():
+    registry = _registry()
+    seen = []
+
+    async def analyze(i, services):
+        seen.append(i)
+
+    await registry.run_in_order(["a", "a", "a"], [3, 1, None], analyze)
+
+    assert seen == [1, 0, 2]
+
+@pytest.mark.asyncio
+async def test_concurrent_batches_for_a_camera_do_not_interleave():
+    registry = _registry()
+    events = []
+
+    def analyzer(batch):
+        async def analyze(i, services):
+            events.append((batch, "start", i))
+            await asyncio.sleep(0.01)
+            events.append((batch, "end", i))
+        return analyze
+
+    await asyncio.gather(
+        registry.run_in_order(["cam", "cam"], [1, 2], analyzer("first")),
+        registry.run_in_order(["cam", "cam"], [3, 4], analyzer("second")),
+    )
+
+    batches = [batch for batch, _, _ in events]
+    assert batches == ["first"] * 4 + ["second"] * 4
+
+@pytest.mark.asyncio
+async def test_cameras_keep_separate_state():
+    registry = _registry()
+    services = {}
+
+    async def analyze(i, camera):
+        services[i] = camera
+
+    await registry.run_in_order(["a", "b", "a"], [None, None, None], analyze)
+
+    assert services[0] is services[2]
+    assert services[0] is not services[1]
+
+def test_batch_frames_reuse_frame_request_fields():
+    request = BatchFrameRequest(frames=[{"camera_id": "lobby", "image": "eA==", "width": 640, "height": 480}])
+
+    assert request.frames[0].format == "jpeg"
+    assert request.frames[0].sequence is None
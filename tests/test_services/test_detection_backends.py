@@ -0,0 +1,134 @@
+import pytest
+import asyncio
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from app.services import detection_backends
+from app.services.detection_backends import SharedFrameSlots, detections_to_dicts
+
+def test_detections_to_dicts_filters_by_confidence():
+    detections = np.array([
+        [10, 20, 30, 40, 0.9, 0],
+        [1, 2, 3, 4, 0.2, 2],
+    ], dtype=np.float32)
+
+    result = detections_to_dicts(detections, {0: "person", 2: "car"}, 0.5)
+
+    assert result == [{
+        "bbox": [10.0, 20.0, 30.0, 40.0],
+        "confidence": pytest.approx(0.9),
+        "class_name": "person",
+        "class_id": 0
+    }]
+
+class _FakeModel:
+    def __call__(self, frames, verbose=False):
+        self.frames = [frame.copy() for frame in frames]
+        return []
+
+@pytest.mark.asyncio
+async def test_worker_reads_frames_from_shared_memory(monkeypatch):
+    model = _FakeModel()
+    monkeypatch.setattr(detection_backends, "_worker_model", model)
+    slots = SharedFrameSlots(count=1, slot_bytes=64 * 64 * 3)
+    frame = np.random.randint(0, 255, (32, 48, 3), dtype=np.uint8)
+    try:
+        segment, = slots.acquire_up_to(1)
+        descriptor = SharedFrameSlots.write(segment, frame)
+        detection_backends._worker_infer([descriptor])
+
+        np.testing.assert_array_equal(model.frames[0], frame)
+    finally:
+        for segment in detection_backends._worker_segments.values():
+            segment.close()
+        detection_backends._worker_segments.clear()
+        slots.close()
+
+def test_oversized_frames_do_not_fit_a_slot():
+    slots = SharedFrameSlots(count=1, slot_bytes=16)
+    try:
+        assert not slots.fits(np.zeros((4, 4, 3), dtype=np.uint8))
+    finally:
+        slots.close()
+
+def _thread_backend(monkeypatch, slots, model):
+    monkeypatch.setattr(detection_backends, "_worker_model", model)
+    backend = detection_backends.ProcessPoolBackend("model.pt", workers=2, slot_bytes=slots.slot_bytes)
+    backend._executor = ThreadPoolExecutor(max_workers=2)
+    backend._slots = slots
+    return backend
+
+def _close_worker_segments():
+    for segment in detection_backends._worker_segments.values():
+        segment.close()
+    detection_backends._worker_segments.clear()
+
+@pytest.mark.asyncio
+async def test_batches_larger_than_the_slot_pool_do_not_block(monkeypatch):
+    model = _FakeModel()
+    slots = SharedFrameSlots(count=2, slot_bytes=16 * 16 * 3)
+    backend = _thread_backend(monkeypatch, slots, model)
+    batches = [
+        [np.full((16, 16, 3), batch * 10 + i, dtype=np.uint8) for i in range(5)]
+        for batch in range(3)
+    ]
+    try:
+        await asyncio.wait_for(asyncio.gather(*(backend.infer(frames) for frames in batches)), timeout=5)
+        await asyncio.sleep(0)
+
+        assert len(slots) == 2
+    finally:
+        backend._executor.shutdown()
+        _close_worker_segments()
+        slots.close()
+
+@pytest.mark.asyncio
+async def test_slots_stay_taken_until_a_cancelled_job_finishes(monkeypatch):
+    started, finish = threading.Event(), threading.Event()
+
+    class _SlowModel(_FakeModel):
+        def __call__(self, frames, verbose=False):
+            started.set()
+            finish.wait(5)
+            return super().__call__(frames, verbose)
+
+    slots = SharedFrameSlots(count=1, slot_bytes=16 * 16 * 3)
+    backend = _thread_backend(monkeypatch, slots, _SlowModel())
+    try:
+        task = asyncio.create_task(backend.infer([np.zeros((16, 16, 3), dtype=np.uint8)]))
+        await asyncio.to_thread(started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert len(slots) == 0
+        finish.set()
+        for _ in range(100):
+            if len(slots):
+                break
+            await asyncio.sleep(0.01)
+        assert len(slots) == 1
+    finally:
+        finish.set()
+        backend._executor.shutdown()
+        _close_worker_segments()
+        slots.close()
+
+@pytest.mark.asyncio
+async def test_padding_repeats_share_one_slot(monkeypatch):
+    model = _FakeModel()
+    slots = SharedFrameSlots(count=2, slot_bytes=16 * 16 * 3)
+    backend = _thread_backend(monkeypatch, slots, model)
+    submitted = []
+    submit = backend._executor.submit
+    monkeypatch.setattr(backend._executor, "submit", lambda fn, frames: submitted.append(frames) or submit(fn, frames))
+    frame = np.ones((16, 16, 3), dtype=np.uint8)
+    try:
+        await backend.infer([np.zeros((16, 16, 3), dtype=np.uint8), frame, frame, frame])
+
+        assert all(isinstance(descriptor, tuple) for descriptor in submitted[0])
+        assert len({descriptor[0] for descriptor in submitted[0]}) == 2
+    finally:
+        backend._executor.shutdown()
+        _close_worker_segments()
+        slots.close()
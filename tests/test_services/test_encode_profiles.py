@@ -0,0 +1,75 @@
+import pytest
+import cv2
+import numpy as np
+from app.core.link_quality import LinkEstimator
+from app.services.encode_profiles import ENCODE_PROFILES, EncodeProfile, EncodeProfileSelector
+from app.services.video_processor import VideoProcessor
+
+def _link(throughput=None, rtt=None):
+    link = LinkEstimator()
+    link.throughput = throughput
+    link.rtt = rtt
+    return link
+
+def test_profiles_encode_valid_jpegs():
+    frame = np.random.randint(0, 255, (120, 160, 3), dtype=np.uint8)
+    for profile in ENCODE_PROFILES:
+        ok, buffer = cv2.imencode(".jpg", frame, profile.encode_params())
+        assert ok
+        assert cv2.imdecode(buffer, cv2.IMREAD_COLOR) is not None
+
+def test_selector_keeps_default_without_measurements():
+    selector = EncodeProfileSelector()
+    assert selector.update(LinkEstimator()).name == "standard"
+
+def test_selector_drops_immediately_on_slow_link():
+    selector = EncodeProfileSelector()
+    assert selector.update(_link(throughput=200_000, rtt=0.3)).name == "cellular"
+
+def test_selector_recovers_one_step_after_sustained_improvement():
+    selector = EncodeProfileSelector(up_samples=3)
+    selector.update(_link(throughput=200_000))
+    fast = _link(throughput=10_000_000, rtt=0.01)
+
+    assert selector.update(fast).name == "cellular"
+    assert selector.update(fast).name == "cellular"
+    assert selector.update(fast).name == "reduced"
+
+def test_link_estimator_smooths_client_reports():
+    link = LinkEstimator(alpha=0.5)
+    link.observe_throughput(0)
+    assert link.throughput is None
+
+    link.observe_throughput(1_000_000)
+    link.observe_throughput(3_000_000)
+    link.observe_rtt(0.1)
+    assert link.throughput == pytest.approx(2_000_000)
+    assert link.rtt == pytest.approx(0.1)
+
+@pytest.mark.asyncio
+async def test_compress_frame_applies_profile_scale_and_quality():
+    processor = VideoProcessor()
+    frame = np.random.randint(0, 255, (120, 160, 3), dtype=np.uint8)
+    try:
+        full = processor.compress_frame(frame)
+        small = processor.compress_frame(frame, EncodeProfile("test", quality=40, scale=0.5))
+
+        assert cv2.imdecode(np.frombuffer(full, np.uint8), cv2.IMREAD_COLOR).shape == (120, 160, 3)
+        assert cv2.imdecode(np.frombuffer(small, np.uint8), cv2.IMREAD_COLOR).shape == (60, 80, 3)
+        assert len(small) < len(full)
+    finally:
+        processor._cleanup_task.cancel()
+
+@pytest.mark.asyncio
+async def test_compress_frame_builds_encode_params_once_per_profile():
+    processor = VideoProcessor()
+    profile = ENCODE_PROFILES[2]
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    try:
+        processor.compress_frame(frame, profile)
+        params = processor._encode_params[profile]
+        processor.compress_frame(frame, profile)
+
+        assert processor._encode_params[profile] is params
+    finally:
+        processor._cleanup_task.cancel()
@@ -1,4 +1,61 @@
 import pytest
+import asyncio
+import threading
 import numpy as np
 import cv2
-from app.services.face_detection_service import FaceDetectionService 
\ No newline at end of file
+from types import SimpleNamespace
+from app.core.metrics import FACE_DETECTION_POOL_BUSY
+from app.services import face_detection_service
+from app.services.face_detection_service import FaceDetectionService
+
+class _FakeDetector:
+    """Records which threads use it; MediaPipe graphs are not thread safe"""
+    def __init__(self, release):
+        self.release = release
+        self.threads = set()
+        self.closed = False
+
+    def process(self, rgb_frame):
+        self.threads.add(threading.get_ident())
+        self.release.wait(5)
+        return SimpleNamespace(detections=[])
+
+    def close(self):
+        self.closed = True
+
+def _busy():
+    return FACE_DETECTION_POOL_BUSY._value.get()
+
+@pytest.mark.asyncio
+async def test_each_worker_thread_owns_its_detector(monkeypatch):
+    release = threading.Event()
+    detectors = []
+
+    def face_detection(**kwargs):
+        detectors.append(_FakeDetector(release))
+        return detectors[-1]
+
+    solutions = SimpleNamespace(face_detection=SimpleNamespace(FaceDetection=face_detection))
+    monkeypatch.setattr(face_detection_service, "mp", SimpleNamespace(solutions=solutions))
+    monkeypatch.setattr(face_detection_service.settings, "FACE_DETECTION_WORKERS", 2)
+    service = FaceDetectionService()
+    frames = [np.full((64, 64, 3), value, dtype=np.uint8) for value in (0, 80, 160, 240)]
+    try:
+        pending = asyncio.gather(*(service.detect_faces(frame) for frame in frames))
+        for _ in range(100):
+            if _busy() == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert _busy() == 2
+
+        release.set()
+        assert await pending == [[], [], [], []]
+        assert _busy() == 0
+        assert len(detectors) == 2
+        assert all(len(detector.threads) == 1 for detector in detectors)
+        assert detectors[0].threads != detectors[1].threads
+    finally:
+        release.set()
+        await service.cleanup()
+
+    assert all(detector.closed for detector in detectors)
@@ -0,0 +1,77 @@
+import pytest
+import asyncio
+from app.services.frame_dedup import FrameDeduplicator
+
+def test_frame_key_identifies_frames_by_content():
+    assert FrameDeduplicator.frame_key(b"frame") == FrameDeduplicator.frame_key(memoryview(b"frame"))
+    assert FrameDeduplicator.frame_key(b"frame") != FrameDeduplicator.frame_key(b"other")
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_execution():
+    dedup = FrameDeduplicator()
+    calls = 0
+    release = asyncio.Event()
+
+    async def detect():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return ["box"]
+
+    waiters = [asyncio.create_task(dedup.run("frame", detect)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == [["box"]] * 3
+    assert calls == 1
+
+@pytest.mark.asyncio
+async def test_recent_result_is_served_from_cache():
+    dedup = FrameDeduplicator(ttl=10.0)
+    calls = 0
+
+    async def detect():
+        nonlocal calls
+        calls += 1
+        return ["box"]
+
+    await dedup.run("frame", detect)
+    assert await dedup.run("frame", detect) == ["box"]
+    assert calls == 1
+
+@pytest.mark.asyncio
+async def test_one_caller_leaving_does_not_cancel_shared_work():
+    dedup = FrameDeduplicator()
+    release = asyncio.Event()
+
+    async def detect():
+        await release.wait()
+        return ["box"]
+
+    leaving = asyncio.create_task(dedup.run("frame", detect))
+    staying = asyncio.create_task(dedup.run("frame", detect))
+    await asyncio.sleep(0)
+    leaving.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await staying == ["box"]
+
+@pytest.mark.asyncio
+async def test_work_is_cancelled_when_last_caller_leaves():
+    dedup = FrameDeduplicator()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def detect():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    caller = asyncio.create_task(dedup.run("frame", detect))
+    await started.wait()
+    caller.cancel()
+    await asyncio.wait_for(cancelled.wait(), timeout=1.0)
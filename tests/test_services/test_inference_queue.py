@@ -0,0 +1,44 @@
+import pytest
+import asyncio
+import numpy as np
+from app.services.inference_queue import InferenceQueue
+
+FRAME = np.zeros((4, 4, 3), dtype=np.uint8)
+
+@pytest.mark.asyncio
+async def test_get_skips_cancelled_requests():
+    queue = InferenceQueue("test")
+    abandoned = await queue.submit(FRAME, "a", timeout=5.0)
+    live = await queue.submit(FRAME, "b", timeout=5.0)
+    abandoned.future.cancel()
+
+    assert await queue.get() is live
+
+@pytest.mark.asyncio
+async def test_get_skips_expired_requests():
+    queue = InferenceQueue("test")
+    expired = await queue.submit(FRAME, "a", timeout=0.0)
+    live = await queue.submit(FRAME, "b", timeout=5.0)
+
+    assert await queue.get() is live
+    assert expired.future.cancelled()
+
+@pytest.mark.asyncio
+async def test_purge_cancels_only_the_owners_requests():
+    queue = InferenceQueue("test")
+    first = await queue.submit(FRAME, "a", timeout=5.0, owner="client-1")
+    second = await queue.submit(FRAME, "b", timeout=5.0, owner="client-1")
+    other = await queue.submit(FRAME, "c", timeout=5.0, owner="client-2")
+
+    assert queue.purge("client-1") == 2
+    assert first.future.cancelled() and second.future.cancelled()
+    assert await queue.get() is other
+
+@pytest.mark.asyncio
+async def test_completed_requests_are_not_purged():
+    queue = InferenceQueue("test")
+    request = await queue.submit(FRAME, "a", timeout=5.0, owner="client-1")
+    request.future.set_result([])
+    await asyncio.sleep(0)  # run done callbacks
+
+    assert queue.purge("client-1") == 0
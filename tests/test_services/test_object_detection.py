@@ -1,4 +1,79 @@
 import pytest
+import asyncio
 import numpy as np
 import cv2
-from app.services.object_detection_service import ObjectDetectionService 
\ No newline at end of file
+from app.core.metrics import DETECTION_COUNT
+from app.services import object_detection_service
+from app.services.object_detection_service import ObjectDetectionService
+
+class _FakeBackend:
+    """One detection per frame; ``gate`` holds inference until set"""
+    names = {0: "padding_probe"}
+    concurrency = 1
+
+    def __init__(self):
+        self.batch_sizes = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def start(self):
+        pass
+
+    async def infer(self, frames):
+        self.batch_sizes.append(len(frames))
+        await self.gate.wait()
+        return [np.array([[0, 0, 10, 10, 0.9, 0]], dtype=np.float32) for _ in frames]
+
+    async def close(self):
+        pass
+
+@pytest.fixture
+def service_factory(monkeypatch):
+    def create(pad_sizes=()):
+        backend = _FakeBackend()
+        monkeypatch.setattr(object_detection_service.settings, "DETECTION_BACKEND", "onnx")
+        monkeypatch.setattr(object_detection_service.settings, "DETECTION_BATCH_PAD_SIZES", list(pad_sizes))
+        monkeypatch.setattr(object_detection_service, "create_detection_backend", lambda device: backend)
+        return ObjectDetectionService(), backend
+
+    return create
+
+def _frame(value):
+    return np.full((32, 32, 3), value, dtype=np.uint8)
+
+def _count():
+    return DETECTION_COUNT.labels(type="padding_probe")._value.get()
+
+@pytest.mark.asyncio
+async def test_padding_frames_are_not_counted(service_factory):
+    service, backend = service_factory(pad_sizes=[4])
+    before = _count()
+    try:
+        assert len(await service.detect(_frame(1))) == 1
+        assert backend.batch_sizes == [4]
+        assert _count() - before == 1
+    finally:
+        await service.cleanup()
+
+@pytest.mark.asyncio
+async def test_frames_queued_while_backend_busy_join_the_next_batch(service_factory):
+    service, backend = service_factory()
+    try:
+        backend.gate.clear()
+        first = asyncio.create_task(service.detect(_frame(1)))
+        for _ in range(100):
+            if backend.batch_sizes:
+                break
+            await asyncio.sleep(0.005)
+
+        # Arrive further apart than the batching delay while the only slot is busy
+        second = asyncio.create_task(service.detect(_frame(2)))
+        await asyncio.sleep(0.05)
+        third = asyncio.create_task(service.detect(_frame(3)))
+        await asyncio.sleep(0.05)
+        backend.gate.set()
+        await asyncio.gather(first, second, third)
+
+        assert backend.batch_sizes == [1, 2]
+    finally:
+        await service.cleanup()
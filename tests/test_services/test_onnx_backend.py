@@ -0,0 +1,48 @@
+import pytest
+import numpy as np
+from app.services.onnx_backend import OnnxDetector, letterbox, nms, postprocess
+
+def test_letterbox_pads_to_square_batch():
+    frames = [
+        np.zeros((480, 640, 3), dtype=np.uint8),
+        np.full((640, 320, 3), 255, dtype=np.uint8),
+    ]
+
+    tensor, ratios, pads = letterbox(frames, 320)
+
+    assert tensor.shape == (2, 3, 320, 320)
+    assert tensor.dtype == np.float32
+    np.testing.assert_allclose(ratios, [0.5, 0.5])
+    np.testing.assert_array_equal(pads, [[0, 40], [80, 0]])
+    # Padding is grey, content keeps its value
+    assert tensor[0, :, 0, 0] == pytest.approx(114 / 255)
+    assert tensor[1, :, 160, 160] == pytest.approx(1.0)
+
+def test_nms_suppresses_overlapping_boxes():
+    boxes = np.array([
+        [0, 0, 10, 10],
+        [1, 1, 10, 10],
+        [20, 20, 30, 30],
+    ], dtype=np.float32)
+    scores = np.array([0.8, 0.9, 0.7], dtype=np.float32)
+
+    assert nms(boxes, scores, 0.5).tolist() == [1, 2]
+
+def test_postprocess_maps_boxes_back_to_frame():
+    # Two anchors, two classes: one confident box, one below the threshold
+    output = np.zeros((1, 6, 2), dtype=np.float32)
+    output[0, :, 0] = [100, 120, 40, 20, 0.1, 0.9]  # cx, cy, w, h, class scores
+    output[0, :, 1] = [10, 10, 4, 4, 0.1, 0.1]
+    ratios = np.array([0.5], dtype=np.float32)
+    pads = np.array([[0, 40]], dtype=np.float32)
+
+    detections = postprocess(output, ratios, pads, [(480, 640)])[0]
+
+    assert detections.shape == (1, 6)
+    np.testing.assert_allclose(detections[0], [160, 140, 240, 180, 0.9, 1], rtol=1e-5)
+
+def test_reads_class_names_from_export_metadata():
+    assert OnnxDetector._read_names({"names": "{0: 'person', 1: 'bicycle'}"}) == {
+        0: "person", 1: "bicycle"
+    }
+    assert OnnxDetector._read_names({}) == {}
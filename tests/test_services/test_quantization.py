@@ -0,0 +1,62 @@
+import pytest
+import cv2
+import numpy as np
+from app.services.quantization import (
+    FrameCalibrationReader,
+    agreement_metrics,
+    list_frames,
+    quantized_model_path,
+)
+
+def _detections(*rows):
+    return np.array(rows, dtype=np.float32).reshape(-1, 6)
+
+REFERENCE = [
+    _detections([0, 0, 10, 10, 0.9, 0], [20, 20, 40, 40, 0.8, 1]),
+    _detections([5, 5, 15, 15, 0.7, 0]),
+]
+
+def test_identical_detections_agree_fully():
+    assert agreement_metrics(REFERENCE, REFERENCE, confidence_threshold=0.5) == {
+        "map": pytest.approx(1.0), "recall": 1.0, "precision": 1.0
+    }
+
+def test_missed_and_spurious_detections_lower_the_scores():
+    candidates = [
+        _detections([1, 1, 10, 10, 0.9, 0], [60, 60, 80, 80, 0.9, 2]),  # class 1 missed, class 2 spurious
+        _detections([5, 5, 15, 15, 0.6, 0]),
+    ]
+
+    metrics = agreement_metrics(REFERENCE, candidates, confidence_threshold=0.5)
+
+    assert metrics["recall"] == pytest.approx(2 / 3)
+    assert metrics["precision"] == pytest.approx(2 / 3)
+    assert metrics["map"] == pytest.approx(0.5)
+
+def test_low_confidence_candidates_count_for_map_only():
+    candidates = [
+        _detections([0, 0, 10, 10, 0.9, 0], [20, 20, 40, 40, 0.3, 1]),
+        _detections([5, 5, 15, 15, 0.7, 0]),
+    ]
+
+    metrics = agreement_metrics(REFERENCE, candidates, confidence_threshold=0.5)
+
+    assert metrics["map"] == pytest.approx(1.0)
+    assert metrics["recall"] == pytest.approx(2 / 3)
+
+def test_calibration_reader_letterboxes_each_frame(tmp_path):
+    for i in range(2):
+        cv2.imwrite(str(tmp_path / f"{i}.jpg"), np.zeros((48, 64, 3), dtype=np.uint8))
+    (tmp_path / "notes.txt").write_text("not a frame")
+
+    reader = FrameCalibrationReader(list_frames(str(tmp_path)), "images", imgsz=64)
+    batches = [reader.get_next(), reader.get_next(), reader.get_next()]
+
+    assert [batch["images"].shape for batch in batches[:2]] == [(1, 3, 64, 64)] * 2
+    assert batches[2] is None
+    reader.rewind()
+    assert reader.get_next() is not None
+
+def test_quantized_models_live_next_to_fp32():
+    assert str(quantized_model_path("models/yolov8n.onnx", "int8_static")) == "models/yolov8n.int8_static.onnx"
+    assert str(quantized_model_path("models/yolov8n.onnx", "fp32")) == "models/yolov8n.onnx"
@@ -0,0 +1,91 @@
+import pytest
+import json
+import cv2
+import numpy as np
+from app.services.video_ingest_service import VideoIngestService
+
+class _FakeTracker:
+    async def cleanup(self):
+        pass
+
+class _FakeEngine:
+    def __init__(self, results=None):
+        self.tracker = _FakeTracker()
+        self.results = results or {"objects": []}
+        self.frames = 0
+
+    async def process_frame(self, frame):
+        self.frames += 1
+        return self.results
+
+def _write_video(path, frames=5):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(frames):
+        writer.write(np.full((48, 64, 3), (i * 40) % 256, dtype=np.uint8))
+    writer.release()
+    return path
+
+def _service(engine, queue_size=2):
+    service = VideoIngestService(ml_engine=None)
+    service.queue_size = queue_size
+    service._create_engine = lambda: engine
+    return service
+
+async def _lines(stream):
+    return [json.loads(line) async for line in stream]
+
+@pytest.mark.asyncio
+async def test_streams_info_frames_and_summary(tmp_path):
+    video = _write_video(tmp_path / "clip.avi")
+    service = _service(_FakeEngine())
+
+    lines = await _lines(service.stream_results(video, service.open_video(video), frame_stride=2))
+
+    assert lines[0]["type"] == "video_info"
+    assert [line["frame_index"] for line in lines[1:-1]] == [0, 2, 4]
+    assert lines[-1] == {"type": "summary", "frames_processed": 3}
+
+@pytest.mark.asyncio
+async def test_unreadable_video_fails_before_streaming(tmp_path):
+    video = tmp_path / "broken.mp4"
+    video.write_bytes(b"not a video")
+
+    with pytest.raises(ValueError):
+        _service(_FakeEngine()).open_video(video)
+
+@pytest.mark.asyncio
+async def test_disconnect_after_video_info_releases_capture(tmp_path):
+    video = _write_video(tmp_path / "clip.avi")
+    service = _service(_FakeEngine())
+    capture = service.open_video(video)
+    stream = service.stream_results(video, capture)
+
+    assert json.loads(await stream.__anext__())["type"] == "video_info"
+    await stream.aclose()
+
+    assert not capture.isOpened()
+
+@pytest.mark.asyncio
+async def test_disconnect_mid_stream_stops_decoder(tmp_path):
+    video = _write_video(tmp_path / "clip.avi", frames=20)
+    engine = _FakeEngine()
+    service = _service(engine, queue_size=1)
+    capture = service.open_video(video)
+    stream = service.stream_results(video, capture)
+
+    await stream.__anext__()
+    await stream.__anext__()
+    await stream.aclose()
+
+    assert engine.frames == 1
+    assert not capture.isOpened()
+
+@pytest.mark.asyncio
+async def test_unserializable_results_become_error_lines(tmp_path):
+    video = _write_video(tmp_path / "clip.avi", frames=2)
+    service = _service(_FakeEngine(results={"objects": [object()]}))
+
+    lines = await _lines(service.stream_results(video, service.open_video(video)))
+
+    assert [line["type"] for line in lines] == ["video_info", "error", "error", "summary"]
+    assert lines[-1]["frames_processed"] == 2